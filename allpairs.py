@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy import sparse
+
+import datacache
+from engine import RatingModel, top_k_rows
+from neighbors import NeighborIndex
+
+ALLPAIRS_DIR = os.path.join('artifacts', 'user_similarity')
+# Anggaran memori default (MB) untuk semua worker sekaligus
+MAX_MEMORY_MB = 1024
+# Perkiraan byte per sel blok padat: similarity float64 + indeks & salinan sementara top-K
+BYTES_PER_CELL = 24
+
+_worker = {}
+
+
+def _init_worker(matrix_path, out_dir, k, threshold):
+    """Setiap proses memuat matriks ternormalisasi sekali dari disk, bukan per tugas."""
+    _worker['normalized'] = sparse.load_npz(matrix_path).tocsr()
+    _worker['normalized_t'] = _worker['normalized'].T.tocsc()
+    _worker.update(out_dir=out_dir, k=k, threshold=threshold)
+
+
+def shard_path(out_dir, start):
+    return os.path.join(out_dir, f"part-{start:010d}.npz")
+
+
+def similarity_block(normalized, normalized_t, start, stop, k=None, threshold=None):
+    """
+    Similarity baris start:stop x semua baris dengan satu perkalian sparse, lalu hanya top-k
+    per baris dan/atau entri > threshold yang disimpan. Output: CSR (stop - start) x N.
+    """
+    sims = (normalized[start:stop] @ normalized_t).toarray()
+    rows = np.arange(stop - start)
+    sims[rows, start + rows] = -np.inf  # Diri sendiri bukan tetangga
+    n_cols = sims.shape[1]
+
+    if k is not None:
+        k = min(k, max(n_cols - 1, 0))
+        idx, top_sims = top_k_rows(sims, k)
+        keep = top_sims > (-np.inf if threshold is None else threshold)
+        counts = keep.sum(axis=1)
+        cols, values = idx[keep], top_sims[keep]
+    else:
+        keep = sims > threshold
+        counts = keep.sum(axis=1)
+        cols, values = np.nonzero(keep)[1], sims[keep]
+
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    return sparse.csr_matrix((values.astype(np.float32), cols.astype(np.int32), indptr), shape=(stop - start, n_cols))
+
+
+def _run_block(start, stop):
+    """Tugas worker: hitung satu blok dan tulis langsung ke file shard (atomik lewat os.replace)."""
+    block = similarity_block(_worker['normalized'], _worker['normalized_t'], start, stop,
+                             _worker['k'], _worker['threshold'])
+    path = shard_path(_worker['out_dir'], start)
+    tmp_path = path + '.tmp.npz'
+    sparse.save_npz(tmp_path, block)
+    os.replace(tmp_path, path)
+    return start, stop, int(block.nnz)
+
+
+def block_rows_for(n_cols, matrix_bytes, n_workers, max_memory_mb=MAX_MEMORY_MB):
+    """
+    (baris per blok, jumlah worker) agar blok padat + salinan matriks (2x: CSR & CSC) tiap
+    worker muat di anggaran. Worker dikurangi jika salinan matriksnya saja tidak muat;
+    ValueError jika satu worker dengan blok satu baris pun melebihi anggaran.
+    """
+    budget = max_memory_mb * 2 ** 20
+    row_bytes = max(n_cols, 1) * BYTES_PER_CELL
+    fit = budget // (matrix_bytes * 2 + row_bytes)
+    if fit < 1:
+        raise ValueError(
+            f"max_memory_mb={max_memory_mb} terlalu kecil: satu worker butuh minimal "
+            f"{(matrix_bytes * 2 + row_bytes) / 2 ** 20:.0f} MB (salinan matriks + satu baris blok)"
+        )
+    n_workers = int(min(n_workers, fit))
+    return int((budget - n_workers * matrix_bytes * 2) // (n_workers * row_bytes)), n_workers
+
+
+def build(model, out_dir=ALLPAIRS_DIR, k=256, threshold=None, n_workers=None, max_memory_mb=MAX_MEMORY_MB,
+          block_rows=None, progress=None):
+    """
+    Hitung similarity semua pasangan user per blok baris di ProcessPool. Setiap blok hanya
+    menyimpan top-k per baris (k=None: semua entri > threshold) dan ditulis ke shard
+    sendiri begitu selesai, jadi memori puncak ditentukan max_memory_mb, bukan N x N.
+    Shard yang sudah ada dari proses yang terputus dilewati (fingerprint & parameter sama).
+    Manifest ditulis terakhir. Output: manifest (dict).
+    """
+    if k is None and threshold is None:
+        raise ValueError("k atau threshold harus diisi")
+    n_workers = n_workers or os.cpu_count() or 1
+    normalized = model.normalized
+    n_rows = normalized.shape[0]
+    matrix_bytes = normalized.data.nbytes + normalized.indices.nbytes + normalized.indptr.nbytes
+    if block_rows is None:
+        block_rows, n_workers = block_rows_for(n_rows, matrix_bytes, n_workers, max_memory_mb)
+    block_rows = min(block_rows, max(n_rows, 1))
+
+    os.makedirs(out_dir, exist_ok=True)
+    params = {'fingerprint': model.fingerprint(), 'n_rows': n_rows, 'k': k, 'threshold': threshold,
+              'block_rows': block_rows}
+    params_path = os.path.join(out_dir, 'params.json')
+    if os.path.exists(params_path):
+        with open(params_path) as f:
+            if json.load(f) != params:
+                for name in os.listdir(out_dir):
+                    if name.startswith('part-'):
+                        os.remove(os.path.join(out_dir, name))
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    with open(params_path, 'w') as f:
+        json.dump(params, f)
+
+    matrix_path = os.path.join(out_dir, 'normalized.npz')
+    sparse.save_npz(matrix_path, normalized)
+    blocks = [(start, min(start + block_rows, n_rows)) for start in range(0, n_rows, block_rows)]
+    todo, shards = [], {}
+    for start, stop in blocks:
+        if os.path.exists(shard_path(out_dir, start)):
+            shards[start] = (stop, int(sparse.load_npz(shard_path(out_dir, start)).nnz))
+        else:
+            todo.append((start, stop))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(matrix_path, out_dir, k, threshold)) as pool:
+        futures = [pool.submit(_run_block, start, stop) for start, stop in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            start, stop, nnz = future.result()
+            shards[start] = (stop, nnz)
+            if progress:
+                progress(done, len(todo))
+    os.remove(matrix_path)
+
+    manifest = dict(params, shards=[
+        {'file': os.path.basename(shard_path(out_dir, start)), 'start': start, 'stop': stop, 'nnz': nnz}
+        for start, (stop, nnz) in sorted(shards.items())
+    ])
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+class SimilarityShards:
+    """Pembaca hasil build(): baris per shard dimuat saat dibutuhkan, tanpa menggabungkan semuanya."""
+
+    def __init__(self, out_dir=ALLPAIRS_DIR):
+        with open(os.path.join(out_dir, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self.out_dir = out_dir
+        self._starts = np.array([s['start'] for s in self.manifest['shards']], dtype=np.int64)
+
+    @property
+    def fingerprint(self):
+        return self.manifest['fingerprint']
+
+    def __iter__(self):
+        """(baris awal, CSR blok) per shard, urut."""
+        for shard in self.manifest['shards']:
+            yield shard['start'], sparse.load_npz(os.path.join(self.out_dir, shard['file']))
+
+    def row(self, i):
+        """Tetangga baris i: (indeks baris, kemiripan) urut menurun."""
+        shard = self.manifest['shards'][int(np.searchsorted(self._starts, i, side='right')) - 1]
+        block = sparse.load_npz(os.path.join(self.out_dir, shard['file']))
+        lo, hi = block.indptr[i - shard['start']], block.indptr[i - shard['start'] + 1]
+        idx, sims = block.indices[lo:hi], block.data[lo:hi]
+        order = np.lexsort((idx, -sims))
+        return idx[order], sims[order].astype(np.float64)
+
+    def to_neighbor_index(self, min_similarity=0.05):
+        """Tabel NeighborIndex (top-k, kemiripan > min_similarity) dari shard mode top-k."""
+        k = self.manifest['k']
+        if k is None:
+            raise ValueError("Shard dibangun dengan threshold saja, bukan top-k")
+        n_rows = self.manifest['n_rows']
+        k = min(k, max(n_rows - 1, 0))
+        neighbor_idx = np.full((n_rows, k), -1, dtype=np.int32)
+        neighbor_sims = np.zeros((n_rows, k), dtype=np.float32)
+        for start, block in self:
+            counts = np.diff(block.indptr)
+            rows = np.repeat(np.arange(block.shape[0]), counts)
+            slots = np.arange(block.nnz) - np.repeat(block.indptr[:-1], counts)
+            keep = block.data > min_similarity  # Shard top-k sudah urut menurun per baris
+            neighbor_idx[start + rows[keep], slots[keep]] = block.indices[keep]
+            neighbor_sims[start + rows[keep], slots[keep]] = block.data[keep]
+        return NeighborIndex(neighbor_idx, neighbor_sims, min_similarity, self.fingerprint)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Similarity semua pasangan user per blok, paralel multi-proses, ke shard di disk")
+    parser.add_argument('--k', type=int, default=256, help="top-k per user (0 = pakai --threshold saja)")
+    parser.add_argument('--threshold', type=float, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-memory-mb', type=int, default=MAX_MEMORY_MB)
+    parser.add_argument('--out', default=ALLPAIRS_DIR)
+    parser.add_argument('--neighbors', default=None, help="simpan juga sebagai tabel NeighborIndex (.npz)")
+    args = parser.parse_args()
+
+    df_places, df_ratings, _ = datacache.load_tables(with_description=False)
+    model = RatingModel.from_ratings(df_ratings, place_ids=df_places['Place_Id'])
+    manifest = build(
+        model, args.out, k=args.k or None, threshold=args.threshold, n_workers=args.workers,
+        max_memory_mb=args.max_memory_mb, progress=lambda done, total: print(f"\r{done}/{total} blok", end='')
+    )
+    print(f"\n{manifest['n_rows']} user, {sum(s['nnz'] for s in manifest['shards'])} pasangan, "
+          f"{len(manifest['shards'])} shard x {manifest['block_rows']} baris -> {args.out}")
+    if args.neighbors:
+        SimilarityShards(args.out).to_neighbor_index(args.threshold or 0.05).save(args.neighbors)
+        print(f"Tabel tetangga -> {args.neighbors}")
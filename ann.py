@@ -0,0 +1,177 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from engine import RatingModel, find_similar_users
+
+# Recall minimal terhadap cosine eksak agar LSH boleh dipakai pada suatu threshold
+TARGET_RECALL = 0.95
+
+
+class LSHIndex:
+    """
+    Indeks tetangga aproksimasi untuk cosine similarity dengan random-projection LSH
+    (SimHash). Setiap tabel memetakan vektor ke kode n_bits dari tanda proyeksi acak;
+    kandidat dari bucket yang sama (plus bucket berjarak Hamming 1 jika probe_radius=1)
+    lalu diurutkan ulang dengan cosine eksak.
+
+    Trade-off recall/latensi: tambah n_tables atau probe_radius untuk recall lebih tinggi,
+    tambah n_bits untuk bucket lebih kecil (lebih cepat, recall turun).
+
+    Titik operasi default (16 tabel x 8 bit, probe_radius=1) diukur dengan operating_points()
+    pada 60 ribu user sintetis x 437 tempat: konfigurasi termurah dari grid tabel {8, 16, 32}
+    x bit {8, 12, 16, 20} x probe {0, 1} yang mencapai recall >= 0.95 (pada threshold >= 0.5).
+    Tetapi kandidatnya ~45 ribu dari 60 ribu user sehingga query ~26 ms, lebih lambat dari
+    cosine eksak (~2-10 ms); tidak ada konfigurasi di grid itu yang lebih cepat dari eksak
+    pada recall target. Karena itu indeks hanya dipakai pada threshold yang lolos
+    calibrate() untuk model yang sedang dilayani (lihat usable()).
+    """
+
+    def __init__(self, n_tables=16, n_bits=8, probe_radius=1, seed=42):
+        if n_bits > 62:
+            raise ValueError("n_bits maksimal 62")
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.probe_radius = probe_radius
+        self.seed = seed
+        self._bit_values = np.left_shift(np.uint64(1), np.arange(n_bits, dtype=np.uint64))
+        self.thresholds = None  # Threshold yang lolos calibrate(); None = belum dikalibrasi
+
+    def fit(self, vectors):
+        """Bangun indeks dari baris vektor ternormalisasi L2 (CSR), id = nomor baris."""
+        vectors = sparse.csr_matrix(vectors)
+        rng = np.random.default_rng(self.seed)
+        self.planes = rng.standard_normal((vectors.shape[1], self.n_tables * self.n_bits)).astype(np.float32)
+        self._vectors = vectors
+        codes = self._hash(vectors)
+        self._order = np.argsort(codes, axis=1, kind='stable')
+        self._sorted_codes = np.take_along_axis(codes, self._order, axis=1)
+        return self
+
+    def _hash(self, vectors):
+        """Kode bucket per tabel: array (n_tables, n_vektor) uint64."""
+        projected = np.asarray(vectors @ self.planes) > 0
+        bits = projected.reshape(-1, self.n_tables, self.n_bits).astype(np.uint64)
+        return (bits * self._bit_values).sum(axis=2, dtype=np.uint64).T
+
+    def _probe_codes(self, codes):
+        """Kode yang diperiksa per tabel: kode asli dan (opsional) semua kode beda satu bit."""
+        if self.probe_radius == 0:
+            return codes[:, None]
+        flips = codes[:, None] ^ self._bit_values[None, :]
+        return np.concatenate([codes[:, None], flips], axis=1)
+
+    def candidates(self, vector):
+        """Id kandidat (unik) untuk satu vektor query."""
+        probes = self._probe_codes(self._hash(vector)[:, 0])
+        found = []
+        for table in range(self.n_tables):
+            sorted_codes = self._sorted_codes[table]
+            lo = np.searchsorted(sorted_codes, probes[table], side='left')
+            hi = np.searchsorted(sorted_codes, probes[table], side='right')
+            for a, b in zip(lo, hi):
+                found.append(self._order[table, a:b])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def calibrate(self, model, thresholds, target_recall=TARGET_RECALL, sample_size=100, seed=0):
+        """
+        Ukur indeks terhadap cosine eksak pada model (lihat operating_points) dan simpan
+        threshold yang recall-nya >= target_recall sekaligus lebih cepat dari pencarian eksak.
+        Output: tabel pengukuran per threshold.
+        """
+        table = operating_points(model, self, thresholds, sample_size, seed)
+        table['usable'] = (table['recall'] >= target_recall) & (table['ann_ms'] < table['exact_ms'])
+        self.thresholds = set(np.round(table.loc[table['usable'], 'threshold'], 4).tolist())
+        return table
+
+    def usable(self, threshold):
+        """True jika query pada threshold ini terbukti lebih cepat dari eksak pada recall target."""
+        return self.thresholds is not None and round(float(threshold), 4) in self.thresholds
+
+    def query(self, vector, threshold, max_id=None):
+        """
+        Tetangga aproksimasi dengan cosine > threshold: (id, kemiripan) urut menurun.
+        max_id membatasi hasil ke id < max_id (mis. hanya user yang ada di RatingModel).
+        """
+        vector = sparse.csr_matrix(vector)
+        ids = self.candidates(vector)
+        if max_id is not None:
+            ids = ids[ids < max_id]
+        if len(ids) == 0:
+            return ids, np.empty(0)
+        sims = np.asarray((self._vectors[ids] @ vector.T).todense()).ravel()
+        order, top_sims = find_similar_users(sims, threshold)
+        return ids[order], top_sims
+
+
+def operating_points(model, index, thresholds, sample_size=100, seed=0):
+    """
+    Recall & latensi LSH vs cosine eksak untuk beberapa threshold sekaligus. Similarity eksak
+    dan kandidat LSH dihitung sekali per user sampel, recall per threshold dari hasil yang sama.
+    Latensi mencakup similarity + seleksi pada threshold terendah (bagian yang bergantung pada
+    threshold hampir sama untuk kedua jalur). Output: DataFrame satu baris per threshold.
+    """
+    thresholds = np.sort(np.asarray(thresholds, dtype=np.float64))
+    rng = np.random.default_rng(seed)
+    n_users = model.shape[0]
+    sample = rng.choice(n_users, size=min(sample_size, n_users), replace=False)
+    normalized = model.normalized
+
+    hits = np.zeros(len(thresholds))
+    totals = np.zeros(len(thresholds))
+    n_candidates = 0
+    exact_time = ann_time = 0.0
+    for user_idx in sample:
+        vector = normalized[user_idx]
+
+        t0 = time.perf_counter()
+        exact_sims = normalized @ vector.toarray().ravel()
+        find_similar_users(exact_sims, thresholds[0], exclude_idx=user_idx)
+        t1 = time.perf_counter()
+        ann_idx, _ = index.query(vector, thresholds[0])
+        t2 = time.perf_counter()
+
+        exact_time += t1 - t0
+        ann_time += t2 - t1
+        n_candidates += len(index.candidates(vector))
+        found = np.zeros(n_users, dtype=bool)
+        found[ann_idx[ann_idx < n_users]] = True
+        exact_sims[user_idx] = -np.inf
+        exact = exact_sims[None, :] > thresholds[:, None]
+        hits += (exact & found).sum(axis=1)
+        totals += exact.sum(axis=1)
+
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'recall': np.divide(hits, totals, out=np.ones_like(hits), where=totals > 0),
+        'candidates': n_candidates / len(sample),
+        'exact_ms': 1000 * exact_time / len(sample),
+        'ann_ms': 1000 * ann_time / len(sample),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ukur recall/latensi LSH terhadap cosine eksak")
+    parser.add_argument('--ratings', default='tourism_rating.csv')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+    parser.add_argument('--target-recall', type=float, default=TARGET_RECALL)
+    parser.add_argument('--tables', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--bits', type=int, nargs='+', default=[8, 12, 16])
+    parser.add_argument('--probe-radius', type=int, default=1)
+    parser.add_argument('--sample', type=int, default=200)
+    args = parser.parse_args()
+
+    model = RatingModel.from_ratings(pd.read_csv(args.ratings))
+    rows = []
+    for n_tables in args.tables:
+        for n_bits in args.bits:
+            index = LSHIndex(n_tables, n_bits, args.probe_radius).fit(model.normalized)
+            table = index.calibrate(model, args.thresholds, args.target_recall, args.sample)
+            rows.append(table.assign(tables=n_tables, bits=n_bits))
+    print(pd.concat(rows)[['tables', 'bits', 'threshold', 'recall', 'candidates', 'exact_ms', 'ann_ms', 'usable']]
+          .round(4).to_string(index=False))
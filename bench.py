@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import datacache
+from content import ContentModel
+from datagen import RatingGenerator, generate_places, generate_users
+from engine import RatingModel, block_similarities, normalize_rows, score_block
+
+RESULTS_PATH = os.path.join('artifacts', 'bench_results.json')
+BASELINE_PATH = os.path.join('artifacts', 'bench_baseline.json')
+DEFAULT_SCALES = ['1000x100', '10000x1000', '100000x10000']
+
+
+def parse_scale(text):
+    """'100000x10000' -> (100000, 10000) = (jumlah user, jumlah tempat)."""
+    users, places = text.lower().split('x')
+    return int(users), int(places)
+
+
+def measure(func, repeat=1):
+    """
+    Jalankan func() repeat kali: waktu terbaik (detik) dan puncak alokasi memori (MB,
+    via tracemalloc, termasuk buffer NumPy). Output: (hasil func terakhir, detik, MB).
+    """
+    best, peak = np.inf, 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = min(best, elapsed)
+    return result, best, peak / 2**20
+
+
+def write_dataset(data_dir, n_users, n_places, seed):
+    """Tulis tourism_with_id.csv, tourism_rating.csv & user.csv sintetis ke data_dir."""
+    places = generate_places(n_places, seed=seed)
+    places.to_csv(os.path.join(data_dir, datacache.SOURCES['places']), index=False)
+    generator = RatingGenerator(n_users, places['Place_Id'].to_numpy(), popularity_skew=1.0, seed=seed)
+    generator.to_csv(os.path.join(data_dir, datacache.SOURCES['ratings']))
+    generate_users(n_users, seed=seed).to_csv(os.path.join(data_dir, datacache.SOURCES['users']), index=False)
+    return generator.total_ratings
+
+
+def bench_scale(n_users, n_places, sample=256, threshold=0.1, n=10, repeat=1, seed=42):
+    """
+    Ukur setiap tahap pipeline untuk satu skala data sintetis. Similarity & prediksi
+    diukur pada sampel `sample` user (blok x semua user), throughput dalam user/detik.
+    """
+    rows = []
+
+    def record(stage, func, items):
+        result, seconds, peak_mb = measure(func, repeat)
+        rows.append({
+            'scale': f"{n_users}x{n_places}",
+            'stage': stage,
+            'seconds': seconds,
+            'peak_mb': peak_mb,
+            'items': items,
+            'throughput': items / seconds if seconds > 0 else float('inf'),
+        })
+        return result
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        n_ratings = write_dataset(data_dir, n_users, n_places, seed)
+        cache_dir = os.path.join(data_dir, 'cache')
+
+        record('load_csv', lambda: datacache.load_tables(data_dir, cache_dir), n_ratings)
+        record('build_cache', lambda: datacache.build_cache(data_dir, cache_dir), n_ratings)
+        df_places, df_ratings, _ = record('load_cache', lambda: datacache.load_tables(data_dir, cache_dir), n_ratings)
+
+        model = record(
+            'matrix_build',
+            lambda: RatingModel.from_ratings(df_ratings, place_ids=df_places['Place_Id']),
+            n_ratings
+        )
+        # normalize_rows diukur langsung (model.normalized di-cache, jadi repeat berikutnya
+        # tidak mengerjakan apa pun), hasilnya dipasang ke model untuk tahap similarity
+        model._normalized = record('normalize', lambda: normalize_rows(model.matrix), n_users)
+
+        sample_rows = np.random.default_rng(seed).choice(n_users, size=min(sample, n_users), replace=False)
+        sims = record('similarity', lambda: block_similarities(model, sample_rows), len(sample_rows))
+        record(
+            'prediction',
+            lambda: score_block(model, sample_rows, sims, threshold, n),
+            len(sample_rows)
+        )
+        record('content', lambda: ContentModel.build(df_places), n_places)
+
+    for row in rows:
+        row.update({'users': n_users, 'places': n_places, 'ratings': n_ratings})
+    return rows
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results, baseline, tolerance=0.2, min_delta=0.02):
+    """
+    Bandingkan waktu per (skala, tahap) dengan baseline. Tahap dianggap regresi jika
+    lebih lambat dari baseline x (1 + tolerance) dan selisihnya > min_delta detik
+    (tahap yang sangat cepat terlalu berisik untuk dibandingkan dengan rasio saja).
+    """
+    base = {(r['scale'], r['stage']): r for r in baseline['results']}
+    rows = []
+    for r in results:
+        ref = base.get((r['scale'], r['stage']))
+        if ref is None:
+            continue
+        ratio = r['seconds'] / ref['seconds'] if ref['seconds'] > 0 else float('inf')
+        rows.append({
+            'scale': r['scale'],
+            'stage': r['stage'],
+            'baseline_s': ref['seconds'],
+            'seconds': r['seconds'],
+            'ratio': ratio,
+            'regresi': ratio > 1 + tolerance and r['seconds'] - ref['seconds'] > min_delta,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark tahap pipeline rekomendasi pada berbagai skala data")
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES, help="USERxTEMPAT, mis. 1000000x100000")
+    parser.add_argument('--sample', type=int, default=256, help="jumlah user untuk tahap similarity & prediksi")
+    parser.add_argument('--threshold', type=float, default=0.1)
+    parser.add_argument('--n', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--save-baseline', action='store_true', help="simpan hasil ini sebagai baseline baru")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        n_users, n_places = parse_scale(scale)
+        results.extend(bench_scale(n_users, n_places, args.sample, args.threshold, args.n, args.repeat, args.seed))
+
+    report = {'environment': environment(), 'results': results}
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=1)
+
+    table = pd.DataFrame(results)[['scale', 'stage', 'seconds', 'peak_mb', 'throughput']]
+    print(table.round(4).to_string(index=False))
+    print(f"hasil -> {args.out}")
+
+    exit_code = 0
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"baseline -> {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+        if len(comparison):
+            print(comparison.round(3).to_string(index=False))
+            if comparison['regresi'].any():
+                print(f"REGRESI: {int(comparison['regresi'].sum())} tahap lebih lambat dari baseline")
+                exit_code = 1
+    raise SystemExit(exit_code)
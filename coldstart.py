@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+
+import datacache
+from engine import RatingModel
+
+COLDSTART_PATH = os.path.join('artifacts', 'coldstart.npz')
+# Batas bawah kelompok usia: <25, 25-29, 30-34, 35+
+AGE_EDGES = np.array([25, 30, 35])
+AGE_LABELS = ['< 25', '25-29', '30-34', '35+']
+# Bobot prior (jumlah rating semu) pada rata-rata Bayesian
+PRIOR_WEIGHT = 5.0
+# Panjang daftar terurut yang disimpan per segmen
+N_TOP = 100
+# Di bawah jumlah rating ini user baru dilayani dari tabel cold-start, bukan CF
+MIN_CF_RATINGS = 3
+
+
+def province_of(location):
+    """'Bekasi, Jawa Barat' -> 'Jawa Barat'."""
+    return str(location).split(',')[-1].strip()
+
+
+def age_band(age):
+    return int(np.searchsorted(AGE_EDGES, age, side='right'))
+
+
+def users_fingerprint(df_users):
+    digest = hashlib.sha1()
+    for col in ('User_Id', 'Location', 'Age'):
+        digest.update(df_users[col].astype(str).str.cat(sep='\x1f').encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def bayesian_average(sums, counts, prior, weight=PRIOR_WEIGHT):
+    return (sums + weight * prior) / (counts + weight)
+
+
+class ColdStartTables:
+    """
+    Daftar tempat terurut per segmen (provinsi asal, kelompok usia) untuk user tanpa cukup
+    rating. Skor = rata-rata Bayesian bertingkat: global disusutkan ke rata-rata semua rating,
+    provinsi & kelompok usia ke skor global tempat itu, provinsi x usia ke skor provinsinya.
+    Segmen kecil jadi tetap masuk akal. Lookup = satu akses dict + slice array.
+    Segmen '' / -1 berarti provinsi / usia tidak dibedakan.
+    """
+
+    def __init__(self, keys, order, scores, fingerprint):
+        self.keys = [(str(p), int(b)) for p, b in keys]
+        self.order = order
+        self.scores = scores
+        self.fingerprint = fingerprint
+        self._row = {key: i for i, key in enumerate(self.keys)}
+
+    @property
+    def provinces(self):
+        return sorted({p for p, _ in self.keys if p})
+
+    @classmethod
+    def build(cls, model, df_users, n_top=N_TOP, weight=PRIOR_WEIGHT):
+        """Hitung dari matriks rating & user.csv dengan bincount per (segmen, tempat)."""
+        n_users, n_places = model.shape
+        users = df_users.set_index('User_Id')
+        known = np.isin(model.user_ids, users.index.to_numpy())
+        provinces = np.full(n_users, '', dtype=object)
+        bands = np.full(n_users, -1, dtype=np.int64)
+        provinces[known] = users.loc[model.user_ids[known], 'Location'].map(province_of).to_numpy()
+        bands[known] = np.searchsorted(AGE_EDGES, users.loc[model.user_ids[known], 'Age'].to_numpy(), side='right')
+
+        matrix = model.matrix
+        row_of_rating = np.repeat(np.arange(n_users), np.diff(matrix.indptr))
+        ratings = matrix.data.astype(np.float64)
+
+        def totals(segment_of_user, n_segments):
+            """Jumlah & banyak rating per (segmen, tempat); user tanpa segmen (-1) dilewati."""
+            segment = segment_of_user[row_of_rating]
+            keep = segment >= 0
+            flat = segment[keep] * n_places + matrix.indices[keep]
+            size = n_segments * n_places
+            sums = np.bincount(flat, weights=ratings[keep], minlength=size).reshape(n_segments, n_places)
+            counts = np.bincount(flat, minlength=size).reshape(n_segments, n_places)
+            return sums, counts
+
+        global_mean = ratings.mean() if len(ratings) else 0.0
+        sums, counts = totals(np.zeros(n_users, dtype=np.int64), 1)
+        global_scores = bayesian_average(sums, counts, global_mean, weight)
+
+        province_names, province_idx = np.unique(provinces[known], return_inverse=True)
+        province_of_user = np.full(n_users, -1, dtype=np.int64)
+        province_of_user[known] = province_idx
+        sums, counts = totals(province_of_user, len(province_names))
+        province_scores = bayesian_average(sums, counts, global_scores, weight)
+
+        n_bands = len(AGE_EDGES) + 1
+        sums, counts = totals(bands, n_bands)
+        band_scores = bayesian_average(sums, counts, global_scores, weight)
+
+        cross_of_user = np.where(known, province_of_user * n_bands + bands, -1)
+        sums, counts = totals(cross_of_user, len(province_names) * n_bands)
+        cross_scores = bayesian_average(sums, counts, np.repeat(province_scores, n_bands, axis=0), weight)
+
+        keys = [('', -1)]
+        keys += [(p, -1) for p in province_names]
+        keys += [('', b) for b in range(n_bands)]
+        keys += [(p, b) for p in province_names for b in range(n_bands)]
+        scores = np.vstack([global_scores, province_scores, band_scores, cross_scores])
+
+        n_top = min(n_top, n_places)
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :n_top].astype(np.int32)
+        top_scores = np.take_along_axis(scores, order, axis=1).astype(np.float32)
+        fingerprint = f"{model.fingerprint()}-{users_fingerprint(df_users)}"
+        return cls(keys, order, top_scores, fingerprint)
+
+    def segment(self, province=None, age=None):
+        """Baris segmen paling spesifik yang tersedia untuk provinsi & usia (None = tidak diketahui)."""
+        province = '' if province is None else province
+        band = -1 if age is None else age_band(age)
+        for key in ((province, band), (province, -1), ('', band), ('', -1)):
+            row = self._row.get(key)
+            if row is not None:
+                return row
+        raise KeyError((province, age))
+
+    def recommend(self, province=None, age=None, n=10, exclude=()):
+        """
+        Top-n untuk segmen user, tanpa tempat di exclude (indeks kolom yang sudah dirating).
+        Output: (indeks tempat, skor, 0) seperti rekomender CF.
+        """
+        row = self.segment(province, age)
+        idx, scores = self.order[row], self.scores[row]
+        if len(exclude):
+            keep = ~np.isin(idx, np.asarray(exclude))
+            idx, scores = idx[keep], scores[keep]
+        return idx[:n].astype(np.int64), scores[:n].astype(np.float64), 0
+
+    def save(self, path=COLDSTART_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(
+            path,
+            provinces=np.array([p for p, _ in self.keys], dtype=str),
+            bands=np.array([b for _, b in self.keys], dtype=np.int64),
+            order=self.order,
+            scores=self.scores,
+            fingerprint=self.fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path=COLDSTART_PATH, fingerprint=None):
+        """Muat tabel dari disk; None jika file tidak ada atau dibangun dari data lain."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            tables = cls(
+                zip(data['provinces'].tolist(), data['bands'].tolist()),
+                data['order'],
+                data['scores'],
+                str(data['fingerprint']),
+            )
+        if fingerprint is not None and tables.fingerprint != fingerprint:
+            return None
+        return tables
+
+
+def load_or_build(model, df_users, path=COLDSTART_PATH, **build_kwargs):
+    """Pakai tabel di disk jika cocok dengan data rating & user, jika tidak bangun ulang dan simpan."""
+    tables = ColdStartTables.load(path, f"{model.fingerprint()}-{users_fingerprint(df_users)}")
+    if tables is None:
+        tables = ColdStartTables.build(model, df_users, **build_kwargs)
+        tables.save(path)
+    return tables
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bangun tabel popularitas cold-start per provinsi & kelompok usia")
+    parser.add_argument('--prior-weight', type=float, default=PRIOR_WEIGHT)
+    parser.add_argument('--out', default=COLDSTART_PATH)
+    args = parser.parse_args()
+
+    df_places, df_ratings, df_users = datacache.load_tables(with_description=False)
+    model = RatingModel.from_ratings(df_ratings, place_ids=df_places['Place_Id'])
+    tables = ColdStartTables.build(model, df_users, weight=args.prior_weight)
+    tables.save(args.out)
+    print(f"{len(tables.keys)} segmen ({len(tables.provinces)} provinsi), disimpan ke {args.out}")
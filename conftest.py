@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from datagen import RatingGenerator
+from engine import RatingModel
+
+N_USERS = 150
+PLACE_IDS = np.arange(1, 61, dtype=np.int32)
+
+
+@pytest.fixture(scope='session')
+def ratings():
+    """Rating sintetis kecil (150 user x 60 tempat) dengan popularitas miring agar ada skor kembar."""
+    return RatingGenerator(N_USERS, PLACE_IDS, min_ratings=4, max_ratings=20, popularity_skew=1.0, seed=7).to_frame()
+
+
+@pytest.fixture(scope='session')
+def model(ratings):
+    return RatingModel.from_ratings(ratings, place_ids=PLACE_IDS)
@@ -0,0 +1,129 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import datacache
+import perf
+from engine import top_k_rows
+
+CONTENT_PATH = os.path.join('artifacts', 'content_neighbors.npz')
+
+
+def content_text(df):
+    """Teks fitur konten per tempat: Category + Description + City."""
+    return df['Category'].astype(str) + " " + df['Description'] + " " + df['City'].astype(str)
+
+
+def content_fingerprint(df):
+    """Hash Place_Name & teks konten, menandai artefak yang dibangun dari katalog tempat ini."""
+    digest = hashlib.sha1()
+    for name, text in zip(df['Place_Name'].astype(str), content_text(df)):
+        digest.update(f"{name}\x1f{text}\x1e".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class ContentModel:
+    """
+    Top-K tempat paling mirip (TF-IDF Category + Description + City) untuk setiap tempat.
+    Hanya K tetangga per baris yang disimpan, bukan matriks cosine N x N.
+    """
+
+    def __init__(self, neighbor_idx, neighbor_sims, place_names, fingerprint=None):
+        self.neighbor_idx = neighbor_idx
+        self.neighbor_sims = neighbor_sims
+        self.place_names = list(place_names)
+        self.name_index = {name: i for i, name in enumerate(self.place_names)}
+        self.fingerprint = fingerprint
+        self._matrix = None
+
+    @classmethod
+    def build(cls, df, k=20, block_size=512):
+        """Bangun dari DataFrame tempat (format tourism_with_id.csv) per blok baris."""
+        content = content_text(df)
+        with perf.stage('tfidf') as timer:
+            tfidf = TfidfVectorizer(stop_words='english')
+            tfidf_matrix = timer.track(tfidf.fit_transform(content))  # Baris sudah ternormalisasi L2
+
+        n_places = tfidf_matrix.shape[0]
+        k = min(k, max(n_places - 1, 0))
+        neighbor_idx = np.empty((n_places, k), dtype=np.int32)
+        neighbor_sims = np.empty((n_places, k), dtype=np.float32)
+        with perf.stage('content_top_k') as timer:
+            for start in range(0, n_places, block_size):
+                stop = min(start + block_size, n_places)
+                sims = (tfidf_matrix[start:stop] @ tfidf_matrix.T).toarray()
+                rows = np.arange(stop - start)
+                sims[rows, start + rows] = -np.inf  # Tempat itu sendiri tidak ikut direkomendasikan
+                neighbor_idx[start:stop], neighbor_sims[start:stop] = top_k_rows(sims, k)
+            timer.track(neighbor_idx)
+            timer.track(neighbor_sims)
+
+        return cls(neighbor_idx, neighbor_sims, df['Place_Name'].tolist(), content_fingerprint(df))
+
+    def similar(self, title, n=5):
+        """Posisi baris & skor n tempat paling mirip dengan title (urut menurun)."""
+        idx = self.name_index[title]
+        return self.neighbor_idx[idx, :n], self.neighbor_sims[idx, :n]
+
+    @property
+    def matrix(self):
+        """Tabel top-K sebagai CSR tempat x tempat (kemiripan > 0 saja), untuk skor per user."""
+        if self._matrix is None:
+            n_places, k = self.neighbor_idx.shape
+            keep = self.neighbor_sims > 0
+            rows = np.repeat(np.arange(n_places), keep.sum(axis=1))
+            self._matrix = sparse.csr_matrix(
+                (self.neighbor_sims[keep], (rows, self.neighbor_idx[keep])), shape=(n_places, n_places)
+            )
+        return self._matrix
+
+    def save(self, path=CONTENT_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(
+            path,
+            neighbor_idx=self.neighbor_idx,
+            neighbor_sims=self.neighbor_sims,
+            place_names=np.asarray(self.place_names, dtype=str),
+            fingerprint=self.fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path=CONTENT_PATH, fingerprint=None):
+        """Muat tabel dari disk; None jika file tidak ada atau dibangun dari katalog tempat lain."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            content_model = cls(
+                data['neighbor_idx'],
+                data['neighbor_sims'],
+                data['place_names'].tolist(),
+                str(data['fingerprint']),
+            )
+        if fingerprint is not None and content_model.fingerprint != fingerprint:
+            return None
+        return content_model
+
+
+def load_or_build(df, path=CONTENT_PATH, **build_kwargs):
+    """Pakai tabel di disk jika cocok dengan katalog df, jika tidak bangun ulang dan simpan."""
+    content_model = ContentModel.load(path, content_fingerprint(df))
+    if content_model is None:
+        content_model = ContentModel.build(df, **build_kwargs)
+        content_model.save(path)
+    return content_model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bangun tabel top-K kemiripan konten dari tourism_with_id.csv")
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--out', default=CONTENT_PATH)
+    args = parser.parse_args()
+
+    df_places = datacache.load_tables()[0]
+    content_model = ContentModel.build(df_places, k=args.k)
+    content_model.save(args.out)
+    print(f"{len(content_model.place_names)} tempat, k={content_model.neighbor_idx.shape[1]}, disimpan ke {args.out}")
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import perf
+
+CACHE_DIR = os.path.join('artifacts', 'data_cache')
+SOURCES = {
+    'places': 'tourism_with_id.csv',
+    'ratings': 'tourism_rating.csv',
+    'users': 'user.csv',
+}
+
+
+# --- PEMBERSIHAN & TIPE DATA (sama untuk jalur CSV dan cache) ---
+
+def clean_places(df):
+    """Buang kolom kosong & Coordinate (duplikat Lat/Long), pakai dtype ringkas."""
+    df = df.drop(columns=['Unnamed: 11', 'Unnamed: 12', 'Coordinate'], errors='ignore')
+    return df.astype({
+        'Place_Id': np.int32,
+        'Price': np.int32,
+        'Rating': np.float32,
+        'Time_Minutes': np.float32,
+        'City': 'category',
+        'Category': 'category',
+    })
+
+
+def clean_ratings(df):
+    return df.astype({'User_Id': np.int32, 'Place_Id': np.int32, 'Place_Ratings': np.uint8})
+
+
+def clean_users(df):
+    return df.astype({'User_Id': np.int32, 'Location': 'category', 'Age': np.uint8})
+
+
+def read_csv_tables(data_dir='.'):
+    """Baca ketiga CSV dan samakan dtype-nya dengan cache biner."""
+    return (
+        clean_places(pd.read_csv(os.path.join(data_dir, SOURCES['places']))),
+        clean_ratings(pd.read_csv(os.path.join(data_dir, SOURCES['ratings']))),
+        clean_users(pd.read_csv(os.path.join(data_dir, SOURCES['users']))),
+    )
+
+
+# --- PENULISAN CACHE ---
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _write_table(df, table_dir, text_columns=()):
+    """
+    Tulis satu tabel kolom per kolom: numerik sebagai .npy, kategori sebagai kode + daftar
+    kategori, string pendek sebagai array unicode, dan text_columns sebagai blob UTF-8
+    + offset agar bisa dibaca per baris saat dibutuhkan.
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    schema = {}
+    for col in df.columns:
+        base = os.path.join(table_dir, col)
+        series = df[col]
+        if col in text_columns:
+            encoded = [str(text).encode('utf-8') for text in series.fillna('')]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(text) for text in encoded])
+            with open(base + '.txt', 'wb') as f:
+                f.write(b''.join(encoded))
+            np.save(base + '.offsets.npy', offsets)
+            schema[col] = 'text'
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(base + '.npy', series.cat.codes.to_numpy())
+            schema[col] = {'categories': series.cat.categories.astype(str).tolist()}
+        elif pd.api.types.is_numeric_dtype(series):
+            np.save(base + '.npy', series.to_numpy())
+            schema[col] = 'numeric'
+        else:
+            np.save(base + '.npy', series.astype(str).to_numpy(dtype=str))
+            schema[col] = 'string'
+    return schema
+
+
+def build_cache(data_dir='.', cache_dir=CACHE_DIR):
+    """Tulis cache biner kolumnar dari ketiga CSV beserta manifest (stempel file sumber)."""
+    places, ratings, users = read_csv_tables(data_dir)
+    manifest = {'sources': {}, 'tables': {}}
+    for name, df in (('places', places), ('ratings', ratings), ('users', users)):
+        text_columns = ('Description',) if name == 'places' else ()
+        manifest['tables'][name] = _write_table(df, os.path.join(cache_dir, name), text_columns)
+        manifest['sources'][name] = _source_stamp(os.path.join(data_dir, SOURCES[name]))
+
+    # Manifest ditulis terakhir: cache tanpa manifest lengkap tidak pernah dipakai
+    tmp_path = os.path.join(cache_dir, 'manifest.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(cache_dir, 'manifest.json'))
+    return manifest
+
+
+# --- PEMBACAAN CACHE ---
+
+class TextColumn:
+    """Kolom teks dalam blob UTF-8 + offset; baris didekode hanya saat diminta."""
+
+    def __init__(self, path):
+        self.offsets = np.load(path + '.offsets.npy', mmap_mode='r')
+        self.blob = np.memmap(path + '.txt', dtype=np.uint8, mode='r') if self.offsets[-1] else np.empty(0, np.uint8)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def to_list(self):
+        raw = bytes(self.blob)
+        bounds = self.offsets.tolist()
+        return [raw[a:b].decode('utf-8') for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _read_table(table_dir, schema, skip=()):
+    columns = {}
+    for col, kind in schema.items():
+        if col in skip:
+            continue
+        base = os.path.join(table_dir, col)
+        if kind == 'text':
+            columns[col] = TextColumn(base).to_list()
+        elif isinstance(kind, dict):
+            codes = np.load(base + '.npy')
+            columns[col] = pd.Categorical.from_codes(codes, categories=kind['categories'])
+        elif kind == 'numeric':
+            columns[col] = np.load(base + '.npy', mmap_mode='r')
+        else:
+            columns[col] = np.load(base + '.npy').astype(object)
+    return pd.DataFrame(columns, copy=False)
+
+
+def cache_is_fresh(data_dir='.', cache_dir=CACHE_DIR):
+    """Cache dipakai hanya jika manifest cocok dengan ukuran & mtime CSV saat ini."""
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    try:
+        return all(
+            manifest['sources'].get(name) == _source_stamp(os.path.join(data_dir, source))
+            for name, source in SOURCES.items()
+        )
+    except FileNotFoundError:
+        return False
+
+
+def load_descriptions(data_dir='.', cache_dir=CACHE_DIR):
+    """
+    Description per baris (urutan baris df_places). Dari cache: TextColumn yang mendekode
+    satu baris saat diminta; jika cache tidak segar: list dari CSV.
+    """
+    if cache_is_fresh(data_dir, cache_dir):
+        return TextColumn(os.path.join(cache_dir, 'places', 'Description'))
+    return read_csv_tables(data_dir)[0]['Description'].fillna('').tolist()
+
+
+def load_tables(data_dir='.', cache_dir=CACHE_DIR, with_description=True):
+    """
+    (df_places, df_ratings, df_users) dari cache biner jika masih segar, jika tidak dari CSV.
+    Kolom numerik dari cache di-memory-map sehingga halaman memorinya dibagi antar proses.
+    with_description=False melewatkan kolom Description (teks panjang) sama sekali.
+    """
+    if not cache_is_fresh(data_dir, cache_dir):
+        with perf.stage('load_csv') as timer:
+            places, ratings, users = read_csv_tables(data_dir)
+            if not with_description:
+                places = places.drop(columns=['Description'])
+            timer.track(ratings)
+        return places, ratings, users
+
+    with perf.stage('load_cache') as timer:
+        with open(os.path.join(cache_dir, 'manifest.json')) as f:
+            tables = json.load(f)['tables']
+        skip = () if with_description else ('Description',)
+        tables = (
+            _read_table(os.path.join(cache_dir, 'places'), tables['places'], skip),
+            _read_table(os.path.join(cache_dir, 'ratings'), tables['ratings']),
+            _read_table(os.path.join(cache_dir, 'users'), tables['users']),
+        )
+        timer.track(tables[1])
+    return tables
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bangun cache biner kolumnar dari CSV dataset")
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--out', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    manifest = build_cache(args.data_dir, args.out)
+    for name, schema in manifest['tables'].items():
+        print(f"{name}: {len(schema)} kolom -> {os.path.join(args.out, name)}")
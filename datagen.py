@@ -0,0 +1,187 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class RatingGenerator:
+    """
+    Generator data rating sintetis yang tervektorisasi dan ber-seed.
+    Jumlah rating per user ditentukan di awal (sehingga total baris diketahui), lalu
+    rating dibuat per blok user dan bisa dialirkan langsung ke CSV / .npy tanpa
+    menampung semua data di memori.
+    """
+
+    def __init__(self, n_users, place_ids, min_ratings=15, max_ratings=30, popularity_skew=0.0,
+                 popular=None, popular_boost=(0.5, 1.0), mean=3.5, std=1.2, seed=42,
+                 max_cells=20_000_000):
+        """
+        place_ids: katalog tempat (Place_Id asli atau sintetis).
+        popularity_skew: eksponen Zipf untuk peluang sebuah tempat dirating (0 = seragam).
+        popular: indeks tempat di katalog yang mendapat tambahan rating popular_boost.
+        max_cells: batas ukuran blok user x tempat saat sampling (kendali memori).
+        """
+        self.n_users = n_users
+        self.place_ids = np.asarray(place_ids, dtype=np.int32)
+        self.mean = mean
+        self.std = std
+        self.popular_boost = popular_boost
+        self.seed = seed
+
+        n_places = len(self.place_ids)
+        rng = np.random.default_rng([seed, 0])
+        max_ratings = min(max_ratings, n_places)
+        min_ratings = min(min_ratings, max_ratings)
+        self.counts = rng.integers(min_ratings, max_ratings + 1, size=n_users, dtype=np.int32)
+
+        # Peringkat popularitas diacak agar tidak mengikuti urutan Place_Id
+        ranks = rng.permutation(n_places) + 1
+        self.log_weights = -popularity_skew * np.log(ranks)
+        self.is_popular = np.zeros(n_places, dtype=bool)
+        if popular is not None:
+            self.is_popular[np.asarray(popular, dtype=np.int64)] = True
+
+        self.block_users = max(1, max_cells // max(n_places, 1))
+
+    @property
+    def total_ratings(self):
+        return int(self.counts.sum(dtype=np.int64))
+
+    def _sample_places(self, rng, counts):
+        """
+        Sampling tempat tanpa pengembalian sesuai bobot popularitas untuk satu blok user
+        dengan trik Gumbel top-k: kunci = log(bobot) + Gumbel, ambil k kunci terbesar.
+        """
+        n_block, n_places = len(counts), len(self.place_ids)
+        k_max = int(counts.max())
+        keys = self.log_weights + rng.gumbel(size=(n_block, n_places))
+        if k_max < n_places:
+            top = np.argpartition(-keys, k_max - 1, axis=1)[:, :k_max]
+        else:
+            top = np.broadcast_to(np.arange(n_places), (n_block, n_places))
+        order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        keep = np.arange(k_max) < counts[:, None]
+        return top[keep]
+
+    def chunks(self):
+        """DataFrame (User_Id, Place_Id, Place_Ratings) per blok user, berurutan menurut User_Id."""
+        for block, start in enumerate(range(0, self.n_users, self.block_users)):
+            stop = min(start + self.block_users, self.n_users)
+            rng = np.random.default_rng([self.seed, block + 1])
+            counts = self.counts[start:stop]
+
+            place_idx = self._sample_places(rng, counts)
+            base_rating = rng.normal(self.mean, self.std, size=len(place_idx))
+            # Beberapa tempat populer dapat rating lebih tinggi
+            boost = rng.uniform(*self.popular_boost, size=len(place_idx))
+            base_rating += np.where(self.is_popular[place_idx], boost, 0)
+
+            yield pd.DataFrame({
+                'User_Id': np.repeat(np.arange(start + 1, stop + 1, dtype=np.int32), counts),
+                'Place_Id': self.place_ids[place_idx],
+                'Place_Ratings': np.clip(np.round(base_rating), 1, 5).astype(np.uint8),
+            })
+
+    def to_frame(self):
+        return pd.concat(self.chunks(), ignore_index=True)
+
+    def to_csv(self, path):
+        """Tulis ke CSV (format tourism_rating.csv) blok demi blok."""
+        with open(path, 'w', newline='') as f:
+            for i, chunk in enumerate(self.chunks()):
+                chunk.to_csv(f, header=(i == 0), index=False)
+
+    def to_npy(self, out_dir):
+        """
+        Tulis tiap kolom sebagai .npy yang bisa di-memory-map (layout sama dengan tabel
+        ratings di cache datacache.py). Total baris diketahui di awal, jadi file
+        dialokasikan sekali lalu diisi per blok.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        columns = {'User_Id': np.int32, 'Place_Id': np.int32, 'Place_Ratings': np.uint8}
+        arrays = {
+            col: np.lib.format.open_memmap(
+                os.path.join(out_dir, col + '.npy'), mode='w+', dtype=dtype, shape=(self.total_ratings,)
+            )
+            for col, dtype in columns.items()
+        }
+        pos = 0
+        for chunk in self.chunks():
+            for col, arr in arrays.items():
+                arr[pos:pos + len(chunk)] = chunk[col].to_numpy()
+            pos += len(chunk)
+        for arr in arrays.values():
+            arr.flush()
+
+
+def generate_places(n_places, seed=42, template_path='tourism_with_id.csv'):
+    """
+    Katalog tempat sintetis dengan kolom seperti tourism_with_id.csv. Kategori, kota,
+    kosakata deskripsi, harga dan koordinat diambil dari distribusi data asli.
+    """
+    rng = np.random.default_rng(seed)
+    template = pd.read_csv(template_path)
+    vocab = np.array(' '.join(template['Description'].astype(str)).split())
+    city_centers = template.groupby('City')[['Lat', 'Long']].mean()
+
+    cities = rng.choice(city_centers.index.to_numpy(), size=n_places)
+    words = rng.choice(vocab, size=(n_places, 40))
+    centers = city_centers.loc[cities].to_numpy()
+    coords = centers + rng.normal(0, 0.05, size=(n_places, 2))
+    return pd.DataFrame({
+        'Place_Id': np.arange(1, n_places + 1, dtype=np.int32),
+        'Place_Name': [f"Tempat Sintetis {i}" for i in range(1, n_places + 1)],
+        'Description': [' '.join(row) for row in words],
+        'Category': rng.choice(template['Category'].unique(), size=n_places),
+        'City': cities,
+        'Price': rng.choice(template['Price'].to_numpy(), size=n_places),
+        'Rating': np.round(rng.uniform(3.5, 5.0, size=n_places), 1),
+        'Time_Minutes': rng.choice(template['Time_Minutes'].dropna().to_numpy(), size=n_places),
+        'Lat': coords[:, 0],
+        'Long': coords[:, 1],
+    })
+
+
+def generate_users(n_users, seed=42, template_path='user.csv'):
+    """Tabel user sintetis (format user.csv): Location & Age diambil dari distribusi data asli."""
+    rng = np.random.default_rng(seed)
+    template = pd.read_csv(template_path)
+    return pd.DataFrame({
+        'User_Id': np.arange(1, n_users + 1, dtype=np.int32),
+        'Location': rng.choice(template['Location'].to_numpy(), size=n_users),
+        'Age': rng.choice(template['Age'].to_numpy(), size=n_users),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate data rating sintetis skala besar")
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--places', default='real', help="'real' (tourism_with_id.csv) atau jumlah tempat sintetis")
+    parser.add_argument('--min-ratings', type=int, default=15)
+    parser.add_argument('--max-ratings', type=int, default=30)
+    parser.add_argument('--skew', type=float, default=1.0, help="eksponen Zipf popularitas tempat")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=['csv', 'npy'], default='csv')
+    parser.add_argument('--out', default='synthetic_rating.csv')
+    parser.add_argument('--places-out', default=None, help="tulis katalog tempat sintetis ke CSV ini")
+    args = parser.parse_args()
+
+    if args.places == 'real':
+        place_ids = pd.read_csv('tourism_with_id.csv')['Place_Id'].to_numpy()
+    else:
+        places = generate_places(int(args.places), seed=args.seed)
+        place_ids = places['Place_Id'].to_numpy()
+        if args.places_out:
+            places.to_csv(args.places_out, index=False)
+
+    generator = RatingGenerator(
+        args.users, place_ids, args.min_ratings, args.max_ratings,
+        popularity_skew=args.skew, seed=args.seed
+    )
+    if args.format == 'csv':
+        generator.to_csv(args.out)
+    else:
+        generator.to_npy(args.out)
+    print(f"{args.users} user, {len(place_ids)} tempat, {generator.total_ratings} rating -> {args.out}")
@@ -0,0 +1,408 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import perf
+
+
+# --- MODEL RATING (SPARSE) ---
+
+class RatingModel:
+    """
+    Matriks user x tempat dalam format CSR (rating uint8, 0 = belum dirating)
+    beserta peta id <-> indeks baris/kolom.
+    """
+
+    def __init__(self, matrix, user_ids, place_ids):
+        self.matrix = matrix.tocsr()
+        self.user_ids = np.asarray(user_ids)
+        self.place_ids = np.asarray(place_ids)
+        self.user_index = {uid: i for i, uid in enumerate(self.user_ids.tolist())}
+        self.place_index = {pid: j for j, pid in enumerate(self.place_ids.tolist())}
+        self._normalized = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_ratings(cls, df, place_ids=None, user_col='User_Id', place_col='Place_Id', rating_col='Place_Ratings'):
+        """
+        Bangun model dari DataFrame rating (format tourism_rating.csv).
+        Rating ganda untuk pasangan user-tempat yang sama: yang terakhir dipakai.
+        place_ids opsional untuk menetapkan katalog kolom (mis. semua Place_Id).
+        """
+        df = df.drop_duplicates([user_col, place_col], keep='last')
+        user_ids = np.unique(df[user_col].to_numpy()).astype(np.int32)
+        if place_ids is None:
+            place_ids = np.unique(df[place_col].to_numpy())
+        place_ids = np.asarray(place_ids, dtype=np.int32)
+
+        df = df[df[place_col].isin(place_ids)]
+        rows = np.searchsorted(user_ids, df[user_col].to_numpy()).astype(np.int32)
+        sorter = np.argsort(place_ids)
+        cols = sorter[np.searchsorted(place_ids, df[place_col].to_numpy(), sorter=sorter)].astype(np.int32)
+        values = df[rating_col].to_numpy().astype(np.uint8)
+
+        with perf.stage('matrix_build') as timer:
+            matrix = timer.track(sparse.csr_matrix(
+                (values, (rows, cols)), shape=(len(user_ids), len(place_ids)), dtype=np.uint8
+            ))
+        return cls(matrix, user_ids, place_ids)
+
+    def with_ratings(self, df, user_col='User_Id', place_col='Place_Id', rating_col='Place_Ratings'):
+        """
+        Model baru dengan rating tambahan / perubahan (upsert, yang terakhir dipakai).
+        User baru ditambahkan sebagai baris di akhir, Place_Id di luar katalog diabaikan.
+        Baris ternormalisasi (jika sudah di-cache) hanya dihitung ulang untuk baris yang berubah.
+        Output: (model baru, indeks baris yang berubah).
+        """
+        df = df.drop_duplicates([user_col, place_col], keep='last')
+        df = df[df[place_col].isin(self.place_ids)]
+        new_ids = np.setdiff1d(df[user_col].to_numpy(), self.user_ids)
+        user_ids = np.concatenate([self.user_ids, new_ids.astype(self.user_ids.dtype)])
+        user_index = dict(self.user_index)
+        user_index.update({uid: len(self.user_ids) + i for i, uid in enumerate(new_ids.tolist())})
+
+        rows = np.array([user_index[uid] for uid in df[user_col].tolist()], dtype=np.int32)
+        cols = np.array([self.place_index[pid] for pid in df[place_col].tolist()], dtype=np.int32)
+        shape = (len(user_ids), len(self.place_ids))
+        delta = sparse.csr_matrix(
+            (df[rating_col].to_numpy().astype(np.uint8), (rows, cols)), shape=shape, dtype=np.uint8
+        )
+        old = self.matrix.copy()
+        old.resize(shape)
+        # Nilai lama pada posisi yang di-upsert dinolkan dulu, lalu diganti nilai baru
+        matrix = (old - old.multiply(delta > 0) + delta).astype(np.uint8)
+
+        model = RatingModel(matrix, user_ids, self.place_ids)
+        changed = np.unique(rows)
+        if self._normalized is not None:
+            normalized = self._normalized.copy()
+            normalized.resize(shape)
+            keep = np.ones(shape[0])
+            keep[changed] = 0
+            scatter = sparse.csr_matrix(
+                (np.ones(len(changed)), (changed, np.arange(len(changed)))), shape=(shape[0], len(changed))
+            )
+            model._normalized = (sparse.diags(keep) @ normalized + scatter @ normalize_rows(matrix[changed])).tocsr()
+        return model, changed
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def fingerprint(self):
+        """Hash isi matriks & peta id, dipakai untuk menandai artefak turunan (mis. tabel tetangga)."""
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for arr in (self.user_ids, self.place_ids, self.matrix.indptr, self.matrix.indices, self.matrix.data):
+                digest.update(np.ascontiguousarray(arr).tobytes())
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def make_row(self, place_ratings):
+        """Ubah dict {Place_Id: rating} menjadi satu baris CSR dengan kolom model."""
+        items = [(self.place_index[p], r) for p, r in place_ratings.items() if p in self.place_index]
+        cols = np.array([c for c, _ in items], dtype=np.int32)
+        values = np.array([r for _, r in items], dtype=np.uint8)
+        rows = np.zeros(len(items), dtype=np.int32)
+        return sparse.csr_matrix((values, (rows, cols)), shape=(1, len(self.place_ids)), dtype=np.uint8)
+
+    @property
+    def normalized(self):
+        """Baris rating ternormalisasi L2, di-cache agar fold-in cukup O(nnz)."""
+        if self._normalized is None:
+            self._normalized = normalize_rows(self.matrix)
+        return self._normalized
+
+    def similarity_to_row(self, row):
+        """Cosine similarity semua user terhadap satu baris rating (1 x n_place)."""
+        with perf.stage('similarity') as timer:
+            row_vec = normalize_rows(row).toarray().ravel()
+            return timer.track(self.normalized @ row_vec)
+
+    def similarity_to_user(self, user_idx):
+        """Cosine similarity semua user terhadap user pada baris user_idx."""
+        return self.similarity_to_row(self.matrix[user_idx])
+
+    def rated_mask(self, user_idx):
+        """Mask kolom yang sudah dirating oleh user pada baris user_idx."""
+        mask = np.zeros(len(self.place_ids), dtype=bool)
+        mask[self.matrix.indices[self.matrix.indptr[user_idx]:self.matrix.indptr[user_idx + 1]]] = True
+        return mask
+
+
+def normalize_rows(matrix):
+    """Normalisasi L2 tiap baris matriks sparse (baris nol tetap nol)."""
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1  # Hindari pembagian nol
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+# --- PREDIKSI USER-BASED CF ---
+
+# Presisi skor saat diperingkat: prediksi yang sama dari similarity float32 (tabel tetangga,
+# store) dan float64 (eksak) bisa berbeda ~1e-7, jadi tanpa pembulatan urutan skor kembar
+# bergantung pada jalur yang menghitungnya
+RANK_DECIMALS = 6
+
+def predict_scores(ratings, neighbor_sims):
+    """
+    Prediksi rating semua tempat sekaligus dari user-user serupa.
+    Input: ratings (n_neighbor x n_place, 0 = belum dirating), neighbor_sims (n_neighbor,)
+    Output: (prediksi, mask tempat yang punya minimal satu rating tetangga)
+    """
+    neighbor_sims = np.asarray(neighbor_sims, dtype=np.float64)
+    # weighted_sum dan sim_sum dihitung sebagai dua perkalian matriks-vektor
+    weighted_sum = np.asarray(neighbor_sims @ ratings, dtype=np.float64).ravel()
+    sim_sum = np.asarray(neighbor_sims @ (ratings > 0), dtype=np.float64).ravel()
+
+    valid = sim_sum > 0
+    pred = np.zeros_like(weighted_sum)
+    np.divide(weighted_sum, sim_sum, out=pred, where=valid)
+    return pred, valid
+
+
+def top_n_indices(scores, n, mask=None):
+    """
+    Ambil indeks n skor tertinggi (urut menurun) dengan seleksi parsial.
+    Skor dibulatkan ke RANK_DECIMALS lalu skor yang sama diurutkan berdasarkan indeks,
+    agar hasilnya deterministik dan sama antar jalur (similarity float32 vs float64).
+    """
+    candidates = np.arange(len(scores)) if mask is None else np.flatnonzero(mask)
+    if n <= 0 or len(candidates) == 0:
+        return candidates[:0]
+
+    cand_scores = np.round(scores[candidates], RANK_DECIMALS)
+    if len(candidates) > n:
+        # argpartition cukup untuk menemukan batas skor ke-n, lalu ambil semua
+        # kandidat >= batas agar skor kembar di perbatasan tidak terpotong acak
+        kth = cand_scores[np.argpartition(-cand_scores, n - 1)[n - 1]]
+        keep = cand_scores >= kth
+        candidates = candidates[keep]
+        cand_scores = cand_scores[keep]
+
+    order = np.lexsort((candidates, -cand_scores))[:n]
+    return candidates[order]
+
+
+def top_k_rows(sims, k):
+    """
+    Top-k kolom per baris dengan argpartition, lalu diurutkan menurun
+    (skor sama diurutkan berdasarkan indeks kolom).
+    """
+    if k == 0:
+        empty = np.empty((sims.shape[0], 0))
+        return empty.astype(np.int32), empty
+    idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_sims = np.take_along_axis(sims, idx, axis=1)
+    order = np.lexsort((idx, -top_sims), axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    return idx.astype(np.int32), np.take_along_axis(top_sims, order, axis=1)
+
+
+def top_n_rows(scores, n, mask):
+    """
+    Versi per baris dari top_n_indices untuk satu blok user sekaligus.
+    Output: (indeks, skor) berukuran (n_baris, n); slot kosong berisi -1 / NaN.
+    """
+    n_rows, n_cols = scores.shape
+    n = min(n, n_cols)
+    out_idx = np.full((n_rows, n), -1, dtype=np.int64)
+    out_scores = np.full((n_rows, n), np.nan)
+    if n == 0:
+        return out_idx, out_scores
+
+    masked = np.where(mask, np.round(scores, RANK_DECIMALS), -np.inf)
+    kth = -np.partition(-masked, n - 1, axis=1)[:, n - 1]
+    # Semua skor > batas ikut, skor == batas diambil dari indeks terkecil secukupnya
+    above = masked > kth[:, None]
+    ties = (masked == kth[:, None]) & mask
+    need = n - above.sum(axis=1)
+    take = above | (ties & (np.cumsum(ties, axis=1) <= need[:, None]))
+
+    rows, cols = np.nonzero(take)
+    order = np.lexsort((cols, -masked[rows, cols], rows))
+    rows, cols = rows[order], cols[order]
+    slot = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    out_idx[rows, slot] = cols
+    out_scores[rows, slot] = scores[rows, cols]
+    return out_idx, out_scores
+
+
+def recommend_from_neighbors(ratings, neighbor_sims, exclude_mask, n):
+    """
+    Rekomendasi top-n dari rating tetangga.
+    exclude_mask menandai tempat yang sudah dikunjungi user target.
+    Output: (indeks tempat, prediksi rating)
+    """
+    with perf.stage('prediction') as timer:
+        timer.track(ratings)
+        pred, valid = predict_scores(ratings, neighbor_sims)
+        idx = top_n_indices(pred, n, valid & ~exclude_mask)
+        return idx, pred[idx]
+
+
+def find_similar_users(sim_row, threshold, exclude_idx=None):
+    """
+    User dengan kemiripan > threshold, urut menurun.
+    exclude_idx: baris user target sendiri (jika ada di dalam model).
+    Output: (indeks baris, skor kemiripan)
+    """
+    sim_row = np.asarray(sim_row).ravel()
+    mask = sim_row > threshold
+    if exclude_idx is not None:
+        mask[exclude_idx] = False
+    idx = np.flatnonzero(mask)
+    order = np.argsort(-sim_row[idx], kind='stable')
+    return idx[order], sim_row[idx[order]]
+
+
+def recommend_from_similarities(model, sim_row, rated_mask, threshold, n, exclude_idx=None):
+    """
+    Rekomendasi top-n dari vektor kemiripan terhadap semua user model.
+    Output: (indeks tempat, prediksi, jumlah user serupa) atau None jika tidak ada user serupa.
+    """
+    neighbor_idx, neighbor_sims = find_similar_users(sim_row, threshold, exclude_idx)
+    if len(neighbor_idx) == 0:
+        return None
+
+    place_idx, preds = recommend_from_neighbors(model.matrix[neighbor_idx], neighbor_sims, rated_mask, n)
+    return place_idx, preds, len(neighbor_idx)
+
+
+def recommend_for_user(model, target_idx, threshold, n, neighbor_index=None):
+    """
+    Rekomendasi untuk user terdaftar pada baris target_idx.
+    Jika neighbor_index (tabel top-K tetangga) diberikan, user serupa diambil dari tabel
+    tersebut sehingga tidak ada perhitungan similarity sama sekali.
+    """
+    if neighbor_index is None:
+        sim_row = model.similarity_to_user(target_idx)
+        return recommend_from_similarities(
+            model, sim_row, model.rated_mask(target_idx), threshold, n, exclude_idx=target_idx
+        )
+
+    with perf.stage('neighbor_lookup') as timer:
+        neighbor_idx, neighbor_sims = neighbor_index.neighbors(target_idx, threshold)
+        timer.track(neighbor_idx)
+    if len(neighbor_idx) == 0:
+        return None
+
+    place_idx, preds = recommend_from_neighbors(
+        model.matrix[neighbor_idx], neighbor_sims, model.rated_mask(target_idx), n
+    )
+    return place_idx, preds, len(neighbor_idx)
+
+
+def recommend_for_new_user(model, place_ratings, threshold, n, ann_index=None):
+    """
+    Rekomendasi untuk user sesi (dict {Place_Id: rating}) dengan fold-in:
+    vektor user baru dibandingkan dengan baris ternormalisasi yang sudah di-cache,
+    tanpa menambah baris ke model atau menghitung ulang similarity semua pasangan.
+    Jika ann_index (LSHIndex atas model.normalized) diberikan, hanya kandidat dari
+    indeks tersebut yang dibandingkan.
+    """
+    row = model.make_row(place_ratings)
+    rated_mask = np.zeros(len(model.place_ids), dtype=bool)
+    rated_mask[row.indices] = True
+    if ann_index is None:
+        return recommend_from_similarities(model, model.similarity_to_row(row), rated_mask, threshold, n)
+
+    with perf.stage('ann_query') as timer:
+        neighbor_idx, neighbor_sims = ann_index.query(normalize_rows(row), threshold, max_id=model.shape[0])
+        timer.track(neighbor_idx)
+    if len(neighbor_idx) == 0:
+        return None
+
+    place_idx, preds = recommend_from_neighbors(model.matrix[neighbor_idx], neighbor_sims, rated_mask, n)
+    return place_idx, preds, len(neighbor_idx)
+
+
+# --- BATCH ---
+
+def block_similarities(model, rows):
+    """Cosine similarity blok user (rows) x semua user, diagonal (diri sendiri) dinolkan."""
+    normalized = model.normalized
+    sims = np.asarray((normalized[rows] @ normalized.T).todense())
+    sims[np.arange(len(rows)), rows] = 0  # User bukan tetangga dirinya sendiri
+    return sims
+
+
+def score_block(model, rows, sims, threshold, n, ratings=None, rated=None):
+    """
+    Prediksi top-n untuk satu blok user dari similarity blok x semua user.
+    ratings/rated (float64) boleh diberikan agar tidak dikonversi ulang tiap blok.
+    Output: (indeks tempat, prediksi, jumlah user serupa) per baris blok.
+    """
+    if ratings is None:
+        ratings = model.matrix.astype(np.float64)
+    if rated is None:
+        rated = (model.matrix > 0).astype(np.float64)
+
+    neighbor_sims = sparse.csr_matrix(np.where(sims > threshold, sims, 0))
+    weighted_sum = (neighbor_sims @ ratings).toarray()
+    sim_sum = (neighbor_sims @ rated).toarray()
+    valid = (sim_sum > 0) & (rated[rows].toarray() == 0)
+    pred = np.zeros_like(weighted_sum)
+    np.divide(weighted_sum, sim_sum, out=pred, where=sim_sum > 0)
+
+    top_idx, top_pred = top_n_rows(pred, n, valid)
+    return top_idx, top_pred, np.diff(neighbor_sims.indptr)
+
+
+def recommend_batch(model, user_ids, n, threshold, block_size=256):
+    """
+    Rekomendasi top-n untuk banyak user terdaftar sekaligus. User diproses per blok:
+    similarity blok x semua user, lalu prediksi blok x tempat dengan dua perkalian
+    matriks, sehingga memori dibatasi block_size x (n_user + n_tempat).
+    Output: DataFrame (User_Id, Rank, Place_Id, Prediksi, Jumlah_User_Serupa).
+    """
+    user_rows = np.array([model.user_index[uid] for uid in user_ids if uid in model.user_index], dtype=np.int64)
+    ratings = model.matrix.astype(np.float64)
+    rated = (model.matrix > 0).astype(np.float64)
+    frames = []
+
+    for start in range(0, len(user_rows), block_size):
+        rows = user_rows[start:start + block_size]
+        sims = block_similarities(model, rows)
+        top_idx, top_pred, counts = score_block(model, rows, sims, threshold, n, ratings, rated)
+
+        filled = top_idx >= 0
+        block_rows, ranks = np.nonzero(filled)
+        frames.append(pd.DataFrame({
+            'User_Id': model.user_ids[rows[block_rows]],
+            'Rank': (ranks + 1).astype(np.int16),
+            'Place_Id': model.place_ids[top_idx[filled]],
+            'Prediksi': top_pred[filled].astype(np.float32),
+            'Jumlah_User_Serupa': counts[block_rows].astype(np.int32),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['User_Id', 'Rank', 'Place_Id', 'Prediksi', 'Jumlah_User_Serupa'])
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == '__main__':
+    import argparse
+    import datacache
+
+    parser = argparse.ArgumentParser(description="Hitung rekomendasi semua user (batch) ke file CSV/Parquet")
+    parser.add_argument('--n', type=int, default=10)
+    parser.add_argument('--threshold', type=float, default=0.1)
+    parser.add_argument('--users', type=int, nargs='*', help="User_Id tertentu (default: semua user)")
+    parser.add_argument('--block-size', type=int, default=256)
+    parser.add_argument('--out', default='rekomendasi_batch.csv')
+    args = parser.parse_args()
+
+    df_places, df_ratings, _ = datacache.load_tables(with_description=False)
+    model = RatingModel.from_ratings(df_ratings, place_ids=df_places['Place_Id'])
+    user_ids = args.users if args.users else model.user_ids.tolist()
+    result = recommend_batch(model, user_ids, args.n, args.threshold, args.block_size)
+
+    if args.out.endswith('.parquet'):
+        result.to_parquet(args.out, index=False)
+    else:
+        result.to_csv(args.out, index=False)
+    print(f"{result['User_Id'].nunique()} user, {len(result)} baris -> {args.out}")
@@ -0,0 +1,302 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import datacache
+from engine import RatingModel, block_similarities, top_n_rows
+from item_cf import ItemSimilarity
+from mf import FactorModel
+
+EVAL_PATH = os.path.join('artifacts', 'eval_results.csv')
+# Tempat di data uji dengan rating >= nilai ini dianggap relevan untuk precision/recall/NDCG
+RELEVANT_RATING = 4
+DEFAULT_KS = [5, 10, 20]
+# Grid bawaan; rentang threshold mengikuti slider di projek2/projek4
+DEFAULT_GRID = {
+    'user_cf': {'threshold': [0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9]},
+    'item_cf': {'threshold': [0.0, 0.05, 0.1, 0.2, 0.3, 0.5], 'k': [50]},
+    'mf': {'factors': [8, 16, 32], 'reg': [0.05, 0.1, 0.2]},
+}
+
+_worker = {}
+
+
+# --- PEMBAGIAN DATA ---
+
+def split_ratings(df, method='user', test_size=0.2, leave_k=1, seed=42):
+    """
+    Bagi rating menjadi (train, test).
+    method='random': setiap rating masuk test dengan peluang test_size.
+    method='user': leave-k-out, k rating acak per user masuk test (user dengan <= k rating
+    tetap utuh di train agar tetap punya profil).
+    """
+    df = df.drop_duplicates(['User_Id', 'Place_Id'], keep='last').reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    if method == 'random':
+        test = rng.random(len(df)) < test_size
+    elif method == 'user':
+        order = rng.permutation(len(df))
+        users = pd.Series(df['User_Id'].to_numpy()[order])
+        rank = users.groupby(users).cumcount().to_numpy()
+        counts = users.map(users.value_counts()).to_numpy()
+        test = np.zeros(len(df), dtype=bool)
+        test[order] = (rank < leave_k) & (counts > leave_k)
+    else:
+        raise ValueError(f"Metode split tidak dikenal: {method}")
+    return df[~test].reset_index(drop=True), df[test].reset_index(drop=True)
+
+
+def test_matrix(model, df_test):
+    """Rating uji sebagai CSR dengan baris & kolom model latih; user/tempat di luar model dibuang."""
+    df_test = df_test[df_test['User_Id'].isin(model.user_index) & df_test['Place_Id'].isin(model.place_index)]
+    rows = df_test['User_Id'].map(model.user_index).to_numpy()
+    cols = df_test['Place_Id'].map(model.place_index).to_numpy()
+    return sparse.csr_matrix(
+        (df_test['Place_Ratings'].to_numpy().astype(np.float64), (rows, cols)), shape=model.shape
+    )
+
+
+# --- METRIK ---
+
+def rating_errors(pred, valid, actual, fallback):
+    """
+    Jumlah galat kuadrat & absolut untuk entri uji (indeks baris, kolom, nilai) pada blok prediksi.
+    Entri tanpa prediksi (valid=False) memakai fallback (rata-rata global) dan tidak dihitung coverage.
+    """
+    rows, cols, values = actual
+    covered = valid[rows, cols]
+    err = np.where(covered, pred[rows, cols], fallback) - values
+    return {'sq': float(err @ err), 'abs': float(np.abs(err).sum()), 'n': len(values), 'covered': int(covered.sum())}
+
+
+def ranking_metrics(top_idx, relevant, ks):
+    """
+    Precision/recall/NDCG@k untuk satu blok user sekaligus.
+    top_idx: (n_user, max_k) indeks tempat, -1 = slot kosong; relevant: (n_user, n_place) bool.
+    Hanya user dengan minimal satu tempat relevan yang dihitung. Output: {k: jumlah per metrik}.
+    """
+    n_relevant = relevant.sum(axis=1)
+    users = n_relevant > 0
+    top_idx, relevant, n_relevant = top_idx[users], relevant[users], n_relevant[users]
+    hits = np.take_along_axis(relevant, np.maximum(top_idx, 0), axis=1) & (top_idx >= 0)
+    discounts = 1 / np.log2(np.arange(hits.shape[1]) + 2)
+    ideal = np.cumsum(discounts)
+
+    out = {}
+    for k in ks:
+        n_hits = hits[:, :k].sum(axis=1)
+        dcg = hits[:, :k] @ discounts[:k]
+        idcg = ideal[np.minimum(n_relevant, k) - 1]
+        out[k] = {
+            'precision': float((n_hits / k).sum()),
+            'recall': float((n_hits / n_relevant).sum()),
+            'ndcg': float((dcg / idcg).sum()),
+            'users': int(len(n_hits)),
+        }
+    return out
+
+
+# --- MODEL YANG DIEVALUASI ---
+
+def make_scorer(method, model, params, n_threads=None):
+    """
+    Latih model untuk satu konfigurasi; output: fungsi rows -> (prediksi, valid) berukuran
+    (len(rows), n_tempat), dengan rumus prediksi yang sama seperti di aplikasi.
+    """
+    ratings = model.matrix.astype(np.float64)
+    rated = (model.matrix > 0).astype(np.float64)
+
+    if method == 'user_cf':
+        threshold = params['threshold']
+
+        def score(rows):
+            sims = block_similarities(model, rows)
+            neighbor_sims = sparse.csr_matrix(np.where(sims > threshold, sims, 0))
+            weighted_sum = (neighbor_sims @ ratings).toarray()
+            sim_sum = (neighbor_sims @ rated).toarray()
+            pred = np.zeros_like(weighted_sum)
+            np.divide(weighted_sum, sim_sum, out=pred, where=sim_sum > 0)
+            return pred, sim_sum > 0
+        return score
+
+    if method == 'item_cf':
+        sims = ItemSimilarity.build(model, k=params.get('k', 50)).matrix.astype(np.float64)
+        sims.data[sims.data <= params['threshold']] = 0
+        sims.eliminate_zeros()
+
+        def score(rows):
+            weighted_sum = (ratings[rows] @ sims).toarray()
+            sim_sum = (rated[rows] @ sims).toarray()
+            pred = np.zeros_like(weighted_sum)
+            np.divide(weighted_sum, sim_sum, out=pred, where=sim_sum > 0)
+            return pred, sim_sum > 0
+        return score
+
+    if method == 'mf':
+        factor_model = FactorModel.train(
+            model, factors=params.get('factors', 16), iterations=params.get('iterations', 15),
+            reg=params.get('reg', 0.1), n_threads=n_threads
+        )
+
+        def score(rows):
+            pred = np.clip(factor_model.global_mean + factor_model.user_factors[rows] @ factor_model.item_factors.T, 1, 5)
+            return pred.astype(np.float64), np.ones(pred.shape, dtype=bool)
+        return score
+
+    raise ValueError(f"Metode tidak dikenal: {method}")
+
+
+def evaluate(model, test, method, params, ks=DEFAULT_KS, block_size=256, n_threads=None):
+    """
+    Evaluasi satu konfigurasi pada matriks uji (lihat test_matrix), per blok user uji.
+    Top-k hanya memilih tempat yang belum dirating user di data latih dan punya prediksi.
+    Output: list dict per k (RMSE, MAE, coverage, precision, recall, NDCG, waktu latih & evaluasi).
+    """
+    t0 = time.perf_counter()
+    score = make_scorer(method, model, params, n_threads)
+    fit_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fallback = model.matrix.data.mean() if model.matrix.nnz else 0.0
+    test_users = np.flatnonzero(np.diff(test.indptr))
+    errors = {'sq': 0.0, 'abs': 0.0, 'n': 0, 'covered': 0}
+    ranking = {k: {'precision': 0.0, 'recall': 0.0, 'ndcg': 0.0, 'users': 0} for k in ks}
+
+    for start in range(0, len(test_users), block_size):
+        rows = test_users[start:start + block_size]
+        pred, valid = score(rows)
+        block_test = test[rows].tocoo()
+        for key, value in rating_errors(pred, valid, (block_test.row, block_test.col, block_test.data), fallback).items():
+            errors[key] += value
+
+        candidates = valid & (model.matrix[rows].toarray() == 0)
+        top_idx, _ = top_n_rows(pred, max(ks), candidates)
+        relevant = (test[rows] >= RELEVANT_RATING).toarray()
+        for k, sums in ranking_metrics(top_idx, relevant, ks).items():
+            for key, value in sums.items():
+                ranking[k][key] += value
+    eval_seconds = time.perf_counter() - t0
+
+    n = max(errors['n'], 1)
+    results = []
+    for k in ks:
+        n_users = max(ranking[k]['users'], 1)
+        results.append({
+            'method': method,
+            'params': ', '.join(f"{key}={value}" for key, value in sorted(params.items())),
+            **params,
+            'k': k,
+            'rmse': np.sqrt(errors['sq'] / n),
+            'mae': errors['abs'] / n,
+            'coverage': errors['covered'] / n,
+            'precision': ranking[k]['precision'] / n_users,
+            'recall': ranking[k]['recall'] / n_users,
+            'ndcg': ranking[k]['ndcg'] / n_users,
+            'users': ranking[k]['users'],
+            'fit_s': fit_seconds,
+            'eval_s': eval_seconds,
+        })
+    return results
+
+
+# --- GRID PARAMETER PARALEL ---
+
+def expand_grid(grid):
+    """{'metode': {'param': [nilai, ...]}} -> list (metode, params) untuk setiap kombinasi."""
+    configs = []
+    for method, space in grid.items():
+        keys = sorted(space)
+        for values in itertools.product(*(space[key] for key in keys)):
+            configs.append((method, dict(zip(keys, values))))
+    return configs
+
+
+def _init_worker(df_train, df_test, place_ids):
+    """Setiap proses membangun matriks latih & uji sekali, bukan per konfigurasi."""
+    model = RatingModel.from_ratings(df_train, place_ids=place_ids)
+    _worker.update(model=model, test=test_matrix(model, df_test))
+
+
+def _run_config(method, params, ks, block_size, n_threads):
+    return evaluate(_worker['model'], _worker['test'], method, params, ks, block_size, n_threads)
+
+
+def run_grid(df_train, df_test, configs, place_ids=None, ks=DEFAULT_KS, n_workers=None, block_size=256,
+             progress=None):
+    """
+    Evaluasi semua konfigurasi, paralel antar proses (n_workers=1: di proses ini saja).
+    Output: DataFrame satu baris per (konfigurasi, k), urut seperti configs.
+    """
+    n_workers = n_workers or min(len(configs), os.cpu_count() or 1)
+    # Dalam mode multi-proses ALS memakai satu thread per proses agar core tidak direbutkan
+    n_threads = None if n_workers == 1 else 1
+    initargs = (df_train, df_test, place_ids)
+    results = {}
+
+    if n_workers == 1:
+        _init_worker(*initargs)
+        for done, (method, params) in enumerate(configs, 1):
+            results[done - 1] = _run_config(method, params, ks, block_size, n_threads)
+            if progress:
+                progress(done, len(configs))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=initargs) as pool:
+            futures = {
+                pool.submit(_run_config, method, params, ks, block_size, n_threads): i
+                for i, (method, params) in enumerate(configs)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(configs))
+
+    return pd.DataFrame([row for i in sorted(results) for row in results[i]])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluasi offline user-CF, item-CF & MF pada tourism_rating.csv dengan grid parameter")
+    parser.add_argument('--methods', nargs='+', default=list(DEFAULT_GRID), choices=list(DEFAULT_GRID))
+    parser.add_argument('--split', choices=['user', 'random'], default='user')
+    parser.add_argument('--test-size', type=float, default=0.2, help="porsi test untuk --split random")
+    parser.add_argument('--leave-k', type=int, default=5, help="rating per user untuk --split user")
+    parser.add_argument('--k', type=int, nargs='+', default=DEFAULT_KS, help="cutoff top-k (num_recommendations)")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=None, help="ganti grid threshold user_cf & item_cf")
+    parser.add_argument('--factors', type=int, nargs='+', default=None)
+    parser.add_argument('--reg', type=float, nargs='+', default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=EVAL_PATH)
+    args = parser.parse_args()
+
+    grid = {method: dict(DEFAULT_GRID[method]) for method in args.methods}
+    for method in ('user_cf', 'item_cf'):
+        if method in grid and args.thresholds:
+            grid[method]['threshold'] = args.thresholds
+    if 'mf' in grid:
+        grid['mf'].update({key: value for key, value in (('factors', args.factors), ('reg', args.reg)) if value})
+
+    df_places, df_ratings, _ = datacache.load_tables(with_description=False)
+    df_train, df_test = split_ratings(df_ratings, args.split, args.test_size, args.leave_k, args.seed)
+    print(f"split {args.split}: {len(df_train)} rating latih, {len(df_test)} rating uji")
+
+    configs = expand_grid(grid)
+    table = run_grid(
+        df_train, df_test, configs, place_ids=df_places['Place_Id'], ks=args.k, n_workers=args.workers,
+        progress=lambda done, total: print(f"\r{done}/{total} konfigurasi", end='')
+    )
+    print()
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    table.to_csv(args.out, index=False)
+
+    columns = ['method', 'params', 'k', 'rmse', 'mae', 'coverage', 'precision', 'recall', 'ndcg', 'fit_s', 'eval_s']
+    print(table[columns].round(4).to_string(index=False))
+    best = table.loc[table.groupby(['method', 'k'])['ndcg'].idxmax(), ['method', 'k', 'params', 'ndcg', 'rmse']]
+    print("\nTerbaik per metode (NDCG):")
+    print(best.round(4).to_string(index=False))
+    print(f"hasil -> {args.out}")
@@ -0,0 +1,68 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Jarak lingkaran besar (km) antar titik dalam derajat, ter-broadcast."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class PlaceGeoIndex:
+    """
+    Ball tree (metrik haversine) atas koordinat Lat/Long tempat, dibangun sekali saat load.
+    Query radius & k-terdekat hanya menelusuri simpul pohon yang relevan, bukan semua tempat.
+    Indeks hasil = posisi baris pada DataFrame tempat yang dipakai saat membangun.
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric='haversine')
+
+    @classmethod
+    def from_places(cls, df):
+        return cls(df['Lat'].to_numpy(), df['Long'].to_numpy())
+
+    def within(self, lat, lon, radius_km):
+        """Tempat dalam radius_km dari titik (lat, lon): (indeks, jarak km) urut dari terdekat."""
+        idx, dist = self.tree.query_radius(
+            np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+        )
+        return idx[0], dist[0] * EARTH_RADIUS_KM
+
+    def nearest(self, lat, lon, k=5):
+        """k tempat terdekat dari titik (lat, lon): (indeks, jarak km)."""
+        k = min(k, len(self.lat))
+        dist, idx = self.tree.query(np.radians([[lat, lon]]), k=k)
+        return idx[0], dist[0] * EARTH_RADIUS_KM
+
+    def location(self, place_idx):
+        return self.lat[place_idx], self.lon[place_idx]
+
+    def near_place(self, place_idx, radius_km=None, k=5):
+        """Tempat lain dalam radius_km (atau k terdekat jika radius_km None) dari tempat place_idx."""
+        lat, lon = self.location(place_idx)
+        if radius_km is None:
+            idx, dist = self.nearest(lat, lon, k + 1)
+        else:
+            idx, dist = self.within(lat, lon, radius_km)
+        keep = idx != place_idx
+        return idx[keep], dist[keep]
+
+    def distances(self, idx, lat, lon):
+        """Jarak km dari titik ke tempat-tempat idx saja (mis. kandidat rekomendasi)."""
+        return haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+
+    def restrict(self, idx, scores, lat, lon, radius_km, n=None):
+        """
+        Post-filter daftar rekomendasi (urut menurun) ke tempat dalam radius_km dari titik.
+        Output: (indeks, skor, jarak km), maksimal n baris dengan urutan asli.
+        """
+        idx = np.asarray(idx)
+        dist = self.distances(idx, lat, lon)
+        keep = np.flatnonzero(dist <= radius_km)[:n]
+        return idx[keep], np.asarray(scores)[keep], dist[keep]
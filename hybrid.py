@@ -0,0 +1,68 @@
+import numpy as np
+
+import perf
+from engine import top_n_indices
+
+# Bobot default komponen konten dalam campuran
+CONTENT_WEIGHT = 0.3
+# Kemiripan semu ke rating rata-rata global: tempat yang hanya sedikit mirip dengan tempat
+# yang dirating user tetap dekat rata-rata, bukan langsung bernilai rating tempat itu
+CONTENT_SHRINKAGE = 0.2
+
+
+def content_scores(content_t, user_row, prior, shrinkage=CONTENT_SHRINKAGE):
+    """
+    Skor konten semua tempat untuk satu user (skala rating): rata-rata rating user dibobot
+    kemiripan konten tempat tujuan ke tempat yang dirating, disusutkan ke prior.
+    content_t = transpos tabel kemiripan top-K (CSR tempat x tempat), jadi satu perkalian
+    matriks-vektor sparse untuk semua tempat.
+    """
+    weights = np.zeros((content_t.shape[1], 2))
+    weights[user_row.indices, 0] = user_row.data
+    weights[user_row.indices, 1] = 1
+    weighted_sum, sim_sum = (content_t @ weights).T
+    return (weighted_sum + shrinkage * prior) / (sim_sum + shrinkage)
+
+
+def blend(cf_pred, cf_valid, content_pred, weight=CONTENT_WEIGHT):
+    """(1 - weight) * CF + weight * konten; tempat tanpa prediksi CF memakai skor konten saja."""
+    return np.where(cf_valid, (1 - weight) * cf_pred + weight * content_pred, content_pred)
+
+
+class HybridRecommender:
+    """
+    Campuran prediksi matrix factorization (FactorModel) dan kemiripan konten (ContentModel)
+    dari artefak yang sudah dihitung. Per permintaan hanya ada satu perkalian faktor dan satu
+    perkalian matriks sparse tabel konten, lalu operasi array.
+    Kolom content_matrix harus sama dengan kolom matriks rating (urutan model.place_ids).
+    """
+
+    def __init__(self, factor_model, content_matrix):
+        self.factor_model = factor_model
+        self.content_t = content_matrix.T.tocsr()
+        # Tempat tanpa rating di data latih mendapat faktor nol dari ALS (prediksinya hanya
+        # global mean), jadi tempat itu dinilai dari skor konten saja
+        self.cf_valid = np.any(np.asarray(factor_model.item_factors) != 0, axis=1)
+
+    def scores(self, user_row, weight=CONTENT_WEIGHT, user_idx=None):
+        """Skor campuran semua tempat, atau None jika user belum punya rating."""
+        user_vector = self.factor_model.user_vector(user_row, user_idx)
+        if user_vector is None:
+            return None
+        with perf.stage('prediction') as timer:
+            cf_pred = timer.track(np.clip(self.factor_model.predict(user_vector), 1, 5).astype(np.float64))
+            content_pred = content_scores(self.content_t, user_row, self.factor_model.global_mean)
+            return blend(cf_pred, self.cf_valid, content_pred, weight)
+
+    def recommend(self, user_row, n, weight=CONTENT_WEIGHT, user_idx=None):
+        """
+        Rekomendasi top-n campuran; weight = 0 sama dengan MF saja, 1 hanya konten.
+        Output: (indeks tempat, skor, jumlah rating user) atau None.
+        """
+        pred = self.scores(user_row, weight, user_idx)
+        if pred is None:
+            return None
+        unrated = np.ones(len(pred), dtype=bool)
+        unrated[user_row.indices] = False
+        idx = top_n_indices(pred, n, unrated)
+        return idx, pred[idx], user_row.nnz
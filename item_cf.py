@@ -0,0 +1,72 @@
+import numpy as np
+from scipy import sparse
+
+import perf
+from engine import normalize_rows, top_k_rows, top_n_indices
+
+
+class ItemSimilarity:
+    """
+    Similarity item-item (cosine antar kolom rating) dalam CSR tempat x tempat,
+    hanya top-K tetangga per tempat. Skor seorang user cukup memakai baris
+    tempat-tempat yang pernah ia rating, tidak menyentuh user lain.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+
+    @classmethod
+    def build(cls, model, k=50, min_similarity=0.0, block_size=1024):
+        """Bangun dari RatingModel, per blok baris agar matriks tempat x tempat tidak dibuat utuh."""
+        item_vectors = normalize_rows(model.matrix.T)
+        n_places = item_vectors.shape[0]
+        k = min(k, max(n_places - 1, 0))
+
+        rows, cols, values = [], [], []
+        for start in range(0, n_places, block_size):
+            stop = min(start + block_size, n_places)
+            sims = (item_vectors[start:stop] @ item_vectors.T).toarray()
+            block_rows = np.arange(stop - start)
+            sims[block_rows, start + block_rows] = -np.inf  # Tempat itu sendiri tidak dihitung
+
+            idx, top_sims = top_k_rows(sims, k)
+            keep = top_sims > min_similarity
+            rows.append(np.repeat(start + block_rows, keep.sum(axis=1)))
+            cols.append(idx[keep])
+            values.append(top_sims[keep])
+
+        matrix = sparse.csr_matrix(
+            (np.concatenate(values).astype(np.float32), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_places, n_places)
+        )
+        return cls(matrix)
+
+    def recommend(self, user_row, threshold, n):
+        """
+        Rekomendasi top-n dari satu baris rating user (1 x n_place, CSR).
+        Prediksi = sum(sim * rating) / sum(sim) atas tempat yang sudah dirating user.
+        Output: (indeks tempat, prediksi, jumlah tempat pendukung) atau None.
+        """
+        rated = user_row.indices
+        if len(rated) == 0:
+            return None
+
+        with perf.stage('prediction') as timer:
+            sims = timer.track(self.matrix[rated])
+            sims.data[sims.data <= threshold] = 0
+            sims.eliminate_zeros()
+
+            ratings = user_row.data.astype(np.float64)
+            weighted_sum = np.asarray(ratings @ sims).ravel()
+            sim_sum = np.asarray(np.ones(len(rated)) @ sims).ravel()
+            support = np.asarray(np.ones(len(rated)) @ (sims > 0)).ravel()
+
+        valid = sim_sum > 0
+        valid[rated] = False
+        if not valid.any():
+            return None
+
+        pred = np.zeros_like(weighted_sum)
+        np.divide(weighted_sum, sim_sum, out=pred, where=valid)
+        idx = top_n_indices(pred, n, valid)
+        return idx, pred[idx], support[idx].astype(np.int64)
@@ -0,0 +1,273 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import datacache
+from geo import haversine_km
+from search import PlaceSearch
+
+PACKAGES_PATH = 'package_tourism.csv'
+# Perjalanan dalam kota: jarak garis lurus dikali faktor jalan, kecepatan rata-rata
+DETOUR_FACTOR = 1.3
+SPEED_KMH = 25.0
+# Lama kunjungan untuk tempat tanpa Time_Minutes (median data)
+DEFAULT_VISIT_MINUTES = 60.0
+# Skor minimal pencarian trigram agar nama di paket dianggap tempat yang sama
+PACKAGE_MATCH_MIN = 0.4
+
+
+class Itinerary:
+    """Rencana satu hari: urutan tempat beserta menit tiba, total waktu, biaya & jarak tempuh."""
+
+    def __init__(self, stops, arrive, visit_minutes, travel_km, price):
+        self.stops = stops
+        self.arrive = arrive
+        self.visit_minutes = visit_minutes
+        self.travel_km = travel_km
+        self.price = price
+
+    @property
+    def total_minutes(self):
+        return float(self.arrive[-1] + self.visit_minutes[-1]) if len(self.stops) else 0.0
+
+    @property
+    def total_price(self):
+        return int(self.price.sum())
+
+    def frame(self, place_names):
+        return pd.DataFrame({
+            'Urutan': np.arange(1, len(self.stops) + 1),
+            'Place_Name': np.asarray(place_names, dtype=object)[self.stops],
+            'Tiba_Menit': np.round(self.arrive).astype(int),
+            'Durasi_Menit': np.round(self.visit_minutes).astype(int),
+            'Jarak_km': np.round(self.travel_km, 1),
+            'Price': self.price,
+        })
+
+
+def travel_minutes(km):
+    return km * DETOUR_FACTOR / SPEED_KMH * 60
+
+
+def route_cost(route, dist):
+    return float(dist[route[:-1], route[1:]].sum()) if len(route) > 1 else 0.0
+
+
+def two_opt(route, dist, fixed_start=False):
+    """
+    Perbaiki urutan rute terbuka (tanpa kembali ke awal) dengan 2-opt: balik segmen selama
+    jarak total berkurang. fixed_start menjaga tempat pertama tetap di depan.
+    """
+    route = list(route)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1 if fixed_start else 0, len(route) - 1):
+            for j in range(i + 1, len(route)):
+                before = dist[route[i - 1], route[i]] if i > 0 else 0.0
+                after = dist[route[j], route[j + 1]] if j + 1 < len(route) else 0.0
+                new_before = dist[route[i - 1], route[j]] if i > 0 else 0.0
+                new_after = dist[route[i], route[j + 1]] if j + 1 < len(route) else 0.0
+                if new_before + new_after < before + after - 1e-9:
+                    route[i:j + 1] = route[i:j + 1][::-1]
+                    improved = True
+    return route
+
+
+class ItineraryPlanner:
+    """
+    Penyusun itinerary per kota. Matriks jarak (km, haversine) antar tempat dalam satu kota
+    dihitung sekali saat dibangun, jadi setiap rencana hanya mengindeks matriks kecil.
+    Paket dari package_tourism.csv disimpan sebagai matriks sparse paket x tempat agar bisa
+    diberi skor untuk banyak user sekaligus. Indeks tempat = posisi baris DataFrame tempat.
+    """
+
+    def __init__(self, df_places, df_packages=None):
+        self.place_names = df_places['Place_Name'].to_numpy(dtype=object)
+        self.cities = df_places['City'].astype(str).to_numpy()
+        self.visit_minutes = df_places['Time_Minutes'].fillna(DEFAULT_VISIT_MINUTES).to_numpy(dtype=np.float64)
+        self.prices = df_places['Price'].to_numpy(dtype=np.int64)
+        lat = df_places['Lat'].to_numpy(dtype=np.float64)
+        lon = df_places['Long'].to_numpy(dtype=np.float64)
+
+        self.city_places = {}
+        self.city_distances = {}
+        for city in np.unique(self.cities):
+            idx = np.flatnonzero(self.cities == city)
+            self.city_places[city] = idx
+            self.city_distances[city] = haversine_km(
+                lat[idx, None], lon[idx, None], lat[None, idx], lon[None, idx]
+            ).astype(np.float32)
+        self._local = np.empty(len(self.cities), dtype=np.int64)
+        for idx in self.city_places.values():
+            self._local[idx] = np.arange(len(idx))
+
+        self.packages = None
+        self.package_matrix = None
+        if df_packages is not None:
+            self._load_packages(df_places, df_packages)
+
+    def _load_packages(self, df_places, df_packages):
+        """Cocokkan nama tempat di paket ke baris tempat (nama persis, jika tidak lewat pencarian trigram di kota yang sama)."""
+        name_index = {(city, name): i for i, (city, name) in enumerate(zip(self.cities, self.place_names))}
+        place_search = PlaceSearch.from_places(df_places)
+        place_cols = [c for c in df_packages.columns if c.startswith('Place_Tourism')]
+
+        rows, cols, routes = [], [], []
+        for p, package in enumerate(df_packages.itertuples(index=False)):
+            city = str(package.City)
+            stops = []
+            for name in (getattr(package, c) for c in place_cols):
+                if not isinstance(name, str) or not name.strip(' |'):
+                    continue
+                name = name.strip(' |')
+                i = name_index.get((city, name))
+                if i is None:
+                    idx, scores = place_search.search(name, n=10)
+                    same_city = (self.cities[idx] == city) & (scores >= PACKAGE_MATCH_MIN)
+                    i = int(idx[same_city][0]) if same_city.any() else None
+                if i is not None and i not in stops:
+                    stops.append(i)
+            rows.extend([p] * len(stops))
+            cols.extend(stops)
+            routes.append(self._ordered(city, stops))
+
+        self.packages = df_packages[['Package', 'City']].reset_index(drop=True)
+        self.package_matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(df_packages), len(self.cities))
+        )
+        self.package_routes = routes
+        self.package_minutes = np.array([self._schedule(city, route).total_minutes
+                                         for city, route in zip(self.packages['City'].astype(str), routes)])
+        self.package_prices = np.asarray(self.package_matrix @ self.prices).ravel().astype(np.int64)
+
+    def _ordered(self, city, stops):
+        """Urutan kunjungan terpendek (2-opt) untuk kumpulan tempat, dalam indeks global."""
+        if len(stops) < 3:
+            return list(stops)
+        local = self._local[stops]
+        order = two_opt(range(len(stops)), self.city_distances[city][np.ix_(local, local)])
+        return [stops[i] for i in order]
+
+    def _schedule(self, city, route):
+        route = np.asarray(route, dtype=np.int64)
+        if len(route) == 0:
+            empty = np.empty(0)
+            return Itinerary(route, empty, empty, empty, np.empty(0, dtype=np.int64))
+        local = self._local[route]
+        legs = np.concatenate([[0.0], self.city_distances[city][local[:-1], local[1:]]])
+        visit = self.visit_minutes[route]
+        arrive = np.cumsum(travel_minutes(legs) + np.concatenate([[0.0], visit[:-1]]))
+        return Itinerary(route, arrive, visit, legs, self.prices[route])
+
+    def plan(self, city, scores, time_budget=480, price_budget=None, start=None, exclude=None, max_stops=8):
+        """
+        Rencana satu hari di city dari skor (prediksi rating) semua tempat. Greedy: sisipkan
+        tempat dengan skor per menit tambahan (kunjungan + perjalanan pada posisi sisip termurah)
+        tertinggi selama anggaran waktu (menit) & biaya cukup, lalu 2-opt dan ulangi sampai
+        tidak ada yang muat. start = tempat awal (indeks global), exclude = mask tempat yang dilewati.
+        """
+        places = self.city_places[city]
+        dist = self.city_distances[city].astype(np.float64)
+        minutes = travel_minutes(dist)
+        visit = self.visit_minutes[places]
+        price = self.prices[places]
+        value = np.asarray(scores, dtype=np.float64)[places]
+
+        available = np.isfinite(value) & (visit <= time_budget)
+        if price_budget is not None:
+            available &= price <= price_budget
+        if exclude is not None:
+            available &= ~np.asarray(exclude)[places]
+
+        if start is not None:
+            route = [int(self._local[start])]
+        else:
+            candidates = np.flatnonzero(available)
+            if len(candidates) == 0:
+                return self._schedule(city, [])
+            route = [int(candidates[np.lexsort((candidates, -value[candidates]))[0]])]
+        available[route[0]] = False
+
+        while len(route) < max_stops:
+            used_time = visit[route].sum() + minutes[route[:-1], route[1:]].sum()
+            used_price = price[route].sum()
+            candidates = np.flatnonzero(available)
+            if len(candidates) == 0:
+                break
+
+            # Tambahan waktu tempuh untuk setiap posisi sisip (setelah route[i]) x kandidat
+            r = np.asarray(route)
+            added = np.vstack([
+                minutes[np.ix_(r[:-1], candidates)] + minutes[np.ix_(candidates, r[1:])].T
+                - minutes[r[:-1], r[1:]][:, None],
+                minutes[r[-1], candidates][None, :],
+            ])
+            if start is None:
+                added = np.vstack([minutes[candidates, r[0]][None, :], added])
+            position = added.argmin(axis=0)
+            extra = added[position, np.arange(len(candidates))] + visit[candidates]
+
+            fits = used_time + extra <= time_budget
+            if price_budget is not None:
+                fits &= used_price + price[candidates] <= price_budget
+            if not fits.any():
+                break
+            ratio = np.where(fits, value[candidates] / np.maximum(extra, 1.0), -np.inf)
+            best = int(np.argmax(ratio))
+            insert_at = int(position[best]) + (0 if start is None else 1)
+            route.insert(insert_at, int(candidates[best]))
+            available[candidates[best]] = False
+            if len(route) >= 4:
+                route = two_opt(route, dist, fixed_start=start is not None)
+
+        return self._schedule(city, places[route])
+
+    def score_packages(self, scores):
+        """
+        Rata-rata prediksi rating tempat dalam setiap paket untuk satu user (n_place,) atau
+        banyak user sekaligus (n_user x n_place), dengan satu perkalian matriks sparse.
+        Output: (n_package,) atau (n_user x n_package).
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        sizes = np.maximum(np.asarray(self.package_matrix.sum(axis=1)).ravel(), 1)
+        return (self.package_matrix @ scores.T).T / sizes
+
+    def package_frame(self, scores, city=None, n=10):
+        """Paket terbaik untuk satu user: skor, isi paket (urut 2-opt), lama & biaya total."""
+        package_scores = self.score_packages(scores)
+        idx = np.arange(len(package_scores)) if city is None else np.flatnonzero(self.packages['City'].astype(str) == city)
+        idx = idx[np.lexsort((idx, -package_scores[idx]))][:n]
+        return pd.DataFrame({
+            'Package': self.packages['Package'].to_numpy()[idx],
+            'City': self.packages['City'].astype(str).to_numpy()[idx],
+            'Skor': np.round(package_scores[idx], 2),
+            'Rute': [' → '.join(self.place_names[self.package_routes[i]]) for i in idx],
+            'Total_Menit': np.round(self.package_minutes[idx]).astype(int),
+            'Total_Harga': self.package_prices[idx],
+        })
+
+
+def load_planner(df_places=None, packages_path=PACKAGES_PATH):
+    if df_places is None:
+        df_places = datacache.load_tables(with_description=False)[0]
+    return ItineraryPlanner(df_places, pd.read_csv(packages_path))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Susun itinerary satu hari dari rating rata-rata tempat")
+    parser.add_argument('--city', default='Yogyakarta')
+    parser.add_argument('--minutes', type=float, default=480)
+    parser.add_argument('--budget', type=int, default=None, help="anggaran biaya tiket (Rp)")
+    parser.add_argument('--max-stops', type=int, default=8)
+    args = parser.parse_args()
+
+    df_places = datacache.load_tables(with_description=False)[0]
+    planner = load_planner(df_places)
+    scores = df_places['Rating'].to_numpy(dtype=np.float64)
+    itinerary = planner.plan(args.city, scores, args.minutes, args.budget, max_stops=args.max_stops)
+    print(itinerary.frame(planner.place_names).to_string(index=False))
+    print(f"Total {itinerary.total_minutes:.0f} menit, Rp {itinerary.total_price:,}")
+    print(planner.package_frame(scores, city=args.city, n=5).to_string(index=False))
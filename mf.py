@@ -0,0 +1,192 @@
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import perf
+from engine import RatingModel, top_n_indices
+
+MF_PATH = os.path.join('artifacts', 'mf_factors.npz')
+
+
+class FactorModel:
+    """
+    Model latent factor (ALS) untuk rating eksplisit: prediksi = global_mean + u . v.
+    Faktor disimpan float32 agar ringkas di disk dan di memori.
+    """
+
+    def __init__(self, user_factors, item_factors, global_mean, reg, fingerprint):
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.global_mean = float(global_mean)
+        self.reg = float(reg)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def train(cls, model, factors=16, iterations=15, reg=0.1, n_threads=None, seed=42, verbose=False):
+        """
+        Latih dengan Alternating Least Squares: bergantian menyelesaikan faktor user
+        (faktor tempat tetap) lalu faktor tempat (faktor user tetap), per blok baris
+        secara paralel.
+        """
+        rng = np.random.default_rng(seed)
+        ratings = model.matrix.astype(np.float64)
+        global_mean = ratings.data.mean() if ratings.nnz else 0.0
+        ratings.data -= global_mean
+        ratings_t = ratings.T.tocsr()
+
+        n_users, n_places = ratings.shape
+        user_factors = rng.normal(0, 0.1, (n_users, factors))
+        item_factors = rng.normal(0, 0.1, (n_places, factors))
+
+        for iteration in range(iterations):
+            user_factors = solve_factors(ratings, item_factors, reg, n_threads)
+            item_factors = solve_factors(ratings_t, user_factors, reg, n_threads)
+            if verbose:
+                print(f"iterasi {iteration + 1}: RMSE train = {train_rmse(ratings, user_factors, item_factors):.4f}")
+
+        return cls(
+            user_factors.astype(np.float32), item_factors.astype(np.float32),
+            global_mean, reg, model.fingerprint()
+        )
+
+    def predict(self, user_vector):
+        """Prediksi semua tempat untuk satu vektor faktor user (satu perkalian dot)."""
+        return self.global_mean + self.item_factors @ user_vector
+
+    def fold_in(self, user_row):
+        """
+        Faktor untuk user baru (1 x n_place, CSR) dengan least squares terhadap
+        faktor tempat yang tetap, tanpa melatih ulang.
+        """
+        item_vectors = self.item_factors[user_row.indices].astype(np.float64)
+        residual = user_row.data.astype(np.float64) - self.global_mean
+        gram = item_vectors.T @ item_vectors + self.reg * max(len(residual), 1) * np.eye(item_vectors.shape[1])
+        return np.linalg.solve(gram, item_vectors.T @ residual)
+
+    def user_vector(self, user_row, user_idx=None):
+        """
+        Faktor user: baris user_idx jika user ada di data latih, jika tidak dihitung dengan
+        fold-in dari baris ratingnya. None jika user belum punya rating.
+        """
+        if user_idx is not None:
+            return self.user_factors[user_idx]
+        if not user_row.nnz:
+            return None
+        with perf.stage('fold_in'):
+            return self.fold_in(user_row)
+
+    def recommend(self, user_row, n, user_idx=None):
+        """
+        Rekomendasi top-n dari baris rating user (lihat user_vector).
+        Output: (indeks tempat, prediksi, jumlah rating user) atau None.
+        """
+        user_vector = self.user_vector(user_row, user_idx)
+        if user_vector is None:
+            return None
+
+        with perf.stage('prediction') as timer:
+            pred = timer.track(np.clip(self.predict(user_vector), 1, 5).astype(np.float64))
+            unrated = np.ones(len(pred), dtype=bool)
+            unrated[user_row.indices] = False
+            idx = top_n_indices(pred, n, unrated)
+        return idx, pred[idx], user_row.nnz
+
+    def save(self, path=MF_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(
+            path,
+            user_factors=self.user_factors,
+            item_factors=self.item_factors,
+            global_mean=self.global_mean,
+            reg=self.reg,
+            fingerprint=self.fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path=MF_PATH, model=None):
+        """Muat faktor dari disk; None jika file tidak ada atau dilatih dari data rating lain."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            factor_model = cls(
+                data['user_factors'],
+                data['item_factors'],
+                data['global_mean'],
+                data['reg'],
+                str(data['fingerprint']),
+            )
+        if model is not None and factor_model.fingerprint != model.fingerprint():
+            return None
+        return factor_model
+
+
+def solve_factors(ratings, fixed, reg, n_threads=None, block_size=2048):
+    """
+    Selesaikan (F_i^T F_i + reg * n_i * I) x_i = F_i^T r_i untuk setiap baris i sekaligus.
+    Matriks Gram per baris dijumlahkan dengan reduceat, lalu diselesaikan dengan
+    np.linalg.solve versi batch. Blok baris dikerjakan paralel (NumPy melepas GIL).
+    """
+    n_rows = ratings.shape[0]
+    n_factors = fixed.shape[1]
+    out = np.zeros((n_rows, n_factors))
+    identity = np.eye(n_factors)
+
+    def solve_block(start):
+        stop = min(start + block_size, n_rows)
+        indptr = ratings.indptr[start:stop + 1]
+        lo, hi = indptr[0], indptr[-1]
+        counts = np.diff(indptr)
+        gram = reg * np.maximum(counts, 1)[:, None, None] * identity
+        rhs = np.zeros((stop - start, n_factors))
+
+        nonempty = counts > 0
+        if hi > lo:
+            vectors = fixed[ratings.indices[lo:hi]]
+            offsets = (indptr[:-1] - lo)[nonempty]
+            gram[nonempty] += np.add.reduceat(vectors[:, :, None] * vectors[:, None, :], offsets, axis=0)
+            rhs[nonempty] = np.add.reduceat(vectors * ratings.data[lo:hi, None], offsets, axis=0)
+        out[start:stop] = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        list(pool.map(solve_block, range(0, n_rows, block_size)))
+    return out
+
+
+def train_rmse(ratings, user_factors, item_factors):
+    """RMSE pada entri yang dirating (ratings sudah dikurangi global mean)."""
+    rows = np.repeat(np.arange(ratings.shape[0]), np.diff(ratings.indptr))
+    pred = np.einsum('ij,ij->i', user_factors[rows], item_factors[ratings.indices])
+    return float(np.sqrt(np.mean((ratings.data - pred) ** 2)))
+
+
+def load_or_train(model, path=MF_PATH, **train_kwargs):
+    """Pakai faktor di disk jika cocok dengan model, jika tidak latih ulang dan simpan."""
+    factor_model = FactorModel.load(path, model)
+    if factor_model is None:
+        factor_model = FactorModel.train(model, **train_kwargs)
+        factor_model.save(path)
+    return factor_model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Latih model matrix factorization (ALS) dari tourism_rating.csv")
+    parser.add_argument('--ratings', default='tourism_rating.csv')
+    parser.add_argument('--places', default='tourism_with_id.csv')
+    parser.add_argument('--factors', type=int, default=16)
+    parser.add_argument('--iterations', type=int, default=15)
+    parser.add_argument('--reg', type=float, default=0.1)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--out', default=MF_PATH)
+    args = parser.parse_args()
+
+    df_places = pd.read_csv(args.places)
+    model = RatingModel.from_ratings(pd.read_csv(args.ratings), place_ids=df_places['Place_Id'])
+    factor_model = FactorModel.train(
+        model, factors=args.factors, iterations=args.iterations, reg=args.reg,
+        n_threads=args.threads, verbose=True
+    )
+    factor_model.save(args.out)
+    print(f"{model.shape[0]} user x {model.shape[1]} tempat, {args.factors} faktor, disimpan ke {args.out}")
@@ -0,0 +1,157 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine import RatingModel, top_k_rows
+
+NEIGHBORS_PATH = os.path.join('artifacts', 'user_neighbors.npz')
+
+
+class NeighborIndex:
+    """
+    Tabel top-K tetangga untuk setiap user: indeks baris tetangga (int32) dan
+    kemiripannya (float32), urut menurun. Slot kosong berisi -1 / 0.
+    """
+
+    def __init__(self, neighbor_idx, neighbor_sims, min_similarity, fingerprint):
+        self.neighbor_idx = neighbor_idx
+        self.neighbor_sims = neighbor_sims
+        self.min_similarity = float(min_similarity)
+        self.fingerprint = fingerprint
+
+    @property
+    def k(self):
+        return self.neighbor_idx.shape[1]
+
+    @classmethod
+    def build(cls, model, k=256, min_similarity=0.05, block_size=1024):
+        """
+        Hitung top-K tetangga per user dari baris ternormalisasi model, per blok baris
+        agar matriks similarity N x N tidak pernah dibuat utuh.
+        Hanya tetangga dengan kemiripan > min_similarity yang disimpan.
+        """
+        normalized = model.normalized
+        n_users = normalized.shape[0]
+        k = min(k, max(n_users - 1, 0))
+        neighbor_idx = np.full((n_users, k), -1, dtype=np.int32)
+        neighbor_sims = np.zeros((n_users, k), dtype=np.float32)
+
+        for start in range(0, n_users, block_size):
+            stop = min(start + block_size, n_users)
+            sims = (normalized[start:stop] @ normalized.T).toarray()
+            rows = np.arange(stop - start)
+            sims[rows, start + rows] = -np.inf  # Jangan jadikan user tetangga dirinya sendiri
+
+            idx, top_sims = top_k_rows(sims, k)
+            valid = top_sims > min_similarity
+            neighbor_idx[start:stop] = np.where(valid, idx, -1)
+            neighbor_sims[start:stop] = np.where(valid, top_sims, 0)
+
+        return cls(neighbor_idx, neighbor_sims, min_similarity, model.fingerprint())
+
+    def update(self, model, changed_rows, block_size=256):
+        """
+        Tabel baru untuk model yang baris changed_rows-nya berubah (lihat RatingModel.with_ratings),
+        tanpa menghitung ulang semua pasangan. Baris yang berubah dihitung ulang penuh; user lain
+        hanya digabung ulang jika tabelnya memuat user yang berubah atau kemiripan barunya masuk top-K.
+        User yang terlempar dari top-K tidak diganti tetangga berikutnya, jadi slotnya bisa kosong
+        atau diisi user berubah yang kemiripannya lebih rendah, sampai dibangun ulang penuh.
+        """
+        normalized = model.normalized
+        n_users, n_old = normalized.shape[0], self.neighbor_idx.shape[0]
+        k = self.k
+        changed = np.unique(np.asarray(changed_rows, dtype=np.int64))
+
+        neighbor_idx = np.full((n_users, k), -1, dtype=np.int32)
+        neighbor_sims = np.zeros((n_users, k), dtype=np.float32)
+        neighbor_idx[:n_old] = self.neighbor_idx
+        neighbor_sims[:n_old] = self.neighbor_sims
+        # Entri lama yang menunjuk user berubah dibuang, nilai barunya digabung di bawah
+        stale = np.isin(neighbor_idx, changed)
+        neighbor_idx[stale] = -1
+        neighbor_sims[stale] = 0
+        floor = np.where(neighbor_idx[:, -1] >= 0, neighbor_sims[:, -1], self.min_similarity) if k else None
+
+        for start in range(0, len(changed), block_size):
+            block = changed[start:start + block_size]
+            sims = (normalized[block] @ normalized.T).toarray()
+            sims[np.arange(len(block)), block] = -np.inf
+            sims_t = sims.T
+
+            affected = np.flatnonzero(stale.any(axis=1) | (sims_t > floor[:, None]).any(axis=1)) if k else []
+            if len(affected):
+                current = np.where(neighbor_idx[affected] >= 0, neighbor_sims[affected], -np.inf)
+                cand_sims = np.concatenate([current, sims_t[affected]], axis=1)
+                cand_idx = np.concatenate([neighbor_idx[affected], np.broadcast_to(block, (len(affected), len(block)))], axis=1)
+                pos, top_sims = top_k_rows(cand_sims, k)
+                valid = top_sims > self.min_similarity
+                neighbor_idx[affected] = np.where(valid, np.take_along_axis(cand_idx, pos, axis=1), -1)
+                neighbor_sims[affected] = np.where(valid, top_sims, 0)
+
+            # Baris user yang berubah: hitung ulang penuh terhadap semua user
+            idx, top_sims = top_k_rows(sims, k)
+            valid = top_sims > self.min_similarity
+            neighbor_idx[block] = np.where(valid, idx, -1)
+            neighbor_sims[block] = np.where(valid, top_sims, 0)
+
+        return NeighborIndex(neighbor_idx, neighbor_sims, self.min_similarity, model.fingerprint())
+
+    def neighbors(self, user_idx, threshold):
+        """Tetangga user_idx dengan kemiripan > threshold: (indeks baris, kemiripan)."""
+        sims = self.neighbor_sims[user_idx]
+        # Tabel urut menurun, jadi cukup cari batasnya
+        count = int(np.count_nonzero((sims > threshold) & (self.neighbor_idx[user_idx] >= 0)))
+        return self.neighbor_idx[user_idx, :count], sims[:count].astype(np.float64)
+
+    def save(self, path=NEIGHBORS_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(
+            path,
+            neighbor_idx=self.neighbor_idx,
+            neighbor_sims=self.neighbor_sims,
+            min_similarity=self.min_similarity,
+            fingerprint=self.fingerprint,
+        )
+
+    @classmethod
+    def load(cls, path=NEIGHBORS_PATH, model=None):
+        """Muat tabel dari disk; None jika file tidak ada atau dibangun dari data rating lain."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            index = cls(
+                data['neighbor_idx'],
+                data['neighbor_sims'],
+                data['min_similarity'],
+                str(data['fingerprint']),
+            )
+        if model is not None and index.fingerprint != model.fingerprint():
+            return None
+        return index
+
+
+def load_or_build(model, path=NEIGHBORS_PATH, **build_kwargs):
+    """Pakai tabel di disk jika cocok dengan model, jika tidak bangun ulang dan simpan."""
+    index = NeighborIndex.load(path, model)
+    if index is None:
+        index = NeighborIndex.build(model, **build_kwargs)
+        index.save(path)
+    return index
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bangun tabel top-K tetangga user dari tourism_rating.csv")
+    parser.add_argument('--ratings', default='tourism_rating.csv')
+    parser.add_argument('--places', default='tourism_with_id.csv')
+    parser.add_argument('--k', type=int, default=256)
+    parser.add_argument('--min-similarity', type=float, default=0.05)
+    parser.add_argument('--out', default=NEIGHBORS_PATH)
+    args = parser.parse_args()
+
+    df_places = pd.read_csv(args.places)
+    model = RatingModel.from_ratings(pd.read_csv(args.ratings), place_ids=df_places['Place_Id'])
+    index = NeighborIndex.build(model, k=args.k, min_similarity=args.min_similarity)
+    index.save(args.out)
+    print(f"{model.shape[0]} user, k={index.k}, disimpan ke {args.out}")
@@ -0,0 +1,127 @@
+import contextvars
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# File metrik JSON lines; diisi lewat environment agar bisa dipakai tanpa mengubah kode app
+METRICS_PATH = os.environ.get('REKOMENDASI_PERF_LOG')
+
+logger = logging.getLogger('rekomendasi.perf')
+
+_active = contextvars.ContextVar('perf_recorder', default=None)
+
+
+def describe(obj):
+    """Ukuran objek yang dicatat per tahap: shape, nnz (sparse) dan byte yang dialokasikan."""
+    if sparse.issparse(obj):
+        nbytes = sum(getattr(obj, attr).nbytes for attr in ('data', 'indices', 'indptr') if hasattr(obj, attr))
+        return {'shape': 'x'.join(map(str, obj.shape)), 'nnz': int(obj.nnz), 'bytes': int(nbytes)}
+    if isinstance(obj, np.ndarray):
+        return {'shape': 'x'.join(map(str, obj.shape)), 'bytes': int(obj.nbytes)}
+    if isinstance(obj, pd.DataFrame):
+        return {'shape': 'x'.join(map(str, obj.shape)), 'bytes': int(obj.memory_usage(index=True).sum())}
+    return {}
+
+
+class _NullStage:
+    """Tahap saat instrumentasi mati: tidak mengukur dan tidak mencatat apa pun."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def track(self, obj):
+        return obj
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.record = {'stage': name}
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['ms'] = 1000 * (time.perf_counter() - self._start)
+        self.recorder.records.append(self.record)
+        return False
+
+    def track(self, obj):
+        """Catat shape/nnz/byte objek hasil tahap ini; byte dijumlahkan jika dipanggil berulang."""
+        info = describe(obj)
+        info['bytes'] = info.get('bytes', 0) + self.record.get('bytes', 0)
+        self.record.update(info)
+        return obj
+
+
+class PerfRecorder:
+    """
+    Catatan durasi & ukuran data per tahap. Saat enabled=False, stage() mengembalikan
+    objek kosong yang sama sehingga biaya di hot path hanya satu pemanggilan fungsi.
+    """
+
+    def __init__(self, enabled=False, metrics_path=METRICS_PATH):
+        self.enabled = enabled
+        self.metrics_path = metrics_path
+        self.records = []
+        self._flushed = 0
+
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def activate(self):
+        """Jadikan recorder ini tujuan perf.stage() di modul lain (per thread/sesi Streamlit)."""
+        return _Activation(self)
+
+    def reset(self):
+        self.records = []
+        self._flushed = 0
+
+    def table(self):
+        return pd.DataFrame(self.records, columns=['stage', 'ms', 'shape', 'nnz', 'bytes'])
+
+    def flush(self, **context):
+        """Kirim catatan yang belum dikirim sebagai log terstruktur dan (jika diatur) ke file metrik."""
+        pending = self.records[self._flushed:]
+        self._flushed = len(self.records)
+        if not pending:
+            return
+        lines = [json.dumps({**context, **record}, default=str) for record in pending]
+        for line in lines:
+            logger.info(line)
+        if self.metrics_path:
+            with open(self.metrics_path, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+
+
+class _Activation:
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def __enter__(self):
+        self._token = _active.set(self.recorder)
+        return self.recorder
+
+    def __exit__(self, *exc):
+        _active.reset(self._token)
+        return False
+
+
+def stage(name):
+    """Tahap pada recorder yang sedang aktif; tanpa recorder aktif tidak ada yang diukur."""
+    recorder = _active.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return recorder.stage(name)
@@ -1,6 +1,14 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
+from engine import RatingModel, recommend_for_user, recommend_for_new_user
+from neighbors import NeighborIndex
+from item_cf import ItemSimilarity
+from datagen import RatingGenerator
+from stats import PlaceStats
+from search import PlaceSearch
+import perf
+import shared
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -73,43 +81,86 @@ INDONESIA_TOURISM_PLACES = [
 # Fungsi generate data dummy dengan nama tempat asli
 def generate_tourism_data(num_users=100):
     """Generate dummy tourism rating data"""
-    np.random.seed(42)
+    # Setiap user rating 15-30 tempat secara random, beberapa tempat populer dapat rating lebih tinggi
+    popular_places = ["Pantai Kuta, Bali", "Candi Borobudur, Magelang", 
+                      "Raja Ampat, Papua Barat", "Bromo Tengger Semeru National Park"]
+    generator = RatingGenerator(
+        num_users,
+        place_ids=np.arange(len(INDONESIA_TOURISM_PLACES)),
+        min_ratings=15,
+        max_ratings=30,
+        popular=[INDONESIA_TOURISM_PLACES.index(place) for place in popular_places],
+        seed=42
+    )
+    data = generator.to_frame()
     
-    data = []
-    user_ids = list(range(1, num_users + 1))
-    
-    for user_id in user_ids:
-        # Setiap user rating 15-30 tempat secara random
-        num_ratings = np.random.randint(15, 31)
-        rated_places = np.random.choice(
-            INDONESIA_TOURISM_PLACES, 
-            size=num_ratings, 
-            replace=False
+    return pd.DataFrame({
+        'User_Id': data['User_Id'],
+        'Place_Name': np.asarray(INDONESIA_TOURISM_PLACES, dtype=object)[data['Place_Id']],
+        'Place_Ratings': data['Place_Ratings']
+    })
+
+@st.cache_resource
+def load_place_search():
+    # Indeks trigram nama tempat dibangun sekali per proses, dipakai semua sesi
+    return PlaceSearch(INDONESIA_TOURISM_PLACES)
+
+def build_rating_model(ratings_df):
+    """Bangun model sparse dengan Place_Name dikodekan sebagai indeks INDONESIA_TOURISM_PLACES"""
+    place_codes = pd.Categorical(ratings_df['Place_Name'], categories=INDONESIA_TOURISM_PLACES).codes
+    return RatingModel.from_ratings(
+        ratings_df.assign(Place_Id=place_codes),
+        place_ids=np.arange(len(INDONESIA_TOURISM_PLACES))
+    )
+
+def ratings_from_model(rating_model):
+    """DataFrame rating (User_Id, Place_Name, Place_Ratings) yang dibaca dari matriks model, tanpa salinan data demo"""
+    matrix = rating_model.matrix
+    return pd.DataFrame({
+        'User_Id': np.repeat(rating_model.user_ids, np.diff(matrix.indptr)),
+        'Place_Name': pd.Categorical.from_codes(matrix.indices, categories=INDONESIA_TOURISM_PLACES),
+        'Place_Ratings': matrix.data,
+    })
+
+@st.cache_resource
+def startup_perf():
+    # Data demo & model dibangun sekali per proses, jadi tahapnya selalu dicatat
+    return perf.PerfRecorder(enabled=True)
+
+@st.cache_resource
+def load_demo_data():
+    # Data demo deterministik (seed 42) dibangun sekali per host, bukan per sesi: matriks rating,
+    # tabel tetangga & similarity item ditulis ke artifacts/shared sebagai file read-only yang
+    # di-memory-map, jadi semua sesi & proses server berbagi halaman memori yang sama
+    key = shared.source_key([], 'projek2', 100, 42, INDONESIA_TOURISM_PLACES)
+    with perf.stage('generate_data') as timer:
+        rating_model = shared.shared_model(
+            key, lambda: build_rating_model(generate_tourism_data()), name='demo_rating_model'
         )
-        
-        for place in rated_places:
-            # Generate rating dengan distribusi normal
-            base_rating = np.random.normal(3.5, 1.2)
-            
-            # Beberapa tempat populer dapat rating lebih tinggi
-            popular_places = ["Pantai Kuta, Bali", "Candi Borobudur, Magelang", 
-                            "Raja Ampat, Papua Barat", "Bromo Tengger Semeru National Park"]
-            if place in popular_places:
-                base_rating += np.random.uniform(0.5, 1.0)
-            
-            rating = int(np.clip(round(base_rating), 1, 5))
-            
-            data.append({
-                'User_Id': user_id,
-                'Place_Name': place,
-                'Place_Ratings': rating
-            })
-    
-    return pd.DataFrame(data)
+        timer.track(rating_model.matrix)
+    with perf.stage('neighbor_index') as timer:
+        neighbor_index = shared.shared_neighbors(
+            rating_model, lambda: NeighborIndex.build(rating_model), name='demo_user_neighbors'
+        )
+        timer.track(neighbor_index.neighbor_idx)
+    with perf.stage('item_similarity') as timer:
+        item_similarity = shared.shared_item_similarity(
+            rating_model, lambda: ItemSimilarity.build(rating_model), name='demo_item_similarity'
+        )
+        timer.track(item_similarity.matrix)
+    with perf.stage('place_stats'):
+        # Statistik Tab 3 dihitung sekali per versi data, bukan setiap rerun
+        place_stats = PlaceStats.build(rating_model)
+    return ratings_from_model(rating_model), rating_model, neighbor_index, item_similarity, place_stats
+
+startup_log = startup_perf()
+with startup_log.activate():
+    all_ratings, rating_model, neighbor_index, item_similarity, place_stats = load_demo_data()
+startup_log.flush(app='projek2', phase='startup')
 
-# Inisialisasi session state
-if 'all_ratings' not in st.session_state:
-    st.session_state.all_ratings = generate_tourism_data()
+# Inisialisasi session state: hanya data milik sesi (rating user baru & hasil terakhir)
+if 'perf_log' not in st.session_state:
+    st.session_state.perf_log = perf.PerfRecorder()
 if 'new_user_ratings' not in st.session_state:
     st.session_state.new_user_ratings = {}
 if 'recommendations' not in st.session_state:
@@ -117,6 +168,14 @@ if 'recommendations' not in st.session_state:
 
 # Sidebar
 st.sidebar.header("⚙️ Pengaturan Sistem")
+cf_mode = st.sidebar.radio("Metode CF:", ["User-Based", "Item-Based"])
+# Pada mode item-based, jumlah pendukung = tempat yang dirating user dan mirip dengan rekomendasi
+support_label = "User Serupa" if cf_mode == "User-Based" else "Tempat Pendukung"
+show_perf = st.sidebar.checkbox("Tampilkan panel performa", value=False)
+
+# Tahap per klik hanya diukur jika panel aktif atau file metrik diatur (REKOMENDASI_PERF_LOG)
+request_log = st.session_state.perf_log
+request_log.enabled = show_perf or bool(request_log.metrics_path)
 
 # Main tabs
 tab1, tab2, tab3 = st.tabs(["🎯 Dapatkan Rekomendasi", "⭐ Input Rating Baru", "📊 Data & Statistik"])
@@ -151,15 +210,15 @@ with tab1:
             user_type = "new"
             
         else:  # User yang sudah ada
-            existing_users = st.session_state.all_ratings['User_Id'].unique()
+            existing_users = all_ratings['User_Id'].unique()
             selected_user = st.selectbox(
                 "Pilih ID User:",
                 options=existing_users[:50]  # Batasi tampilan
             )
             
             # Tampilkan rating user terpilih
-            user_ratings = st.session_state.all_ratings[
-                st.session_state.all_ratings['User_Id'] == selected_user
+            user_ratings = all_ratings[
+                all_ratings['User_Id'] == selected_user
             ]
             
             if not user_ratings.empty:
@@ -179,161 +238,115 @@ with tab1:
         st.subheader("Hasil Rekomendasi")
         
         if st.button("🚀 Generate Rekomendasi", type="primary", use_container_width=True):
-            with st.spinner("Mencari rekomendasi terbaik untuk Anda..."):
+            request_log.reset()
+            with st.spinner("Mencari rekomendasi terbaik untuk Anda..."), request_log.activate():
                 
                 # Siapkan data
                 if user_type == "new" and st.session_state.new_user_ratings:
-                    # Gabungkan rating user baru dengan data existing
-                    new_ratings_list = []
-                    for place, rating in st.session_state.new_user_ratings.items():
-                        new_ratings_list.append({
-                            'User_Id': 9999,  # ID khusus untuk user baru
-                            'Place_Name': place,
-                            'Place_Ratings': rating
-                        })
-                    
-                    temp_df = pd.concat([
-                        st.session_state.all_ratings,
-                        pd.DataFrame(new_ratings_list)
-                    ], ignore_index=True)
-                    
-                    target_user = 9999
+                    # Fold-in rating user baru terhadap vektor user existing yang sudah di-cache
+                    place_index = {place: i for i, place in enumerate(INDONESIA_TOURISM_PLACES)}
+                    new_ratings = {
+                        place_index[place]: rating
+                        for place, rating in st.session_state.new_user_ratings.items()
+                    }
+                    target_user = 9999  # ID khusus untuk user baru
                     
                 elif user_type == "existing":
-                    temp_df = st.session_state.all_ratings
                     target_user = selected_user_id
                 
                 else:
                     st.error("Silakan beri rating terlebih dahulu di Tab 2 ⭐")
                     st.stop()
                 
-                # Buat user-item matrix
-                user_item_matrix = temp_df.pivot_table(
-                    index='User_Id',
-                    columns='Place_Name',
-                    values='Place_Ratings',
-                    fill_value=0
-                )
-                
-                # Hitung similarity
-            def manual_cosine_similarity(user_matrix):
-    """
-    Menghitung cosine similarity matrix manual tanpa scikit-learn
-    Input: numpy array atau pandas DataFrame
-    Output: similarity matrix (numpy array)
-    """
-    # Normalisasi: bagi setiap vektor dengan norm-nya
-    norms = np.sqrt(np.sum(user_matrix**2, axis=1))
-    norms[norms == 0] = 1  # Hindari pembagian nol
-    normalized = user_matrix / norms[:, np.newaxis]
-    
-    # Hitung similarity (dot product antar vektor ternormalisasi)
-    similarity = np.dot(normalized, normalized.T)
-    return similarity
-
-                user_similarity = manual_cosine_similarity(user_item_matrix.values)
-                user_similarity_df = pd.DataFrame(
-                    user_similarity,
-                    index=user_item_matrix.index,
-                    columns=user_item_matrix.index
-                )
-                
                 # Fungsi rekomendasi
                 def get_recommendations(user_id, n=10):
-                    if user_id not in user_similarity_df.index:
+                    # Cari user/tempat similar & hitung prediksi rating
+                    if user_id == 9999:
+                        user_row = rating_model.make_row(new_ratings)
+                    elif user_id in rating_model.user_index:
+                        user_row = rating_model.matrix[rating_model.user_index[user_id]]
+                    else:
                         return None
                     
-                    # Cari user similar
-                    similar_users = user_similarity_df[user_id].sort_values(ascending=False)
-                    similar_users = similar_users[similar_users > similarity_threshold]
-                    similar_users = similar_users.drop(user_id, errors='ignore')
+                    if cf_mode == "Item-Based":
+                        result = item_similarity.recommend(user_row, similarity_threshold, n)
+                    elif user_id == 9999:
+                        result = recommend_for_new_user(rating_model, new_ratings, similarity_threshold, n)
+                    else:
+                        result = recommend_for_user(
+                            rating_model, rating_model.user_index[user_id], similarity_threshold, n,
+                            neighbor_index=neighbor_index
+                        )
                     
-                    if len(similar_users) == 0:
+                    if result is None:
                         return None
                     
-                    # Tempat yang belum di-rating oleh user
-                    user_rated = set(temp_df[temp_df['User_Id'] == user_id]['Place_Name'])
-                    all_places = set(temp_df['Place_Name'])
-                    unrated_places = list(all_places - user_rated)
-                    
-                    # Hitung prediksi rating
-                    predictions = []
-                    for place in unrated_places:
-                        weighted_sum = 0
-                        similarity_sum = 0
-                        
-                        for sim_user, similarity in similar_users.items():
-                            user_rating = user_item_matrix.loc[sim_user, place]
-                            if user_rating > 0:
-                                weighted_sum += similarity * user_rating
-                                similarity_sum += similarity
-                        
-                        if similarity_sum > 0:
-                            predicted_rating = weighted_sum / similarity_sum
-                            predictions.append({
-                                'Tempat_Wisata': place,
-                                'Prediksi_Rating': predicted_rating,
-                                'Jumlah_User_Serupa': len(similar_users)
-                            })
-                    
-                    # Urutkan dan ambil terbaik
-                    predictions.sort(key=lambda x: x['Prediksi_Rating'], reverse=True)
-                    return predictions[:n]
+                    top_idx, top_pred, support = result
+                    return [
+                        {
+                            'Tempat_Wisata': INDONESIA_TOURISM_PLACES[i],
+                            'Prediksi_Rating': pred,
+                            'Jumlah_User_Serupa': int(num_similar)
+                        }
+                        for i, pred, num_similar in zip(top_idx, top_pred, np.broadcast_to(support, top_idx.shape))
+                    ]
                 
                 # Dapatkan rekomendasi
                 recommendations = get_recommendations(target_user, num_recommendations)
                 
-                if recommendations:
-                    st.session_state.recommendations = recommendations
+                with perf.stage('render'):
+                    if recommendations:
+                        st.session_state.recommendations = recommendations
                     
-                    # Tampilkan hasil dengan menarik
-                    st.success(f"🎉 **{len(recommendations)} rekomendasi ditemukan!**")
+                        # Tampilkan hasil dengan menarik
+                        st.success(f"🎉 **{len(recommendations)} rekomendasi ditemukan!**")
                     
-                    # Group berdasarkan prediksi rating
-                    excellent = [r for r in recommendations if r['Prediksi_Rating'] >= 4.0]
-                    good = [r for r in recommendations if 3.0 <= r['Prediksi_Rating'] < 4.0]
+                        # Group berdasarkan prediksi rating
+                        excellent = [r for r in recommendations if r['Prediksi_Rating'] >= 4.0]
+                        good = [r for r in recommendations if 3.0 <= r['Prediksi_Rating'] < 4.0]
                     
-                    if excellent:
-                        st.subheader("🏆 **Rekomendasi Terbaik** (Rating ≥ 4.0)")
-                        for i, rec in enumerate(excellent, 1):
-                            with st.expander(f"{i}. {rec['Tempat_Wisata']}", expanded=(i==1)):
-                                col_a, col_b = st.columns(2)
-                                with col_a:
-                                    st.metric("Prediksi Rating", f"{rec['Prediksi_Rating']:.2f}")
-                                    # Visual stars
-                                    stars_count = int(rec['Prediksi_Rating'])
-                                    stars = "⭐" * stars_count
-                                    if rec['Prediksi_Rating'] - stars_count >= 0.5:
-                                        stars += "½"
-                                    st.write(stars)
-                                with col_b:
-                                    st.metric("User Serupa", rec['Jumlah_User_Serupa'])
+                        if excellent:
+                            st.subheader("🏆 **Rekomendasi Terbaik** (Rating ≥ 4.0)")
+                            for i, rec in enumerate(excellent, 1):
+                                with st.expander(f"{i}. {rec['Tempat_Wisata']}", expanded=(i==1)):
+                                    col_a, col_b = st.columns(2)
+                                    with col_a:
+                                        st.metric("Prediksi Rating", f"{rec['Prediksi_Rating']:.2f}")
+                                        # Visual stars
+                                        stars_count = int(rec['Prediksi_Rating'])
+                                        stars = "⭐" * stars_count
+                                        if rec['Prediksi_Rating'] - stars_count >= 0.5:
+                                            stars += "½"
+                                        st.write(stars)
+                                    with col_b:
+                                        st.metric(support_label, rec['Jumlah_User_Serupa'])
                                 
-                                # Tombol aksi
-                                if st.button(f"💾 Simpan ke Wishlist", key=f"save_{i}"):
-                                    st.success("Ditambahkan ke wishlist!")
+                                    # Tombol aksi
+                                    if st.button(f"💾 Simpan ke Wishlist", key=f"save_{i}"):
+                                        st.success("Ditambahkan ke wishlist!")
                     
-                    if good:
-                        st.subheader("👍 **Rekomendasi Baik** (Rating 3.0-4.0)")
-                        for i, rec in enumerate(good, 1):
-                            st.write(f"**{i}. {rec['Tempat_Wisata']}**")
-                            st.write(f"Prediksi: {rec['Prediksi_Rating']:.2f} | User serupa: {rec['Jumlah_User_Serupa']}")
-                            st.progress(rec['Prediksi_Rating'] / 5)
+                        if good:
+                            st.subheader("👍 **Rekomendasi Baik** (Rating 3.0-4.0)")
+                            for i, rec in enumerate(good, 1):
+                                st.write(f"**{i}. {rec['Tempat_Wisata']}**")
+                                st.write(f"Prediksi: {rec['Prediksi_Rating']:.2f} | {support_label}: {rec['Jumlah_User_Serupa']}")
+                                st.progress(rec['Prediksi_Rating'] / 5)
                     
-                    # Chart visualisasi
-                    st.subheader("📊 Distribusi Prediksi Rating")
-                    rec_df = pd.DataFrame(recommendations)
-                    st.bar_chart(rec_df.set_index('Tempat_Wisata')['Prediksi_Rating'])
+                        # Chart visualisasi
+                        st.subheader("📊 Distribusi Prediksi Rating")
+                        rec_df = pd.DataFrame(recommendations)
+                        st.bar_chart(rec_df.set_index('Tempat_Wisata')['Prediksi_Rating'])
                     
-                else:
-                    st.error("""
-                    **Tidak dapat menemukan rekomendasi yang cocok.**
+                    else:
+                        st.error("""
+                        **Tidak dapat menemukan rekomendasi yang cocok.**
                     
-                    **Saran:**
-                    1. Beri lebih banyak rating di Tab 2 ⭐
-                    2. Turunkan threshold kemiripan
-                    3. Coba user lain yang sudah ada
-                    """)
+                        **Saran:**
+                        1. Beri lebih banyak rating di Tab 2 ⭐
+                        2. Turunkan threshold kemiripan
+                        3. Coba user lain yang sudah ada
+                        """)
+            request_log.flush(app='projek2', cf_mode=cf_mode, user_type=user_type)
 
 # TAB 2: INPUT RATING BARU
 with tab2:
@@ -355,10 +368,9 @@ with tab2:
         # Pencarian
         search_query = st.text_input("🔍 Cari tempat wisata:", "")
         
-        # Filter places based on search
+        # Filter places based on search (indeks trigram, tahan salah ketik)
         if search_query:
-            filtered_places = [p for p in INDONESIA_TOURISM_PLACES 
-                             if search_query.lower() in p.lower()]
+            filtered_places = load_place_search().search_names(search_query, n=20)
         else:
             filtered_places = INDONESIA_TOURISM_PLACES[:20]  # Tampilkan 20 pertama
         
@@ -465,38 +477,26 @@ with tab3:
     # Statistik umum
     col1, col2, col3 = st.columns(3)
     with col1:
-        total_users = st.session_state.all_ratings['User_Id'].nunique()
-        st.metric("Total User Database", total_users)
+        st.metric("Total User Database", place_stats.n_users)
     with col2:
-        total_places = st.session_state.all_ratings['Place_Name'].nunique()
-        st.metric("Total Tempat Wisata", total_places)
+        st.metric("Total Tempat Wisata", int(np.count_nonzero(place_stats.counts)))
     with col3:
-        avg_all_rating = st.session_state.all_ratings['Place_Ratings'].mean()
-        st.metric("Rating Rata-rata", f"{avg_all_rating:.2f}")
+        st.metric("Rating Rata-rata", f"{place_stats.mean_rating:.2f}")
     
     st.markdown("---")
     
     # Top tempat wisata
     st.subheader("🏆 Top 10 Tempat Wisata Terpopuler")
     
-    # Hitung statistik per tempat
-    place_stats = st.session_state.all_ratings.groupby('Place_Name').agg({
-        'Place_Ratings': ['mean', 'count'],
-        'User_Id': 'nunique'
-    }).round(2)
-    
-    place_stats.columns = ['Rating_Rata', 'Jumlah_Rating', 'Jumlah_User']
-    place_stats = place_stats.reset_index()
-    
-    # Filter untuk tempat dengan minimal 5 rating
-    place_stats = place_stats[place_stats['Jumlah_Rating'] >= 5]
+    # Statistik per tempat (minimal 5 rating) & peringkatnya sudah dimaterialisasi
+    place_table = place_stats.frame(INDONESIA_TOURISM_PLACES)
     
     # Tampilkan dalam dua kategori
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("**Berdasarkan Rating Tertinggi:**")
-        top_by_rating = place_stats.sort_values('Rating_Rata', ascending=False).head(10)
+        top_by_rating = place_stats.frame(INDONESIA_TOURISM_PLACES, place_stats.top_by_rating(10))
         
         for i, (_, row) in enumerate(top_by_rating.iterrows(), 1):
             stars = "⭐" * int(row['Rating_Rata'])
@@ -509,7 +509,7 @@ with tab3:
     
     with col2:
         st.write("**Berdasarkan Popularitas:**")
-        top_by_users = place_stats.sort_values('Jumlah_User', ascending=False).head(10)
+        top_by_users = place_stats.frame(INDONESIA_TOURISM_PLACES, place_stats.top_by_users(10))
         
         for i, (_, row) in enumerate(top_by_users.iterrows(), 1):
             stars = "⭐" * int(row['Rating_Rata'])
@@ -525,17 +525,25 @@ with tab3:
     st.subheader("📈 Visualisasi Data")
     
     # Grafik distribusi rating
-    rating_dist = st.session_state.all_ratings['Place_Ratings'].value_counts().sort_index()
+    rating_dist = pd.Series(place_stats.histogram, index=np.arange(1, 6), name='count')
     st.write("**Distribusi Seluruh Rating:**")
     st.bar_chart(rating_dist)
     
     # Scatter plot rating vs jumlah user
     st.write("**Hubungan Rating vs Popularitas:**")
-    st.scatter_chart(place_stats.set_index('Place_Name')[['Rating_Rata', 'Jumlah_User']])
+    st.scatter_chart(place_table.set_index('Place_Name')[['Rating_Rata', 'Jumlah_User']])
     
     # Tampilkan data lengkap
     if st.checkbox("Tampilkan semua data statistik"):
-        st.dataframe(place_stats.sort_values('Rating_Rata', ascending=False))
+        st.dataframe(place_table)
+
+# Panel performa: tahap pemuatan (sekali per proses) dan tahap klik rekomendasi terakhir
+if show_perf:
+    with st.sidebar.expander("⏱️ Performa", expanded=True):
+        st.caption("Pemuatan data & model")
+        st.dataframe(startup_log.table(), hide_index=True)
+        st.caption("Klik rekomendasi terakhir")
+        st.dataframe(request_log.table(), hide_index=True)
 
 # Footer
 st.markdown("---")
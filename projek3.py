@@ -1,46 +1,76 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from content import ContentModel
+import shared
+import datacache
+import perf
+from search import PlaceSearch
+from geo import PlaceGeoIndex
 
 # Konfigurasi Halaman
 st.set_page_config(page_title="Sistem Rekomendasi Pariwisata", layout="wide")
 
+@st.cache_resource
+def startup_perf():
+    # load_data & prepare_content_based hanya berjalan sekali per proses, jadi tahapnya selalu dicatat
+    return perf.PerfRecorder(enabled=True)
+
+startup_log = startup_perf()
+
 # Fungsi untuk memuat data
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df_tourism = pd.read_csv('tourism_with_id.csv')
-    df_rating = pd.read_csv('tourism_rating.csv')
-    df_user = pd.read_csv('user.csv')
-    # Membersihkan data dan menghapus kolom kosong jika ada
-    df_tourism = df_tourism.drop(columns=['Unnamed: 11', 'Unnamed: 12'], errors='ignore')
-    return df_tourism, df_rating, df_user
+    # Cache biner (python datacache.py) dipakai jika lebih baru dari CSV, jika tidak baca CSV.
+    # Kolom kosong 'Unnamed' dan 'Coordinate' sudah dibuang di kedua jalur. Description
+    # tidak dimuat di sini, baris yang ditampilkan didekode lewat load_descriptions()
+    return datacache.load_tables(with_description=False)
+
+@st.cache_resource
+def load_descriptions():
+    return datacache.load_descriptions()
 
 # Load data
-df_tourism, df_rating, df_user = load_data()
+with startup_log.activate():
+    df_tourism, df_rating, df_user = load_data()
+    descriptions = load_descriptions()
 
 # --- PREPROCESSING ---
 @st.cache_resource
-def prepare_content_based(df):
-    # Menggabungkan fitur untuk kesamaan konten
-    df['content'] = df['Category'] + " " + df['Description'] + " " + df['City']
-    tfidf = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = tfidf.fit_transform(df['content'])
-    cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-    return cosine_sim
+def prepare_content_based():
+    # Menggabungkan fitur untuk kesamaan konten, hanya top-K tetangga per tempat yang disimpan.
+    # Tabel ditulis sekali ke artifacts/shared & di-memory-map, dibagi antar proses server.
+    # Kuncinya stempel tourism_with_id.csv, jadi teks Description hanya dibaca saat membangun
+    key = shared.source_key([datacache.SOURCES['places']])
+    return shared.shared_content(key, lambda: ContentModel.build(datacache.load_tables()[0]))
 
-cosine_sim = prepare_content_based(df_tourism)
+@st.cache_resource
+def prepare_place_search(df):
+    # Indeks trigram Place_Name + City + Category untuk kotak pencarian "Cari Serupa"
+    return PlaceSearch.from_places(df)
+
+@st.cache_resource
+def prepare_geo_index(df):
+    # Ball tree haversine atas Lat/Long untuk query "dalam X km" & k-terdekat
+    with perf.stage('geo_index'):
+        return PlaceGeoIndex.from_places(df)
+
+with startup_log.activate():
+    content_model = prepare_content_based()
+    place_search = prepare_place_search(df_tourism)
+    geo_index = prepare_geo_index(df_tourism)
+startup_log.flush(app='projek3', phase='startup')
 
 # --- FUNGSI REKOMENDASI ---
 
-def get_recommendations_by_item(title, cosine_sim=cosine_sim):
-    idx = df_tourism[df_tourism['Place_Name'] == title].index[0]
-    sim_scores = list(enumerate(cosine_sim[idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-    sim_scores = sim_scores[1:6] 
-    item_indices = [i[0] for i in sim_scores]
-    return df_tourism.iloc[item_indices]
+def get_recommendations_by_item(title, content_model=content_model, radius_km=None, n=5):
+    if radius_km is None:
+        item_indices, _ = content_model.similar(title, n=n)
+        return df_tourism.iloc[item_indices]
+    # Saring semua top-K tetangga konten ke yang dalam radius_km dari tempat acuan
+    item_indices, sims = content_model.similar(title, n=content_model.neighbor_idx.shape[1])
+    lat, lon = geo_index.location(content_model.name_index[title])
+    item_indices, _, dist = geo_index.restrict(item_indices, sims, lat, lon, radius_km, n)
+    return df_tourism.iloc[item_indices].assign(Jarak_km=dist)
 
 def get_popular_recommendations(city='All', n=5):
     if city == 'All':
@@ -68,16 +98,26 @@ if menu == "Home":
 
 elif menu == "Cari Serupa":
     st.subheader("🔍 Cari Tempat Wisata Serupa")
-    selected_place = st.selectbox("Pilih tempat yang Anda sukai:", df_tourism['Place_Name'].tolist())
+    search_query = st.text_input("🔍 Cari tempat (nama, kota, atau kategori):", "")
+    if search_query:
+        place_options = place_search.search_names(search_query, n=20)
+    else:
+        place_options = get_popular_recommendations(n=20)['Place_Name'].tolist()
+    selected_place = st.selectbox("Pilih tempat yang Anda sukai:", place_options)
+    radius_km = st.slider("Batasi jarak dari tempat ini (km, 0 = tanpa batas):", 0, 100, 0, 5)
     
-    if st.button("Tampilkan Rekomendasi"):
-        recs = get_recommendations_by_item(selected_place)
+    if selected_place and st.button("Tampilkan Rekomendasi"):
+        recs = get_recommendations_by_item(selected_place, radius_km=radius_km or None)
+        if recs.empty:
+            st.warning(f"Tidak ada tempat serupa dalam {radius_km} km. Coba perbesar radius.")
         st.write(f"Berdasarkan **{selected_place}**, kami merekomendasikan:")
-        for _, row in recs.iterrows():
+        for idx, row in recs.iterrows():
             with st.expander(f"{row['Place_Name']} - {row['City']}"):
                 st.write(f"**Kategori:** {row['Category']}")
+                if 'Jarak_km' in recs:
+                    st.write(f"**Jarak:** {row['Jarak_km']:.1f} km")
                 st.write(f"**Rating:** ⭐ {row['Rating']}")
-                st.write(row['Description'])
+                st.write(descriptions[idx])
 
 elif menu == "Rekomendasi User":
     st.subheader("👤 Rekomendasi Personal")
@@ -99,4 +139,19 @@ elif menu == "Eksplorasi Kota":
     if not filtered_df.empty:
         # Kita buat dataframe baru khusus untuk map dengan nama kolom yang sesuai standar Streamlit (lat & lon)
         map_data = filtered_df[['Lat', 'Long']].rename(columns={'Lat': 'lat', 'Long': 'lon'})
-        st.map(map_data)
\ No newline at end of file
+        st.map(map_data)
+
+        st.subheader("📍 Tempat Terdekat")
+        anchor = st.selectbox("Tempat acuan:", filtered_df['Place_Name'].tolist())
+        nearby_km = st.slider("Radius (km):", 1, 50, 5)
+        near_idx, near_dist = geo_index.near_place(content_model.name_index[anchor], radius_km=nearby_km)
+        if len(near_idx) == 0:
+            # Tidak ada dalam radius: tampilkan 5 tempat terdekat
+            near_idx, near_dist = geo_index.near_place(content_model.name_index[anchor], k=5)
+        nearby_df = df_tourism.iloc[near_idx].assign(Jarak_km=np.round(near_dist, 1))
+        st.dataframe(nearby_df[['Place_Name', 'Category', 'City', 'Jarak_km', 'Rating']], hide_index=True)
+
+# Panel performa: tahap load_data & prepare_content_based (sekali per proses)
+if st.sidebar.checkbox("Tampilkan panel performa", value=False):
+    with st.sidebar.expander("⏱️ Performa", expanded=True):
+        st.dataframe(startup_log.table(), hide_index=True)
@@ -1,35 +1,199 @@
 import pandas as pd
 import numpy as np
 import streamlit as st
-from sklearn.metrics.pairwise import cosine_similarity
+from engine import RatingModel, recommend_for_user, recommend_for_new_user
+import neighbors
+import datacache
+from item_cf import ItemSimilarity
+import mf
+import content
+from hybrid import HybridRecommender, CONTENT_WEIGHT
+from ann import LSHIndex
+import rec_store
+import rating_store
+from search import PlaceSearch
+from geo import PlaceGeoIndex
+import itinerary
+import coldstart
+import shared
+import perf
+from registry import ModelRegistry
 import warnings
 warnings.filterwarnings('ignore')
 
+# Di atas jumlah user ini indeks LSH dibangun & dikalibrasi terhadap cosine eksak pada nilai
+# slider threshold; user baru hanya dicocokkan lewat LSH pada threshold yang mencapai
+# ann.TARGET_RECALL (0.95) sekaligus lebih cepat dari eksak. Titik operasi terukur (60 ribu
+# user sintetis x 437 tempat, LSH 16 tabel x 8 bit): recall 0.76/0.87/0.98 pada threshold
+# 0.1/0.3/0.5 dengan ~26-31 ms per query vs 2-9 ms eksak, jadi pada skala itu tidak ada
+# threshold yang lolos dan semua query tetap memakai jalur eksak
+ANN_MIN_USERS = 50_000
+# Nilai slider "Threshold kemiripan" (0.05-0.9, langkah 0.05) yang dikalibrasi
+SIMILARITY_THRESHOLDS = np.round(np.arange(0.05, 0.9 + 1e-9, 0.05), 2)
+# Saat filter jarak aktif, kandidat diambil sekian kali jumlah rekomendasi lalu disaring
+GEO_OVERFETCH = 5
+
 st.set_page_config(
     page_title="Rekomendasi Wisata Indonesia",
     page_icon="🏝️",
     layout="wide"
 )
 
-@st.cache_data
+@st.cache_resource
+def load_rating_store():
+    # Rating dari Tab ⭐ disimpan permanen di log SQLite (artifacts/ratings.db), dibagi antar sesi
+    return rating_store.RatingStore()
+
+# --- ARTEFAK SATU GENERASI MODEL (dibangun ulang oleh registry saat file CSV berubah) ---
+
 def load_data():
-    df_places = pd.read_csv('tourism_with_id.csv')
-    df_ratings = pd.read_csv('tourism_rating.csv')
-    df_users = pd.read_csv('user.csv')
-    df_all = pd.merge(df_ratings, df_places[['Place_Id', 'Place_Name', 'Category', 'City']], on='Place_Id')
+    # Cache biner (python datacache.py) dipakai jika lebih baru dari CSV; kolom numeriknya di-memory-map
+    df_places, df_ratings, df_users = datacache.load_tables(with_description=False)
+    with perf.stage('merge') as timer:
+        df_all = timer.track(pd.merge(df_ratings, df_places[['Place_Id', 'Place_Name', 'Category', 'City']], on='Place_Id'))
     
     return df_places, df_ratings, df_users, df_all
 
-try:
+def load_live_model(df_places, df_ratings, store):
+    # Matriks user-item sparse (CSV + rating tersimpan) dibangun sekali per host, bukan per klik:
+    # artefak ditulis sekali ke artifacts/shared sebagai file read-only yang di-memory-map, jadi
+    # semua sesi & replika server berbagi halaman memori yang sama. Rating baru diterapkan
+    # inkremental di atasnya. Tabel top-K tetangga dibangun offline (python neighbors.py).
+    # Kunci memuat seq log rating: replika yang dimulai sebelum & sesudah sebuah rating ditulis
+    # memakai artefak berbeda (masing-masing lalu memperbarui salinannya sendiri)
+    last_seq = store.last_seq
+    key = shared.source_key([datacache.SOURCES['ratings'], datacache.SOURCES['places']], last_seq)
+
+    def build_model():
+        ratings, _ = rating_store.merged_ratings(df_ratings, store, until=last_seq)
+        return RatingModel.from_ratings(ratings, place_ids=df_places['Place_Id'])
+
+    model = shared.shared_model(key, build_model)
+    with perf.stage('neighbor_index') as timer:
+        index = shared.shared_neighbors(model, lambda: neighbors.load_or_build(model))
+        timer.track(index.neighbor_idx)
+    return rating_store.LiveModel(model, index, store, last_seq)
+
+def load_item_similarity(model):
+    # Similarity item-item top-K, jumlah tempat jauh lebih kecil dan stabil dibanding jumlah user
+    with perf.stage('item_similarity') as timer:
+        item_similarity = shared.shared_item_similarity(model, lambda: ItemSimilarity.build(model))
+        timer.track(item_similarity.matrix)
+    return item_similarity
+
+def load_factor_model(model):
+    # Faktor laten dilatih offline (python mf.py), dilatih ulang jika tidak cocok dengan data rating
+    with perf.stage('factor_model') as timer:
+        factor_model = shared.shared_factors(model, lambda: mf.load_or_train(model))
+        timer.track(factor_model.user_factors)
+    return factor_model
+
+def load_hybrid(model, factor_model):
+    # Tabel top-K kemiripan konten dibangun offline (python content.py) atau sekali di sini,
+    # barisnya disusun mengikuti kolom matriks rating lalu dicampur dengan faktor MF
+    df_content = datacache.load_tables()[0].set_index('Place_Id').loc[model.place_ids].reset_index()
+    with perf.stage('content_model') as timer:
+        content_model = shared.shared_content(
+            content.content_fingerprint(df_content), lambda: content.load_or_build(df_content)
+        )
+        timer.track(content_model.matrix)
+    return HybridRecommender(factor_model, content_model.matrix)
+
+def load_cold_start(model, df_users):
+    # Daftar populer per provinsi asal & kelompok usia (python coldstart.py) untuk user baru
+    # yang ratingnya belum cukup untuk CF
+    with perf.stage('cold_start'):
+        return coldstart.load_or_build(model, df_users)
+
+def load_rec_store(model):
+    # Daftar rekomendasi yang dimaterialisasi (python rec_store.py) dari model CSV + log rating
+    # yang sama; dibangun ulang di sini jika belum ada atau usang
+    with perf.stage('rec_store'):
+        return rec_store.load_or_build(model)
+
+def load_place_search(df_places):
+    # Indeks trigram Place_Name + City + Category untuk kotak pencarian di Tab ⭐
+    with perf.stage('place_search'):
+        return PlaceSearch.from_places(df_places)
+
+def load_geo_index(df_places, model):
+    # Ball tree haversine atas Lat/Long, indeksnya = kolom matriks rating (urutan model.place_ids)
+    with perf.stage('geo_index'):
+        return PlaceGeoIndex.from_places(df_places.set_index('Place_Id').loc[model.place_ids])
+
+def load_itinerary_planner(df_places, model):
+    # Matriks jarak per kota & paket package_tourism.csv, indeks tempat = kolom matriks rating
+    with perf.stage('itinerary_planner'):
+        return itinerary.load_planner(df_places.set_index('Place_Id').loc[model.place_ids].reset_index())
+
+def load_ann_index(model):
+    if model.shape[0] < ANN_MIN_USERS:
+        return None
+    with perf.stage('ann_index'):
+        index = LSHIndex().fit(model.normalized)
+    with perf.stage('ann_calibrate'):
+        index.calibrate(model, SIMILARITY_THRESHOLDS)
+    # Tanpa threshold yang lolos, indeks tidak berguna dan tidak perlu disimpan di memori
+    return index if index.thresholds else None
+
+def build_generation(store):
+    """Semua artefak satu generasi; artefak turunan dibangun dari snapshot model saat build."""
     df_places, df_ratings, df_users, df_all = load_data()
-    all_place_names = sorted(df_places['Place_Name'].unique().tolist())
+    live_model = load_live_model(df_places, df_ratings, store)
+    model = live_model.model
+    factor_model = load_factor_model(model)
+    return {
+        'df_places': df_places, 'df_ratings': df_ratings, 'df_users': df_users, 'df_all': df_all,
+        'live_model': live_model,
+        'item_similarity': load_item_similarity(model),
+        'factor_model': factor_model,
+        'hybrid': load_hybrid(model, factor_model),
+        'cold_start': load_cold_start(model, df_users),
+        'ann_index': load_ann_index(model),
+        'stored_recommendations': load_rec_store(model),
+        'place_search': load_place_search(df_places),
+        'geo_index': load_geo_index(df_places, model),
+        'planner': load_itinerary_planner(df_places, model),
+    }
+
+@st.cache_resource
+def load_registry():
+    # Satu registry per proses. Saat CSV berubah, generasi baru dibangun di thread latar dan
+    # menggantikan generasi aktif sekaligus; sesi tetap dilayani generasi lama selama build
+    store = load_rating_store()
+    sources = [*datacache.SOURCES.values(), itinerary.PACKAGES_PATH]
+    return ModelRegistry(lambda: build_generation(store), sources, name='projek4')
+
+model_registry = load_registry()
+ratings_log = load_rating_store()
+try:
+    generation = model_registry.current()
 except FileNotFoundError:
     st.error("File CSV tidak ditemukan. Pastikan file 'tourism_with_id.csv', 'tourism_rating.csv', dan 'user.csv' ada di direktori yang sama.")
     st.stop()
+df_places, df_ratings, df_users, df_all = (generation[k] for k in ('df_places', 'df_ratings', 'df_users', 'df_all'))
+live_model = generation['live_model']
+item_similarity = generation['item_similarity']
+factor_model = generation['factor_model']
+hybrid = generation['hybrid']
+cold_start = generation['cold_start']
+ann_index = generation['ann_index']
+stored_recommendations = generation['stored_recommendations']
+place_search = generation['place_search']
+geo_index = generation['geo_index']
+planner = generation['planner']
 
+# Rating baru dari sesi mana pun diterapkan inkremental ke matriks & tabel tetangga
+live_model.refresh()
+model, neighbor_index, place_stats = live_model.snapshot
+if live_model.generation:
+    # Daftar yang dimaterialisasi offline sudah tidak sesuai dengan data rating terbaru
+    stored_recommendations = None
 
 if 'new_user_ratings' not in st.session_state:
     st.session_state.new_user_ratings = {}
+if 'perf_log' not in st.session_state:
+    st.session_state.perf_log = perf.PerfRecorder()
 
 # Header
 st.title("🏝️ Sistem Rekomendasi Wisata Indonesia")
@@ -40,9 +204,25 @@ st.markdown("---")
 st.sidebar.header("⚙️ Pengaturan")
 num_recommendations = st.sidebar.slider("Jumlah rekomendasi:", 5, 20, 10)
 similarity_threshold = st.sidebar.slider("Threshold kemiripan:", 0.05, 0.9, 0.1, 0.05)
+cf_mode = st.sidebar.radio("Metode CF:", ["User-Based", "Item-Based", "Matrix Factorization", "Hybrid"])
+content_weight = CONTENT_WEIGHT
+if cf_mode == "Hybrid":
+    content_weight = st.sidebar.slider("Bobot kemiripan konten:", 0.0, 1.0, CONTENT_WEIGHT, 0.05)
+st.sidebar.subheader("📍 Filter Lokasi")
+city_centers = df_places.groupby('City')[['Lat', 'Long']].mean()
+geo_city = st.sidebar.selectbox("Dekat pusat kota:", ["Semua lokasi"] + city_centers.index.tolist())
+geo_radius = st.sidebar.slider("Radius (km):", 5, 100, 25, 5, disabled=geo_city == "Semua lokasi")
+geo_center = None if geo_city == "Semua lokasi" else tuple(city_centers.loc[geo_city])
+# Rekomender mengambil lebih banyak kandidat, lalu hanya kandidat itu yang dihitung jaraknya
+fetch_n = num_recommendations if geo_center is None else num_recommendations * GEO_OVERFETCH
+show_perf = st.sidebar.checkbox("Tampilkan panel performa", value=False)
+
+# Tahap per klik hanya diukur jika panel aktif atau file metrik diatur (REKOMENDASI_PERF_LOG)
+request_log = st.session_state.perf_log
+request_log.enabled = show_perf or bool(request_log.metrics_path)
 
 # Tabs
-tab1, tab2, tab3 = st.tabs(["🎯 Rekomendasi", "⭐ Input Rating", "📊 Statistik Data"])
+tab1, tab2, tab3, tab4 = st.tabs(["🎯 Rekomendasi", "⭐ Input Rating", "📊 Statistik Data", "🗺️ Itinerary"])
 
 # --- TAB 1: REKOMENDASI ---
 with tab1:
@@ -55,11 +235,15 @@ with tab1:
         current_ratings_display = []
 
         if method == "User Baru (Input Sendiri)":
-            if st.session_state.new_user_ratings:
-                st.success(f"✅ {len(st.session_state.new_user_ratings)} rating tersimpan.")
-                target_user_id = 9999
-            else:
-                st.warning("Silakan isi rating di Tab ⭐ dulu.")
+            profile_province = st.selectbox("Provinsi asal:", ["Tidak disebutkan"] + cold_start.provinces)
+            profile_age = st.number_input("Usia (0 = tidak disebutkan):", min_value=0, max_value=100, value=0)
+            n_session_ratings = len(st.session_state.new_user_ratings)
+            if n_session_ratings:
+                st.success(f"✅ {n_session_ratings} rating tersimpan.")
+                target_user_id = st.session_state.get('user_id', 9999)
+            if n_session_ratings < coldstart.MIN_CF_RATINGS:
+                st.info(f"Rekomendasi awal dari destinasi favorit user dengan profil serupa. "
+                        f"Beri minimal {coldstart.MIN_CF_RATINGS} rating di Tab ⭐ untuk rekomendasi personal.")
         else:
             selected_id = st.selectbox("Pilih User ID dari Database:", df_users['User_Id'].unique())
             target_user_id = selected_id
@@ -70,72 +254,126 @@ with tab1:
 
     with col2:
         if st.button("🚀 Hitung Rekomendasi", type="primary", use_container_width=True):
-            with st.spinner("Menganalisis kemiripan antar user..."):
-                
-                # Siapkan data untuk matrix
-                if method == "User Baru (Input Sendiri)":
-                    new_data = pd.DataFrame([
-                        {'User_Id': 9999, 'Place_Name': k, 'Place_Ratings': v} 
-                        for k, v in st.session_state.new_user_ratings.items()
-                    ])
-                    # Kita butuh Place_Id untuk konsistensi matrix
-                    new_data = pd.merge(new_data, df_places[['Place_Id', 'Place_Name']], on='Place_Name')
-                    processing_df = pd.concat([df_all[['User_Id', 'Place_Id', 'Place_Ratings']], 
-                                             new_data[['User_Id', 'Place_Id', 'Place_Ratings']]])
-                else:
-                    processing_df = df_all
-
-                # Create User-Item Matrix
-                matrix = processing_df.pivot_table(index='User_Id', columns='Place_Id', values='Place_Ratings').fillna(0)
-                
-                # Cosine Similarity
-                user_sim = cosine_similarity(matrix)
-                user_sim_df = pd.DataFrame(user_sim, index=matrix.index, columns=matrix.index)
+            request_log.reset()
+            with st.spinner("Menganalisis kemiripan antar user..."), request_log.activate():
                 
-                # Ambil user serupa
-                similar_users = user_sim_df[target_user_id].sort_values(ascending=False)
-                similar_users = similar_users[(similar_users > similarity_threshold) & (similar_users.index != target_user_id)]
+                # Fold-in user baru atau ambil baris user terdaftar dari model
+                result = None
+                # User baru dengan rating < MIN_CF_RATINGS: tabel cold-start, tanpa komputasi CF
+                if method == "User Baru (Input Sendiri)" and n_session_ratings < coldstart.MIN_CF_RATINGS:
+                    rated_idx = [
+                        model.place_index[pid] for pid in df_places.loc[
+                            df_places['Place_Name'].isin(list(st.session_state.new_user_ratings)), 'Place_Id'
+                        ] if pid in model.place_index
+                    ]
+                    result = cold_start.recommend(
+                        None if profile_province == "Tidak disebutkan" else profile_province,
+                        profile_age or None, fetch_n, exclude=rated_idx
+                    )
+                # User sesi yang ratingnya sudah masuk model diperlakukan seperti user terdaftar
+                elif method == "User Baru (Input Sendiri)" and target_user_id not in model.user_index:
+                    place_id_by_name = dict(zip(df_places['Place_Name'], df_places['Place_Id']))
+                    new_ratings = {
+                        place_id_by_name[k]: v
+                        for k, v in st.session_state.new_user_ratings.items() if k in place_id_by_name
+                    }
+                    if cf_mode == "Item-Based":
+                        result = item_similarity.recommend(
+                            model.make_row(new_ratings), similarity_threshold, fetch_n
+                        )
+                    elif cf_mode == "Matrix Factorization":
+                        result = factor_model.recommend(model.make_row(new_ratings), fetch_n)
+                    elif cf_mode == "Hybrid":
+                        result = hybrid.recommend(model.make_row(new_ratings), fetch_n, content_weight)
+                    else:
+                        result = recommend_for_new_user(
+                            model, new_ratings, similarity_threshold, fetch_n,
+                            ann_index=ann_index if ann_index is not None and ann_index.usable(similarity_threshold) else None
+                        )
+                elif target_user_id in model.user_index:
+                    target_idx = model.user_index[target_user_id]
+                    if cf_mode == "Item-Based":
+                        result = item_similarity.recommend(
+                            model.matrix[target_idx], similarity_threshold, fetch_n
+                        )
+                    elif cf_mode in ("Matrix Factorization", "Hybrid"):
+                        # User yang ditambahkan setelah pelatihan belum punya faktor: fold-in
+                        factor_idx = target_idx if target_idx < len(factor_model.user_factors) else None
+                        if cf_mode == "Hybrid":
+                            result = hybrid.recommend(
+                                model.matrix[target_idx], fetch_n, content_weight, user_idx=factor_idx
+                            )
+                        else:
+                            result = factor_model.recommend(
+                                model.matrix[target_idx], fetch_n, user_idx=factor_idx
+                            )
+                    else:
+                        result = rec_store.serve(
+                            stored_recommendations, target_idx, similarity_threshold, fetch_n,
+                            lambda: recommend_for_user(
+                                model, target_idx, similarity_threshold, fetch_n,
+                                neighbor_index=neighbor_index
+                            )
+                        )
                 
-                if similar_users.empty:
-                    st.error("Tidak ditemukan user dengan minat serupa. Coba turunkan threshold kemiripan.")
+                if result is None:
+                    if cf_mode in ("Matrix Factorization", "Hybrid"):
+                        st.error("Belum ada rating untuk dihitung faktornya. Silakan isi rating di Tab ⭐ dulu.")
+                    elif cf_mode == "Item-Based":
+                        st.error("Tidak ditemukan tempat yang mirip dengan riwayat rating. Coba turunkan threshold kemiripan.")
+                    else:
+                        st.error("Tidak ditemukan user dengan minat serupa. Coba turunkan threshold kemiripan.")
                 else:
-                    # Prediksi Rating
-                    user_visited = processing_df[processing_df['User_Id'] == target_user_id]['Place_Id'].tolist()
-                    unvisited_places = df_places[~df_places['Place_Id'].isin(user_visited)]['Place_Id']
-                    
-                    recommendations = []
-                    for p_id in unvisited_places:
-                        weighted_sum = 0
-                        sim_sum = 0
-                        for sim_user, score in similar_users.items():
-                            rating = matrix.loc[sim_user, p_id]
-                            if rating > 0:
-                                weighted_sum += score * rating
-                                sim_sum += score
-                        
-                        if sim_sum > 0:
-                            pred = weighted_sum / sim_sum
-                            recommendations.append({'Place_Id': p_id, 'Prediksi': pred})
+                    rec_idx, rec_pred, _ = result
+                    rec_dist = None
+                    if geo_center is not None:
+                        with perf.stage('geo_filter'):
+                            rec_idx, rec_pred, rec_dist = geo_index.restrict(
+                                rec_idx, rec_pred, *geo_center, geo_radius, num_recommendations
+                            )
                     
                     # Tampilkan Hasil
-                    rec_df = pd.DataFrame(recommendations).sort_values('Prediksi', ascending=False).head(num_recommendations)
-                    rec_df = pd.merge(rec_df, df_places[['Place_Id', 'Place_Name', 'City', 'Category']], on='Place_Id')
+                    with perf.stage('merge') as timer:
+                        rec_df = pd.DataFrame({'Place_Id': model.place_ids[rec_idx], 'Prediksi': rec_pred})
+                        if rec_dist is not None:
+                            rec_df['Jarak_km'] = rec_dist
+                        rec_df = pd.merge(rec_df, df_places[['Place_Id', 'Place_Name', 'City', 'Category']], on='Place_Id')
+                        timer.track(rec_df)
                     
-                    st.success(f"Ditemukan {len(rec_df)} rekomendasi untuk Anda!")
-                    for _, row in rec_df.iterrows():
-                        with st.expander(f"📍 {row['Place_Name']} ({row['City']})"):
-                            st.write(f"**Kategori:** {row['Category']}")
-                            st.write(f"**Prediksi Skor Kepuasan:** {row['Prediksi']:.2f}/5.0")
-                            st.progress(row['Prediksi']/5)
+                    with perf.stage('render'):
+                        if rec_df.empty:
+                            st.warning(f"Tidak ada rekomendasi dalam {geo_radius} km dari pusat {geo_city}. Coba perbesar radius.")
+                        else:
+                            st.success(f"Ditemukan {len(rec_df)} rekomendasi untuk Anda!")
+                        for _, row in rec_df.iterrows():
+                            with st.expander(f"📍 {row['Place_Name']} ({row['City']})"):
+                                st.write(f"**Kategori:** {row['Category']}")
+                                if rec_dist is not None:
+                                    st.write(f"**Jarak dari pusat {geo_city}:** {row['Jarak_km']:.1f} km")
+                                st.write(f"**Prediksi Skor Kepuasan:** {row['Prediksi']:.2f}/5.0")
+                                st.progress(row['Prediksi']/5)
+            request_log.flush(app='projek4', cf_mode=cf_mode, method=method)
 
 # --- TAB 2: INPUT RATING ---
 with tab2:
     st.header("⭐ Beri Rating Pengalaman Anda")
-    selected_tour = st.selectbox("Cari Tempat Wisata:", all_place_names)
+    search_query = st.text_input("🔍 Cari tempat wisata (nama, kota, atau kategori):", "")
+    if search_query:
+        place_options = place_search.search_names(search_query, n=20)
+    else:
+        # Tanpa query, tampilkan 20 destinasi terpopuler saja, bukan seluruh katalog
+        place_options = df_places['Place_Name'].to_numpy()[place_stats.top_by_users(20)].tolist()
+    selected_tour = st.selectbox("Pilih Tempat Wisata:", place_options)
+    if not place_options:
+        st.info("Tidak ada tempat yang cocok.")
     rating_val = st.select_slider("Rating Anda:", options=[1, 2, 3, 4, 5], value=3)
     
-    if st.button("Simpan Rating"):
+    if st.button("Simpan Rating") and selected_tour is not None:
         st.session_state.new_user_ratings[selected_tour] = rating_val
+        if 'user_id' not in st.session_state:
+            st.session_state.user_id = ratings_log.allocate_user_id(int(df_users['User_Id'].max()) + 1)
+        place_id = df_places.loc[df_places['Place_Name'] == selected_tour, 'Place_Id'].iloc[0]
+        ratings_log.upsert(st.session_state.user_id, place_id, rating_val)
         st.toast(f"Berhasil menyimpan rating untuk {selected_tour}!")
 
     if st.session_state.new_user_ratings:
@@ -149,8 +387,67 @@ with tab3:
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Destinasi", len(df_places))
     c2.metric("Total User", len(df_users))
-    c3.metric("Total Rating", len(df_ratings))
+    c3.metric("Total Rating", place_stats.n_ratings)
     
     st.subheader("Top 10 Destinasi Terpopuler")
-    populer = df_all.groupby('Place_Name')['Place_Ratings'].count().sort_values(ascending=False).head(10)
+    # Dibaca dari statistik yang dijaga inkremental (jumlah rating unik per user-tempat), tanpa groupby
+    top_idx = place_stats.top_by_users(10)
+    populer = pd.Series(place_stats.counts[top_idx], index=df_places['Place_Name'].to_numpy()[top_idx], name='Place_Ratings')
     st.bar_chart(populer)
+
+with tab4:
+    st.header("🗺️ Rencana Perjalanan Sehari")
+    c1, c2, c3 = st.columns(3)
+    plan_city = c1.selectbox("Kota:", sorted(planner.city_places))
+    plan_hours = c2.slider("Waktu tersedia (jam):", 2, 12, 8)
+    plan_budget = c3.number_input("Anggaran tiket (Rp, 0 = tanpa batas):", min_value=0, value=0, step=10000)
+    skip_rated = st.checkbox("Lewati tempat yang sudah dirating", value=True)
+
+    # Prediksi rating semua tempat dari faktor MF user terpilih di Tab 🎯 (fold-in untuk user
+    # baru), jika belum ada rating pakai rata-rata rating tempat
+    user_row = None
+    if target_user_id in model.user_index:
+        user_row = model.matrix[model.user_index[target_user_id]]
+    elif st.session_state.new_user_ratings:
+        place_id_by_name = dict(zip(df_places['Place_Name'], df_places['Place_Id']))
+        user_row = model.make_row({
+            place_id_by_name[k]: v for k, v in st.session_state.new_user_ratings.items() if k in place_id_by_name
+        })
+    if user_row is not None and user_row.nnz:
+        target_idx = model.user_index.get(target_user_id)
+        factor_idx = target_idx if target_idx is not None and target_idx < len(factor_model.user_factors) else None
+        user_vector = factor_model.user_vector(user_row, factor_idx)
+        plan_scores = np.clip(factor_model.predict(user_vector), 1, 5).astype(np.float64)
+        user_label = f"User {target_user_id}" if target_user_id is not None else "User baru (sesi ini)"
+        st.caption(f"Berdasarkan prediksi rating {user_label}.")
+    else:
+        plan_scores = place_stats.sums / np.maximum(place_stats.counts, 1)
+        st.caption("Belum ada user terpilih: berdasarkan rata-rata rating tempat.")
+
+    exclude = None
+    if skip_rated and user_row is not None:
+        exclude = np.zeros(len(plan_scores), dtype=bool)
+        exclude[user_row.indices] = True
+    plan = planner.plan(plan_city, plan_scores, plan_hours * 60, plan_budget or None, exclude=exclude)
+    if len(plan.stops):
+        st.dataframe(plan.frame(planner.place_names), hide_index=True)
+        st.write(f"⏱️ {plan.total_minutes / 60:.1f} jam | 🚗 {plan.travel_km.sum():.1f} km | 💰 Rp {plan.total_price:,}")
+    else:
+        st.info("Tidak ada tempat yang muat dalam anggaran waktu & biaya ini.")
+
+    st.subheader(f"📦 Paket Wisata {plan_city} yang Paling Cocok")
+    st.dataframe(planner.package_frame(plan_scores, city=plan_city, n=5), hide_index=True)
+
+# Panel performa: tahap pemuatan (sekali per proses) dan tahap klik rekomendasi terakhir
+if show_perf:
+    with st.sidebar.expander("⏱️ Performa", expanded=True):
+        registry_status = model_registry.status()
+        st.caption(f"Build generasi model v{registry_status['version']} ({registry_status['fingerprint']}), "
+                   f"{registry_status['build_seconds']} detik, {registry_status['built_at']}")
+        if registry_status['building']:
+            st.caption(f"🔄 Membangun generasi baru ({registry_status['building']}) di latar...")
+        if registry_status['last_error']:
+            st.caption(f"⚠️ Build terakhir gagal: {registry_status['last_error']}")
+        st.dataframe(generation.perf_log.table(), hide_index=True)
+        st.caption("Klik rekomendasi terakhir")
+        st.dataframe(request_log.table(), hide_index=True)
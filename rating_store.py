@@ -0,0 +1,188 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+import datacache
+import perf
+from stats import PlaceStats
+
+STORE_PATH = os.path.join('artifacts', 'ratings.db')
+# Log dipadatkan (entri yang sudah ditimpa dibuang) setiap sekian entri baru
+COMPACT_EVERY = 10_000
+
+
+class RatingStore:
+    """
+    Log rating append-only di SQLite (mode WAL). Setiap upsert menjadi satu baris baru dengan
+    nomor urut (seq) yang naik; untuk pasangan user-tempat yang sama, entri terakhir yang berlaku.
+    Pembaca cukup mengambil entri dengan seq > seq terakhir yang sudah diterapkan.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS ratings ('
+            ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' user_id INTEGER NOT NULL, place_id INTEGER NOT NULL,'
+            ' rating INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),'
+            ' created_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)')
+
+    def upsert_many(self, rows):
+        """Simpan banyak rating (User_Id, Place_Id, rating) dalam satu transaksi. Output: seq terakhir."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT INTO ratings (user_id, place_id, rating, created_at) VALUES (?, ?, ?, ?)',
+                [(int(u), int(p), int(r), now) for u, p, r in rows]
+            )
+            self._conn.execute('COMMIT')
+        return self.last_seq
+
+    def upsert(self, user_id, place_id, rating):
+        return self.upsert_many([(user_id, place_id, rating)])
+
+    @property
+    def last_seq(self):
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(MAX(seq), 0) FROM ratings').fetchone()[0]
+
+    def changes(self, since=0, until=None):
+        """Entri dengan since < seq <= until, urut menurut seq (format tourism_rating.csv + kolom seq)."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT seq, user_id, place_id, rating FROM ratings WHERE seq > ? AND seq <= ? ORDER BY seq',
+                (since, until if until is not None else 2 ** 62)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=['seq', 'User_Id', 'Place_Id', 'Place_Ratings'])
+
+    def allocate_user_id(self, min_id):
+        """User_Id baru yang unik antar sesi & proses (>= min_id, mis. max User_Id di CSV + 1)."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            current = self._conn.execute(
+                'SELECT MAX(m) FROM (SELECT MAX(user_id) AS m FROM users UNION ALL SELECT MAX(user_id) FROM ratings)'
+            ).fetchone()[0]
+            user_id = max(int(min_id), (current or 0) + 1)
+            self._conn.execute('INSERT INTO users (user_id) VALUES (?)', (user_id,))
+            self._conn.execute('COMMIT')
+        return user_id
+
+    def compact(self):
+        """
+        Buang entri yang sudah ditimpa entri lebih baru untuk pasangan user-tempat yang sama.
+        seq entri yang tersisa tidak berubah, jadi pembaca inkremental tidak terpengaruh.
+        Output: jumlah entri yang dibuang.
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            removed = self._conn.execute(
+                'DELETE FROM ratings WHERE seq NOT IN (SELECT MAX(seq) FROM ratings GROUP BY user_id, place_id)'
+            ).rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('compacted_seq', (SELECT COALESCE(MAX(seq), 0) FROM ratings))"
+            )
+            self._conn.execute('COMMIT')
+        return removed
+
+    @property
+    def compacted_seq(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'compacted_seq'").fetchone()
+        return row[0] if row else 0
+
+
+def merged_ratings(df_ratings, store, until=None):
+    """
+    Rating CSV ditambah isi store (sampai seq until); entri store ditaruh di akhir sehingga
+    menang saat dedup (keep='last').
+    """
+    changes = store.changes(until=until)
+    if changes.empty:
+        return df_ratings, 0
+    merged = pd.concat([df_ratings, changes.drop(columns='seq')], ignore_index=True)
+    return merged, int(changes['seq'].iloc[-1])
+
+
+class LiveModel:
+    """
+    RatingModel + NeighborIndex + PlaceStats yang dijaga sinkron dengan RatingStore. refresh()
+    hanya membaca entri baru sejak seq terakhir lalu memperbarui matriks, baris ternormalisasi,
+    tabel tetangga dan statistik untuk user yang berubah. Pembaca memakai snapshot
+    (model, indeks, statistik) yang diganti sekaligus, jadi aman dibaca dari banyak sesi.
+    """
+
+    def __init__(self, model, neighbor_index, store, last_seq):
+        self.store = store
+        self.generation = 0  # Jumlah pembaruan sejak dibangun; 0 = sama dengan artefak offline
+        self._snapshot = (model, neighbor_index, PlaceStats.build(model))
+        self._last_seq = last_seq
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return self._snapshot[0]
+
+    @property
+    def neighbor_index(self):
+        return self._snapshot[1]
+
+    @property
+    def stats(self):
+        return self._snapshot[2]
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def refresh(self):
+        """Terapkan entri store yang belum diterapkan. Output: jumlah entri yang diterapkan."""
+        with self._lock:
+            delta = self.store.changes(self._last_seq)
+            if delta.empty:
+                return 0
+            old_model, neighbor_index, stats = self._snapshot
+            with perf.stage('incremental_update') as timer:
+                model, changed = old_model.with_ratings(delta)
+                neighbor_index = neighbor_index.update(model, changed)
+                stats = stats.updated(old_model, model, changed)
+                timer.track(model.matrix)
+            self._snapshot = (model, neighbor_index, stats)
+            self._last_seq = int(delta['seq'].iloc[-1])
+            self.generation += 1
+
+            if self._last_seq - self.store.compacted_seq >= COMPACT_EVERY:
+                self.store.compact()
+            return len(delta)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Kelola log rating (SQLite) dari aplikasi")
+    parser.add_argument('--db', default=STORE_PATH)
+    parser.add_argument('--compact', action='store_true', help="buang entri yang sudah ditimpa")
+    parser.add_argument('--export', default=None, help="tulis rating CSV + store (format tourism_rating.csv)")
+    args = parser.parse_args()
+
+    store = RatingStore(args.db)
+    if args.compact:
+        print(f"{store.compact()} entri dibuang, seq terakhir {store.last_seq}")
+    if args.export:
+        _, df_ratings, _ = datacache.load_tables(with_description=False)
+        merged, _ = merged_ratings(df_ratings, store)
+        merged = merged.drop_duplicates(['User_Id', 'Place_Id'], keep='last')
+        merged.to_csv(args.export, index=False)
+        print(f"{len(merged)} rating -> {args.export}")
+    if not args.compact and not args.export:
+        print(f"{store.last_seq} entri di {args.db}, dipadatkan sampai seq {store.compacted_seq}")
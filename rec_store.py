@@ -0,0 +1,142 @@
+import argparse
+import logging
+import os
+
+import numpy as np
+
+import datacache
+import perf
+import rating_store
+from engine import RatingModel, block_similarities, score_block
+
+STORE_PATH = os.path.join('artifacts', 'rec_store.npz')
+# Sama dengan nilai slider "Threshold kemiripan" di projek4.py (0.05 - 0.9, langkah 0.05)
+DEFAULT_THRESHOLDS = np.round(np.arange(0.05, 0.9001, 0.05), 2)
+
+logger = logging.getLogger('rekomendasi.rec_store')
+
+
+class RecommendationStore:
+    """
+    Daftar top-N user-based CF yang sudah dihitung untuk setiap user terdaftar dan setiap
+    threshold di grid. Disimpan sebagai array (threshold x user x N) sehingga satu lookup
+    hanya berupa indexing. version = fingerprint RatingModel saat dibangun.
+    """
+
+    def __init__(self, place_idx, scores, neighbor_counts, thresholds, version):
+        self.place_idx = place_idx
+        self.scores = scores
+        self.neighbor_counts = neighbor_counts
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.version = version
+        self._threshold_index = {round(float(t), 2): i for i, t in enumerate(self.thresholds)}
+
+    @property
+    def n_max(self):
+        return self.place_idx.shape[2]
+
+    @classmethod
+    def build(cls, model, thresholds=DEFAULT_THRESHOLDS, n=20, block_size=256):
+        """
+        Hitung semua daftar per blok user: similarity blok dihitung sekali lalu
+        dipakai untuk setiap threshold di grid.
+        """
+        n_users, n_places = model.shape
+        idx_dtype = np.int16 if n_places < np.iinfo(np.int16).max else np.int32
+        place_idx = np.full((len(thresholds), n_users, n), -1, dtype=idx_dtype)
+        scores = np.full((len(thresholds), n_users, n), np.nan, dtype=np.float32)
+        neighbor_counts = np.zeros((len(thresholds), n_users), dtype=np.int32)
+
+        ratings = model.matrix.astype(np.float64)
+        rated = (model.matrix > 0).astype(np.float64)
+        for start in range(0, n_users, block_size):
+            rows = np.arange(start, min(start + block_size, n_users))
+            sims = block_similarities(model, rows)
+            for t, threshold in enumerate(thresholds):
+                top_idx, top_pred, counts = score_block(model, rows, sims, threshold, n, ratings, rated)
+                place_idx[t, rows, :top_idx.shape[1]] = top_idx
+                scores[t, rows, :top_pred.shape[1]] = top_pred
+                neighbor_counts[t, rows] = counts
+
+        return cls(place_idx, scores, neighbor_counts, thresholds, model.fingerprint())
+
+    def lookup(self, user_idx, threshold, n):
+        """
+        Hasil tersimpan untuk baris user_idx: (indeks tempat, prediksi, jumlah user serupa),
+        None jika tidak ada user serupa, atau KeyError jika kombinasi parameter tidak disimpan.
+        """
+        t = self._threshold_index.get(round(float(threshold), 2))
+        if t is None or n > self.n_max:
+            raise KeyError((threshold, n))
+        if self.neighbor_counts[t, user_idx] == 0:
+            return None
+        idx = self.place_idx[t, user_idx, :n]
+        filled = idx >= 0
+        scores = self.scores[t, user_idx, :n][filled].astype(np.float64)
+        return idx[filled].astype(np.int64), scores, int(self.neighbor_counts[t, user_idx])
+
+    def save(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(
+            path,
+            place_idx=self.place_idx,
+            scores=self.scores,
+            neighbor_counts=self.neighbor_counts,
+            thresholds=self.thresholds,
+            version=self.version,
+        )
+
+    @classmethod
+    def load(cls, path=STORE_PATH, model=None):
+        """Muat store; None jika file tidak ada atau versinya tidak cocok dengan data rating."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            store = cls(
+                data['place_idx'],
+                data['scores'],
+                data['neighbor_counts'],
+                data['thresholds'],
+                str(data['version']),
+            )
+        if model is not None and store.version != model.fingerprint():
+            logger.info("rec_store %s usang (versi %s, model %s)", path, store.version, model.fingerprint())
+            return None
+        return store
+
+
+def load_or_build(model, path=STORE_PATH, **build_kwargs):
+    """Pakai store di disk jika cocok dengan model, jika tidak bangun ulang dan simpan."""
+    store = RecommendationStore.load(path, model)
+    if store is None:
+        store = RecommendationStore.build(model, **build_kwargs)
+        store.save(path)
+    return store
+
+
+def serve(store, user_idx, threshold, n, compute):
+    """Ambil hasil dari store jika ada dan masih berlaku, jika tidak hitung langsung dengan compute()."""
+    if store is not None:
+        try:
+            with perf.stage('store_lookup'):
+                return store.lookup(user_idx, threshold, n)
+        except KeyError:
+            pass
+    return compute()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Materialisasi daftar rekomendasi semua user untuk grid threshold")
+    parser.add_argument('--n', type=int, default=20)
+    parser.add_argument('--thresholds', type=float, nargs='+', default=DEFAULT_THRESHOLDS.tolist())
+    parser.add_argument('--block-size', type=int, default=256)
+    parser.add_argument('--out', default=STORE_PATH)
+    args = parser.parse_args()
+
+    # Rating CSV + log rating app (artifacts/ratings.db), sama dengan model yang dilayani projek4
+    df_places, df_ratings, _ = datacache.load_tables(with_description=False)
+    ratings, _ = rating_store.merged_ratings(df_ratings, rating_store.RatingStore())
+    model = RatingModel.from_ratings(ratings, place_ids=df_places['Place_Id'])
+    store = RecommendationStore.build(model, args.thresholds, args.n, args.block_size)
+    store.save(args.out)
+    print(f"{model.shape[0]} user x {len(args.thresholds)} threshold x top-{args.n}, versi {store.version} -> {args.out}")
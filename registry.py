@@ -0,0 +1,113 @@
+import threading
+import time
+
+import perf
+import shared
+
+# Jeda minimal (detik) antar pemeriksaan stempel file sumber
+CHECK_INTERVAL = 5.0
+
+
+class Generation:
+    """Satu set artefak model yang dibangun dari satu versi file sumber; tidak diubah setelah terbit."""
+
+    def __init__(self, version, fingerprint, artifacts, perf_log, built_at, build_seconds):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.artifacts = artifacts
+        self.perf_log = perf_log
+        self.built_at = built_at
+        self.build_seconds = build_seconds
+
+    def __getitem__(self, name):
+        return self.artifacts[name]
+
+
+class ModelRegistry:
+    """
+    Registry generasi model untuk satu aplikasi. Fingerprint = ukuran & mtime file sumber;
+    jika berubah, generasi baru dibangun di thread latar sementara permintaan tetap dilayani
+    generasi aktif, lalu referensi generasi aktif diganti sekaligus setelah build selesai.
+    build() -> dict artefak; tahap perf.stage() di dalamnya dicatat per generasi.
+    Hanya generasi pertama yang dibangun sinkron (belum ada yang bisa dilayani).
+    """
+
+    def __init__(self, build, sources, name='model', check_interval=CHECK_INTERVAL):
+        self.build = build
+        self.sources = list(sources)
+        self.name = name
+        self.check_interval = check_interval
+        self._current = None
+        self._building = None  # Fingerprint yang sedang dibangun di latar
+        self._failed = None  # Fingerprint yang build-nya gagal, tidak dicoba ulang
+        self._last_check = 0.0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        return shared.source_key(self.sources)
+
+    def _build(self, fingerprint):
+        started = time.perf_counter()
+        perf_log = perf.PerfRecorder(enabled=True)
+        with perf_log.activate():
+            artifacts = self.build()
+        version = self._current.version + 1 if self._current is not None else 1
+        perf_log.flush(app=self.name, phase='build', version=version, fingerprint=fingerprint)
+        return Generation(version, fingerprint, artifacts, perf_log, time.time(), time.perf_counter() - started)
+
+    def _build_in_background(self, fingerprint):
+        try:
+            generation = self._build(fingerprint)
+        except Exception as exc:  # Generasi lama tetap aktif; dicoba lagi saat file berubah lagi
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            with self._lock:
+                self._building = None
+                self._failed = fingerprint
+            return
+        with self._lock:
+            self._current = generation
+            self._building = None
+            self.last_error = None
+
+    def current(self):
+        """
+        Generasi aktif. Memeriksa stempel file sumber paling sering sekali per check_interval
+        dan memulai build latar jika berubah; tidak pernah menunggu build latar selesai.
+        """
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    fingerprint = self.fingerprint()
+                    self._current = self._build(fingerprint)
+                    self._last_check = time.monotonic()
+            return self._current
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            try:
+                fingerprint = self.fingerprint()
+            except FileNotFoundError:  # File sedang diganti; periksa lagi nanti
+                return self._current
+            with self._lock:
+                stale = fingerprint != self._current.fingerprint
+                if stale and self._building is None and fingerprint != self._failed:
+                    self._building = fingerprint
+                    threading.Thread(
+                        target=self._build_in_background, args=(fingerprint,),
+                        name=f"{self.name}-build", daemon=True
+                    ).start()
+        return self._current
+
+    def status(self):
+        """Ringkasan untuk ditampilkan: versi aktif, fingerprint, waktu build, build latar."""
+        generation = self._current
+        return {
+            'version': generation.version if generation else None,
+            'fingerprint': generation.fingerprint if generation else None,
+            'built_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(generation.built_at)) if generation else None,
+            'build_seconds': round(generation.build_seconds, 2) if generation else None,
+            'building': self._building,
+            'last_error': self.last_error,
+        }
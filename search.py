@@ -0,0 +1,105 @@
+import numpy as np
+from scipy import sparse
+
+# Bobot n-gram dari kota & kategori relatif terhadap n-gram nama tempat
+FIELD_WEIGHT = 0.5
+# Batas panjang posting list yang dibaca untuk mengumpulkan kandidat per query
+CANDIDATE_BUDGET = 1024
+
+
+def char_ngrams(text, n=3):
+    """N-gram karakter dari teks huruf kecil yang diberi spasi di awal & akhir (bukan per kata)."""
+    text = f" {' '.join(str(text).lower().split())} "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class PlaceSearch:
+    """
+    Indeks pencarian nama tempat berbasis trigram karakter. Setiap tempat adalah vektor
+    trigram berbobot IDF (nama penuh, kota & kategori dengan bobot FIELD_WEIGHT), disimpan
+    sebagai posting list (CSC). Kandidat dikumpulkan dari trigram query yang paling jarang
+    (sampai CANDIDATE_BUDGET posting), lalu hanya kandidat itu yang diberi skor cosine penuh.
+    Salah ketik tetap ketemu karena sebagian besar trigram masih sama. Nama yang diawali
+    query mendapat bonus, dicari dengan pencarian biner pada nama yang diurutkan.
+    """
+
+    def __init__(self, names, cities=None, categories=None):
+        self.names = np.asarray(names, dtype=object)
+        n_places = len(self.names)
+        cities = [''] * n_places if cities is None else list(cities)
+        categories = [''] * n_places if categories is None else list(categories)
+
+        vocab = {}
+        rows, cols, values = [], [], []
+        for i, (name, city, category) in enumerate(zip(self.names, cities, categories)):
+            grams = dict.fromkeys(char_ngrams(f"{city} {category}"), FIELD_WEIGHT)
+            grams.update(dict.fromkeys(char_ngrams(name), 1.0))
+            for gram, weight in grams.items():
+                rows.append(i)
+                cols.append(vocab.setdefault(gram, len(vocab)))
+                values.append(weight)
+        self.vocab = vocab
+
+        matrix = sparse.csr_matrix((values, (rows, cols)), shape=(n_places, len(vocab)))
+        doc_freq = np.bincount(matrix.indices, minlength=len(vocab))
+        self.idf = np.log((1 + n_places) / (1 + doc_freq)) + 1
+        matrix = matrix @ sparse.diags(self.idf)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        self.vectors = (sparse.diags(1 / norms) @ matrix).tocsr()
+        self.postings = self.vectors.tocsc()
+        self.doc_freq = doc_freq
+
+        lowered = np.array([' '.join(str(name).lower().split()) for name in self.names], dtype=object)
+        self._name_order = np.argsort(lowered, kind='stable')
+        self._sorted_names = lowered[self._name_order].astype(str)
+
+    @classmethod
+    def from_places(cls, df):
+        """Indeks dari DataFrame format tourism_with_id.csv (Place_Name, City, Category)."""
+        return cls(df['Place_Name'].tolist(), df['City'].astype(str).tolist(), df['Category'].astype(str).tolist())
+
+    def _prefix_matches(self, query):
+        """Indeks tempat yang namanya diawali query (huruf kecil)."""
+        lo = np.searchsorted(self._sorted_names, query, side='left')
+        hi = np.searchsorted(self._sorted_names, query + '\uffff', side='left')
+        return self._name_order[lo:hi]
+
+    def search(self, query, n=20):
+        """
+        Maksimal n tempat paling cocok dengan query: (indeks tempat, skor) urut menurun.
+        Skor = cosine trigram (0-1) + 1 jika nama diawali query.
+        """
+        query = ' '.join(str(query).lower().split())
+        if not query:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        grams = char_ngrams(query)
+        terms = np.array(sorted((self.vocab[g] for g in grams if g in self.vocab), key=lambda t: self.doc_freq[t]), dtype=np.int64)
+        prefix = self._prefix_matches(query)
+        if len(terms) == 0 and len(prefix) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Kandidat dari trigram paling jarang dulu; trigram umum (mis. ' pa', 'an ') hanya ikut skor
+        indptr = self.postings.indptr
+        n_generators = max(1, int(np.searchsorted(np.cumsum(self.doc_freq[terms]), CANDIDATE_BUDGET, side='right')))
+        candidates = np.unique(np.concatenate(
+            [self.postings.indices[indptr[t]:indptr[t + 1]] for t in terms[:n_generators]] + [prefix[:CANDIDATE_BUDGET]]
+        ))
+
+        # Bobot query dihitung dari semua trigram-nya (trigram tak dikenal berbobot 1) agar query
+        # panjang yang hanya sedikit cocok tidak mendapat skor tinggi
+        query_vec = np.zeros(self.vectors.shape[1])
+        query_vec[terms] = self.idf[terms]
+        query_vec /= np.sqrt(np.sum(self.idf[terms] ** 2) + (len(grams) - len(terms)))
+        scores = self.vectors[candidates] @ query_vec
+        scores[np.isin(candidates, prefix)] += 1
+        if len(candidates) > n:
+            keep = np.argpartition(-scores, n - 1)[:n]
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))
+        return candidates[order], scores[order]
+
+    def search_names(self, query, n=20):
+        idx, _ = self.search(query, n)
+        return self.names[idx].tolist()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+from scipy import sparse
+
+from content import ContentModel
+from engine import RatingModel
+from item_cf import ItemSimilarity
+from mf import FactorModel
+from neighbors import NeighborIndex
+
+SHARED_DIR = os.path.join('artifacts', 'shared')
+# Versi lama per artefak yang tidak dihapus prune(): replika yang baru membaca meta.json versi
+# sebelumnya masih bisa memuat file .npy-nya
+KEEP_PREVIOUS = 1
+
+
+# --- PENYIMPANAN ARRAY READ-ONLY ---
+
+def source_key(paths, *extra):
+    """Kunci versi dari ukuran & mtime file sumber ditambah nilai lain (mis. seq log rating)."""
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    digest.update(repr(extra).encode())
+    return digest.hexdigest()[:16]
+
+
+def artifact_dir(name, key, shared_dir=SHARED_DIR):
+    return os.path.join(shared_dir, name, key)
+
+
+def publish(name, key, arrays, meta=None, shared_dir=SHARED_DIR):
+    """
+    Tulis arrays (dict nama -> ndarray) sebagai file .npy di artifacts/shared/<name>/<key>/.
+    Ditulis ke direktori sementara lalu di-rename, jadi pembaca tidak pernah melihat versi
+    setengah jadi; jika proses lain sudah menerbitkan key yang sama, hasil ini dibuang.
+    """
+    final_dir = artifact_dir(name, key, shared_dir)
+    if os.path.exists(os.path.join(final_dir, 'meta.json')):
+        return final_dir
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, array_name + '.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(dict(meta or {}, arrays=sorted(arrays)), f)
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return final_dir
+
+
+def open_arrays(name, key, shared_dir=SHARED_DIR):
+    """
+    (arrays, meta) dengan setiap array di-memory-map read-only, atau None jika belum ada.
+    Semua sesi & proses yang membuka key yang sama berbagi halaman memori fisik yang sama.
+    """
+    path = artifact_dir(name, key, shared_dir)
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    arrays = {
+        array_name: np.load(os.path.join(path, array_name + '.npy'), mmap_mode='r')
+        for array_name in meta.pop('arrays')
+    }
+    return arrays, meta
+
+
+def load_or_publish(name, key, build, shared_dir=SHARED_DIR):
+    """
+    Buka artefak key jika sudah ada; jika belum, build() -> (arrays, meta) diterbitkan lalu
+    dibuka ulang sebagai memory-map, sehingga proses pembangun pun tidak menyimpan salinannya.
+    Versi lama name dihapus setelah versi baru terbit (kecuali KEEP_PREVIOUS versi terbaru).
+    """
+    opened = open_arrays(name, key, shared_dir)
+    if opened is None:
+        arrays, meta = build()
+        publish(name, key, arrays, meta, shared_dir)
+        prune(name, key, shared_dir)
+        opened = open_arrays(name, key, shared_dir)
+    return opened
+
+
+def prune(name, keep_key, shared_dir=SHARED_DIR, keep_previous=KEEP_PREVIOUS):
+    """
+    Hapus versi lain dari artefak name selain keep_key dan keep_previous versi terbaru
+    lainnya (menurut mtime). Proses yang masih memetakan file lama tidak terganggu (POSIX).
+    """
+    base = os.path.join(shared_dir, name)
+    if not os.path.isdir(base):
+        return
+    others = [
+        os.path.join(base, entry) for entry in os.listdir(base)
+        if entry != keep_key and '.tmp-' not in entry
+    ]
+    others.sort(key=os.path.getmtime, reverse=True)
+    for path in others[keep_previous:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# --- KONVERSI OBJEK MODEL <-> ARRAY ---
+
+def csr_arrays(prefix, matrix):
+    return {f"{prefix}_data": matrix.data, f"{prefix}_indices": matrix.indices, f"{prefix}_indptr": matrix.indptr}
+
+
+def csr_from_arrays(arrays, prefix, shape):
+    """CSR yang memakai array memory-map langsung (tanpa salinan)."""
+    return sparse.csr_matrix(
+        (arrays[f"{prefix}_data"], arrays[f"{prefix}_indices"], arrays[f"{prefix}_indptr"]),
+        shape=tuple(shape), copy=False
+    )
+
+
+def model_arrays(model):
+    """Matriks rating, baris ternormalisasi (norma sudah diterapkan) & peta id dari RatingModel."""
+    arrays = dict(csr_arrays('matrix', model.matrix), **csr_arrays('normalized', model.normalized))
+    arrays.update(user_ids=model.user_ids, place_ids=model.place_ids)
+    return arrays, {'shape': list(model.shape), 'fingerprint': model.fingerprint()}
+
+
+def model_from_arrays(arrays, meta):
+    model = RatingModel(csr_from_arrays(arrays, 'matrix', meta['shape']), arrays['user_ids'], arrays['place_ids'])
+    model._normalized = csr_from_arrays(arrays, 'normalized', meta['shape'])
+    model._fingerprint = meta['fingerprint']
+    return model
+
+
+def neighbor_arrays(index):
+    return (
+        {'neighbor_idx': index.neighbor_idx, 'neighbor_sims': index.neighbor_sims},
+        {'min_similarity': index.min_similarity, 'fingerprint': index.fingerprint},
+    )
+
+
+def neighbors_from_arrays(arrays, meta):
+    return NeighborIndex(arrays['neighbor_idx'], arrays['neighbor_sims'], meta['min_similarity'], meta['fingerprint'])
+
+
+def item_similarity_arrays(item_similarity):
+    return csr_arrays('matrix', item_similarity.matrix), {'shape': list(item_similarity.matrix.shape)}
+
+
+def item_similarity_from_arrays(arrays, meta):
+    return ItemSimilarity(csr_from_arrays(arrays, 'matrix', meta['shape']))
+
+
+def factor_arrays(factor_model):
+    return (
+        {'user_factors': factor_model.user_factors, 'item_factors': factor_model.item_factors},
+        {'global_mean': factor_model.global_mean, 'reg': factor_model.reg, 'fingerprint': factor_model.fingerprint},
+    )
+
+
+def factors_from_arrays(arrays, meta):
+    return FactorModel(arrays['user_factors'], arrays['item_factors'], meta['global_mean'], meta['reg'], meta['fingerprint'])
+
+
+def content_arrays(content_model):
+    return (
+        {
+            'neighbor_idx': content_model.neighbor_idx,
+            'neighbor_sims': content_model.neighbor_sims,
+            'place_names': np.asarray(content_model.place_names, dtype=str),
+        },
+        {'fingerprint': content_model.fingerprint},
+    )
+
+
+def content_from_arrays(arrays, meta):
+    return ContentModel(arrays['neighbor_idx'], arrays['neighbor_sims'], arrays['place_names'].tolist(), meta['fingerprint'])
+
+
+# --- PEMBUNGKUS SIAP PAKAI ---
+# name membedakan artefak antar aplikasi (mis. data demo projek2 vs data asli projek4)
+
+def shared_model(key, build, name='rating_model'):
+    """RatingModel dari artefak bersama key; build() -> RatingModel hanya dipanggil jika belum ada."""
+    return model_from_arrays(*load_or_publish(name, key, lambda: model_arrays(build())))
+
+
+def shared_neighbors(model, build, name='user_neighbors'):
+    return neighbors_from_arrays(*load_or_publish(name, model.fingerprint(), lambda: neighbor_arrays(build())))
+
+
+def shared_item_similarity(model, build, name='item_similarity'):
+    return item_similarity_from_arrays(
+        *load_or_publish(name, model.fingerprint(), lambda: item_similarity_arrays(build()))
+    )
+
+
+def shared_factors(model, build, name='mf_factors'):
+    return factors_from_arrays(*load_or_publish(name, model.fingerprint(), lambda: factor_arrays(build())))
+
+
+def shared_content(key, build, name='content_neighbors'):
+    return content_from_arrays(*load_or_publish(name, key, lambda: content_arrays(build())))
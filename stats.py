@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+
+class Ranking:
+    """
+    Urutan indeks menurun menurut skor (skor sama: indeks terkecil dulu). updated() hanya
+    memindahkan indeks yang skornya berubah lewat pencarian biner, tanpa mengurutkan ulang.
+    Skor -inf menandai indeks yang tidak ikut peringkat.
+    """
+
+    def __init__(self, scores, order=None):
+        self.scores = np.asarray(scores, dtype=np.float64)
+        if order is None:
+            order = np.lexsort((np.arange(len(self.scores)), -self.scores))
+        self.order = order
+
+    def top(self, n):
+        head = self.order[:n]
+        return head[np.isfinite(self.scores[head])]
+
+    def updated(self, idx, new_scores):
+        """Ranking baru dengan skor idx diganti new_scores (objek lama tidak diubah)."""
+        idx = np.asarray(idx, dtype=np.int64)
+        scores = self.scores.copy()
+        scores[idx] = new_scores
+        order = self.order[~np.isin(self.order, idx)]
+
+        keys = -scores[order]
+        inserted = idx[np.lexsort((idx, -scores[idx]))]
+        positions = np.empty(len(inserted), dtype=np.int64)
+        for i, j in enumerate(inserted):
+            lo = np.searchsorted(keys, -scores[j], side='left')
+            hi = np.searchsorted(keys, -scores[j], side='right')
+            positions[i] = lo + np.searchsorted(order[lo:hi], j)
+        return Ranking(scores, np.insert(order, positions, inserted))
+
+
+class PlaceStats:
+    """
+    Agregat per tempat (jumlah rating = jumlah user berbeda, total rating) dan histogram
+    rating 1-5 dari RatingModel, beserta peringkat yang dijaga. version = fingerprint model
+    sumber, jadi statistik hanya dihitung ulang saat data rating berubah.
+    """
+
+    def __init__(self, counts, sums, histogram, n_users, version, min_count=5,
+                 by_rating=None, by_users=None):
+        self.counts = counts
+        self.sums = sums
+        self.histogram = histogram
+        self.n_users = n_users
+        self.version = version
+        self.min_count = min_count
+        all_places = np.arange(len(counts))
+        self.by_rating = by_rating if by_rating is not None else Ranking(self._rating_scores(all_places))
+        self.by_users = by_users if by_users is not None else Ranking(self._user_scores(all_places))
+        self._frame = None
+
+    @classmethod
+    def build(cls, model, min_count=5):
+        """Hitung dari matriks rating dalam O(nnz), tanpa groupby."""
+        matrix = model.matrix
+        n_places = matrix.shape[1]
+        counts = np.bincount(matrix.indices, minlength=n_places).astype(np.int64)
+        sums = np.bincount(matrix.indices, weights=matrix.data, minlength=n_places)
+        histogram = np.bincount(matrix.data, minlength=6)[1:6].astype(np.int64)
+        n_users = int(np.count_nonzero(np.diff(matrix.indptr)))
+        return cls(counts, sums, histogram, n_users, model.fingerprint(), min_count)
+
+    def _rating_scores(self, idx):
+        """Skor peringkat rating: rata-rata, -inf untuk tempat dengan rating < min_count."""
+        counts = self.counts[idx]
+        means = self.sums[idx] / np.maximum(counts, 1)
+        return np.where(counts >= self.min_count, means, -np.inf)
+
+    def _user_scores(self, idx):
+        counts = self.counts[idx]
+        return np.where(counts >= self.min_count, counts, -np.inf)
+
+    def updated(self, old_model, new_model, changed_rows):
+        """
+        Statistik untuk new_model yang hanya berbeda pada baris changed_rows dari old_model
+        (lihat RatingModel.with_ratings): kontribusi baris lama dikurangi, baris baru ditambah.
+        """
+        n_places = new_model.shape[1]
+        old_rows = old_model.matrix[changed_rows[changed_rows < old_model.shape[0]]]
+        new_rows = new_model.matrix[changed_rows]
+
+        counts = self.counts.copy()
+        sums = self.sums.copy()
+        histogram = self.histogram.copy()
+        for rows, sign in ((old_rows, -1), (new_rows, 1)):
+            counts += sign * np.bincount(rows.indices, minlength=n_places)
+            sums += sign * np.bincount(rows.indices, weights=rows.data, minlength=n_places)
+            histogram += sign * np.bincount(rows.data, minlength=6)[1:6]
+        n_users = self.n_users + int(
+            np.count_nonzero(np.diff(new_rows.indptr)) - np.count_nonzero(np.diff(old_rows.indptr))
+        )
+
+        # Hanya tempat yang tersentuh baris berubah yang dipindahkan di peringkat
+        touched = np.union1d(old_rows.indices, new_rows.indices)
+        stats = PlaceStats(counts, sums, histogram, n_users, new_model.fingerprint(), self.min_count,
+                           by_rating=self.by_rating, by_users=self.by_users)
+        stats.by_rating = self.by_rating.updated(touched, stats._rating_scores(touched))
+        stats.by_users = self.by_users.updated(touched, stats._user_scores(touched))
+        return stats
+
+    @property
+    def n_ratings(self):
+        return int(self.counts.sum())
+
+    @property
+    def mean_rating(self):
+        return float(self.sums.sum() / max(self.n_ratings, 1))
+
+    def top_by_rating(self, n=10):
+        return self.by_rating.top(n)
+
+    def top_by_users(self, n=10):
+        return self.by_users.top(n)
+
+    def frame(self, place_names, idx=None):
+        """
+        Tabel per tempat (Place_Name, Rating_Rata, Jumlah_Rating, Jumlah_User) untuk idx,
+        default semua tempat dengan minimal min_count rating (urut menurut rata-rata).
+        """
+        if idx is None:
+            if self._frame is None:
+                self._frame = self.frame(place_names, self.by_rating.top(len(self.counts)))
+            return self._frame
+        counts = self.counts[idx]
+        return pd.DataFrame({
+            'Place_Name': np.asarray(place_names, dtype=object)[idx],
+            'Rating_Rata': np.round(self.sums[idx] / np.maximum(counts, 1), 2),
+            'Jumlah_Rating': counts,
+            'Jumlah_User': counts,
+        })
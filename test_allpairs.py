@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import allpairs
+from neighbors import NeighborIndex
+
+
+def test_sharded_build_matches_neighbor_index(model, tmp_path):
+    # Blok kecil & 2 worker agar ada beberapa shard dari proses berbeda
+    allpairs.build(model, out_dir=str(tmp_path), k=20, n_workers=2, block_rows=32)
+    shards = allpairs.SimilarityShards(str(tmp_path))
+    assert shards.fingerprint == model.fingerprint()
+    assert len(shards.manifest['shards']) == -(-model.shape[0] // 32)
+
+    from_shards = shards.to_neighbor_index(min_similarity=0.05)
+    expected = NeighborIndex.build(model, k=20, min_similarity=0.05)
+    np.testing.assert_allclose(from_shards.neighbor_sims, expected.neighbor_sims, rtol=1e-6)
+    for user_idx in range(model.shape[0]):
+        idx, sims = from_shards.neighbors(user_idx, 0.05)
+        exp_idx, exp_sims = expected.neighbors(user_idx, 0.05)
+        assert sorted(zip(-np.round(sims, 6), idx)) == sorted(zip(-np.round(exp_sims, 6), exp_idx))
+
+
+def test_threshold_build_row_matches_dense(model, tmp_path):
+    allpairs.build(model, out_dir=str(tmp_path), k=None, threshold=0.1, n_workers=1, block_rows=50)
+    shards = allpairs.SimilarityShards(str(tmp_path))
+    dense = (model.normalized @ model.normalized.T).toarray()
+    for user_idx in range(0, model.shape[0], 11):
+        idx, sims = shards.row(user_idx)
+        row = dense[user_idx].copy()
+        row[user_idx] = 0
+        assert set(idx.tolist()) == set(np.flatnonzero(row > 0.1).tolist())
+        np.testing.assert_allclose(sims, row[idx], rtol=1e-6)
+    with pytest.raises(ValueError):
+        shards.to_neighbor_index()
+
+
+def test_block_rows_for_fits_budget():
+    matrix_bytes = 100 * 2 ** 20
+    block_rows, n_workers = allpairs.block_rows_for(10_000, matrix_bytes, 8, max_memory_mb=1024)
+    assert n_workers == 5  # Salinan CSR+CSC 200 MB per worker: hanya 5 yang muat di 1 GB
+    used = n_workers * (matrix_bytes * 2 + block_rows * 10_000 * allpairs.BYTES_PER_CELL)
+    assert block_rows >= 1 and used <= 1024 * 2 ** 20
+    with pytest.raises(ValueError):
+        allpairs.block_rows_for(10_000, matrix_bytes, 1, max_memory_mb=100)
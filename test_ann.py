@@ -0,0 +1,38 @@
+import numpy as np
+
+from ann import LSHIndex
+from engine import find_similar_users, recommend_for_new_user
+
+
+def test_query_returns_exact_similarities(model):
+    index = LSHIndex(n_tables=4, n_bits=6).fit(model.normalized)
+    dense = (model.normalized @ model.normalized.T).toarray()
+    for user_idx in range(0, model.shape[0], 10):
+        ids, sims = index.query(model.normalized[user_idx], 0.2)
+        # Kandidat aproksimasi, tetapi kemiripan yang dikembalikan selalu cosine eksak
+        np.testing.assert_allclose(sims, dense[user_idx, ids], rtol=1e-6)
+        assert np.all(sims > 0.2) and np.all(np.diff(sims) <= 0)
+        assert set(ids.tolist()) <= set(np.flatnonzero(dense[user_idx] > 0.2).tolist())
+
+
+def test_probing_every_bucket_matches_exact(model):
+    # 1 bit + probe radius 1 memeriksa kedua bucket: semua user jadi kandidat
+    index = LSHIndex(n_tables=1, n_bits=1, probe_radius=1).fit(model.normalized)
+    dense = (model.normalized @ model.normalized.T).toarray()
+    for user_idx in range(0, model.shape[0], 10):
+        ids, _ = index.query(model.normalized[user_idx], 0.1)
+        order, _ = find_similar_users(dense[user_idx], 0.1)
+        assert sorted(ids.tolist()) == sorted(order.tolist())
+
+    place_ratings = {int(model.place_ids[0]): 5, int(model.place_ids[3]): 2, int(model.place_ids[10]): 4}
+    exact = recommend_for_new_user(model, place_ratings, 0.1, 10)
+    approx = recommend_for_new_user(model, place_ratings, 0.1, 10, ann_index=index)
+    assert approx[0].tolist() == exact[0].tolist()
+    np.testing.assert_allclose(approx[1], exact[1], rtol=1e-6)
+
+
+def test_uncalibrated_index_is_not_usable(model):
+    index = LSHIndex().fit(model.normalized)
+    assert not index.usable(0.5)
+    index.thresholds = {0.5}
+    assert index.usable(0.5) and not index.usable(0.3)
@@ -0,0 +1,49 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+import datacache
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for source in datacache.SOURCES.values():
+        shutil.copy(source, tmp_path / source)
+    return tmp_path
+
+
+def test_cache_tables_match_csv(data_dir, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    from_csv = datacache.load_tables(str(data_dir), cache_dir)
+    datacache.build_cache(str(data_dir), cache_dir)
+    assert datacache.cache_is_fresh(str(data_dir), cache_dir)
+    from_cache = datacache.load_tables(str(data_dir), cache_dir)
+    for csv_df, cache_df in zip(from_csv, from_cache):
+        # copy(): kolom memory-map jadi ndarray biasa agar bisa dibandingkan
+        pd.testing.assert_frame_equal(cache_df.copy(), csv_df)
+
+    without = datacache.load_tables(str(data_dir), cache_dir, with_description=False)[0]
+    pd.testing.assert_frame_equal(without.copy(), from_csv[0].drop(columns=['Description']))
+
+
+def test_descriptions_match_csv(data_dir, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    expected = datacache.load_descriptions(str(data_dir), cache_dir)
+    assert isinstance(expected, list)
+    datacache.build_cache(str(data_dir), cache_dir)
+    lazy = datacache.load_descriptions(str(data_dir), cache_dir)
+    assert isinstance(lazy, datacache.TextColumn)
+    assert len(lazy) == len(expected)
+    assert lazy[0] == expected[0] and lazy[len(lazy) - 1] == expected[-1]
+    assert lazy.to_list() == expected
+
+
+def test_stale_cache_falls_back_to_csv(data_dir, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    datacache.build_cache(str(data_dir), cache_dir)
+    ratings_path = data_dir / datacache.SOURCES['ratings']
+    ratings = pd.read_csv(ratings_path)
+    ratings.head(-1).to_csv(ratings_path, index=False)
+    assert not datacache.cache_is_fresh(str(data_dir), cache_dir)
+    assert len(datacache.load_tables(str(data_dir), cache_dir)[1]) == len(ratings) - 1
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import (
+    RatingModel, normalize_rows, predict_scores, recommend_batch, recommend_for_new_user,
+    recommend_for_user, top_n_indices, top_n_rows,
+)
+from neighbors import NeighborIndex
+
+THRESHOLDS = [0.05, 0.1, 0.3, 0.5]
+
+
+def loop_recommend(model, user_idx, threshold, n):
+    """Versi per tempat & per user (seperti kode awal projek2) sebagai acuan."""
+    dense = model.matrix.toarray().astype(np.float64)
+    norms = np.linalg.norm(dense, axis=1)
+    target = dense[user_idx]
+    sims = []
+    for other in range(len(dense)):
+        if other != user_idx and norms[other] and norms[user_idx]:
+            sim = dense[other] @ target / (norms[other] * norms[user_idx])
+            if sim > threshold:
+                sims.append((other, sim))
+    if not sims:
+        return None
+    preds = {}
+    for place in range(dense.shape[1]):
+        if target[place]:
+            continue
+        weighted = total = 0.0
+        for other, sim in sims:
+            if dense[other, place]:
+                weighted += sim * dense[other, place]
+                total += sim
+        if total:
+            preds[place] = weighted / total
+    ranked = sorted(preds, key=lambda place: (-round(preds[place], 6), place))[:n]
+    return ranked, [preds[place] for place in ranked], len(sims)
+
+
+def test_predict_scores_matches_loop(model):
+    rng = np.random.default_rng(0)
+    rows = rng.choice(model.shape[0], 12, replace=False)
+    sims = rng.uniform(0.1, 1, len(rows))
+    ratings = model.matrix[rows].toarray().astype(np.float64)
+    pred, valid = predict_scores(model.matrix[rows], sims)
+    for place in range(model.shape[1]):
+        rated = ratings[:, place] > 0
+        assert valid[place] == rated.any()
+        if rated.any():
+            assert pred[place] == pytest.approx(sims[rated] @ ratings[rated, place] / sims[rated].sum())
+
+
+@pytest.mark.parametrize('threshold', THRESHOLDS)
+def test_recommend_for_user_matches_loop(model, threshold):
+    for user_idx in range(0, model.shape[0], 7):
+        expected = loop_recommend(model, user_idx, threshold, 10)
+        result = recommend_for_user(model, user_idx, threshold, 10)
+        if expected is None:
+            assert result is None
+            continue
+        assert result[0].tolist() == expected[0]
+        np.testing.assert_allclose(result[1], expected[1])
+        assert result[2] == expected[2]
+
+
+@pytest.mark.parametrize('threshold', THRESHOLDS)
+def test_neighbor_index_and_batch_match_exact(model, threshold):
+    # k = semua user lain, jadi tabel tetangga tidak memotong apa pun
+    index = NeighborIndex.build(model, k=model.shape[0], min_similarity=0.0)
+    batch = recommend_batch(model, model.user_ids, 10, threshold)
+    for user_idx, user_id in enumerate(model.user_ids):
+        exact = recommend_for_user(model, user_idx, threshold, 10)
+        from_index = recommend_for_user(model, user_idx, threshold, 10, index)
+        from_batch = batch[batch['User_Id'] == user_id]['Place_Id'].to_numpy()
+        if exact is None:
+            assert from_index is None and len(from_batch) == 0
+            continue
+        assert from_index[0].tolist() == exact[0].tolist()
+        np.testing.assert_allclose(from_index[1], exact[1], rtol=1e-6)
+        assert from_batch.tolist() == model.place_ids[exact[0]].tolist()
+
+
+def test_new_user_fold_in_matches_registered_user(ratings, model):
+    user_id = model.user_ids[3]
+    others = RatingModel.from_ratings(ratings[ratings['User_Id'] != user_id], place_ids=model.place_ids)
+    own = ratings[ratings['User_Id'] == user_id]
+    folded = recommend_for_new_user(others, dict(zip(own['Place_Id'], own['Place_Ratings'])), 0.1, 10)
+    registered = recommend_for_user(model, model.user_index[user_id], 0.1, 10)
+    assert folded[0].tolist() == registered[0].tolist()
+    np.testing.assert_allclose(folded[1], registered[1])
+
+
+def test_top_n_indices_matches_full_sort():
+    rng = np.random.default_rng(1)
+    scores = rng.integers(0, 5, 200).astype(np.float64)  # Banyak skor kembar
+    mask = rng.random(200) < 0.7
+    expected = sorted(np.flatnonzero(mask), key=lambda i: (-scores[i], i))[:15]
+    assert top_n_indices(scores, 15, mask).tolist() == expected
+
+
+def test_top_n_indices_ignores_float_noise_in_ties():
+    scores = np.array([5.0, 5.0 - 1e-9, 5.0 + 1e-9, 4.0])
+    assert top_n_indices(scores, 3).tolist() == [0, 1, 2]
+
+
+def test_top_n_rows_matches_top_n_indices():
+    rng = np.random.default_rng(2)
+    scores = rng.integers(0, 4, (20, 30)).astype(np.float64)
+    mask = rng.random((20, 30)) < 0.5
+    idx, top_scores = top_n_rows(scores, 8, mask)
+    for row in range(20):
+        expected = top_n_indices(scores[row], 8, mask[row])
+        assert idx[row][idx[row] >= 0].tolist() == expected.tolist()
+        np.testing.assert_array_equal(top_scores[row][:len(expected)], scores[row, expected])
+
+
+def test_with_ratings_matches_rebuild(ratings, model):
+    delta = ratings.sample(30, random_state=0).assign(Place_Ratings=1)
+    delta = pd.concat([delta, pd.DataFrame({'User_Id': [9999], 'Place_Id': [5], 'Place_Ratings': [4]})])
+    updated, changed = model.with_ratings(delta)
+    rebuilt = RatingModel.from_ratings(pd.concat([ratings, delta]), place_ids=model.place_ids)
+    assert updated.user_ids.tolist() == rebuilt.user_ids.tolist()
+    assert (updated.matrix != rebuilt.matrix).nnz == 0
+    np.testing.assert_allclose(updated.normalized.toarray(), normalize_rows(rebuilt.matrix).toarray())
+    assert updated.user_index[9999] in changed
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import evaluate
+from engine import RatingModel, recommend_for_user
+from item_cf import ItemSimilarity
+
+
+def test_leave_k_split(ratings):
+    train, test = evaluate.split_ratings(ratings, method='user', leave_k=2, seed=0)
+    deduped = ratings.drop_duplicates(['User_Id', 'Place_Id'], keep='last')
+    assert len(train) + len(test) == len(deduped)
+    assert not set(zip(train['User_Id'], train['Place_Id'])) & set(zip(test['User_Id'], test['Place_Id']))
+    counts = deduped['User_Id'].value_counts()
+    per_user = test['User_Id'].value_counts().reindex(counts.index, fill_value=0)
+    assert (per_user == np.where(counts > 2, 2, 0)).all()
+
+
+def test_ranking_metrics_match_loop():
+    rng = np.random.default_rng(0)
+    relevant = rng.random((30, 40)) < 0.15
+    relevant[3] = False  # User tanpa tempat relevan tidak dihitung
+    top_idx = np.array([rng.permutation(40)[:10] for _ in range(30)])
+    top_idx[5, 7:] = -1  # Slot kosong
+    ks = [1, 5, 10]
+    sums = evaluate.ranking_metrics(top_idx, relevant, ks)
+    for k in ks:
+        precision = recall = ndcg = 0.0
+        users = 0
+        for user in range(30):
+            truth = set(np.flatnonzero(relevant[user]).tolist())
+            if not truth:
+                continue
+            users += 1
+            hits = [place >= 0 and place in truth for place in top_idx[user, :k]]
+            precision += sum(hits) / k
+            recall += sum(hits) / len(truth)
+            dcg = sum(1 / np.log2(rank + 2) for rank, hit in enumerate(hits) if hit)
+            ndcg += dcg / sum(1 / np.log2(rank + 2) for rank in range(min(len(truth), k)))
+        assert sums[k]['users'] == users
+        assert sums[k]['precision'] == pytest.approx(precision)
+        assert sums[k]['recall'] == pytest.approx(recall)
+        assert sums[k]['ndcg'] == pytest.approx(ndcg)
+
+
+@pytest.mark.parametrize('threshold', [0.1, 0.3])
+def test_user_cf_scorer_matches_app(model, threshold):
+    rows = np.arange(0, model.shape[0], 5)
+    pred, valid = evaluate.make_scorer('user_cf', model, {'threshold': threshold})(rows)
+    for i, user_idx in enumerate(rows):
+        result = recommend_for_user(model, user_idx, threshold, 10)
+        if result is None:
+            assert not valid[i].any()
+            continue
+        assert valid[i, result[0]].all()
+        np.testing.assert_allclose(pred[i, result[0]], result[1], rtol=1e-6)
+
+
+def test_item_cf_scorer_matches_app(model):
+    rows = np.arange(0, model.shape[0], 5)
+    pred, valid = evaluate.make_scorer('item_cf', model, {'threshold': 0.2, 'k': 15})(rows)
+    item_similarity = ItemSimilarity.build(model, k=15)
+    for i, user_idx in enumerate(rows):
+        result = item_similarity.recommend(model.matrix[user_idx], 0.2, 10)
+        if result is not None:
+            np.testing.assert_allclose(pred[i, result[0]], result[1], rtol=1e-6)
+
+
+def test_evaluate_reports_each_k(ratings):
+    train, test = evaluate.split_ratings(ratings, method='user', seed=1)
+    model = RatingModel.from_ratings(train)
+    results = evaluate.evaluate(model, evaluate.test_matrix(model, test), 'user_cf', {'threshold': 0.1}, ks=[5, 10])
+    assert [row['k'] for row in results] == [5, 10]
+    for row in results:
+        assert 0 <= row['precision'] <= 1 and 0 <= row['recall'] <= 1 and 0 <= row['ndcg'] <= 1
+        assert 0 < row['coverage'] <= 1 and row['rmse'] >= row['mae'] > 0
@@ -0,0 +1,44 @@
+import numpy as np
+
+from geo import PlaceGeoIndex, haversine_km
+
+
+def make_index():
+    rng = np.random.default_rng(0)
+    return PlaceGeoIndex(rng.uniform(-8, -6, 300), rng.uniform(106, 113, 300))
+
+
+def test_haversine_known_distance():
+    # Satu derajat lintang ~ 111.2 km
+    assert abs(haversine_km(0, 0, 1, 0) - 111.19) < 0.01
+
+
+def test_within_matches_brute_force():
+    index = make_index()
+    for lat, lon, radius in [(-7.0, 110.0, 30), (-6.2, 106.8, 80), (-7.5, 112.7, 5)]:
+        dist = haversine_km(lat, lon, index.lat, index.lon)
+        idx, found = index.within(lat, lon, radius)
+        assert set(idx.tolist()) == set(np.flatnonzero(dist <= radius).tolist())
+        np.testing.assert_allclose(found, dist[idx], rtol=1e-9)
+        assert np.all(np.diff(found) >= 0)
+
+
+def test_nearest_and_restrict_match_brute_force():
+    index = make_index()
+    dist = haversine_km(-7.0, 110.0, index.lat, index.lon)
+    idx, found = index.nearest(-7.0, 110.0, k=10)
+    assert idx.tolist() == np.argsort(dist, kind='stable')[:10].tolist()
+    np.testing.assert_allclose(found, np.sort(dist)[:10], rtol=1e-9)
+
+    candidates = np.arange(0, 300, 3)
+    kept, scores, kept_dist = index.restrict(candidates, -candidates.astype(float), -7.0, 110.0, 150, n=5)
+    expected = candidates[dist[candidates] <= 150][:5]
+    assert kept.tolist() == expected.tolist()
+    np.testing.assert_array_equal(scores, -expected.astype(float))
+    np.testing.assert_allclose(kept_dist, dist[expected])
+
+
+def test_near_place_excludes_itself():
+    index = make_index()
+    idx, _ = index.near_place(4, k=5)
+    assert len(idx) == 5 and 4 not in idx.tolist()
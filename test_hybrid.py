@@ -0,0 +1,43 @@
+import numpy as np
+from scipy import sparse
+
+from engine import RatingModel
+from hybrid import HybridRecommender, blend, content_scores
+from mf import FactorModel
+
+
+def test_blend_uses_content_without_cf():
+    cf = np.array([4.0, 2.0, 5.0])
+    content = np.array([1.0, 3.0, 2.0])
+    valid = np.array([True, False, True])
+    np.testing.assert_allclose(blend(cf, valid, content, 0.25), [3.25, 3.0, 4.25])
+    np.testing.assert_allclose(blend(cf, valid, content, 0.0), [4.0, 3.0, 5.0])
+
+
+def test_content_scores_match_loop():
+    rng = np.random.default_rng(0)
+    content = sparse.random(30, 30, density=0.2, random_state=1, format='csr')
+    user_row = sparse.csr_matrix(([5.0, 2.0, 4.0], ([0, 0, 0], [3, 8, 20])), shape=(1, 30))
+    scores = content_scores(content.T.tocsr(), user_row, prior=3.5, shrinkage=0.2)
+    dense = content.toarray()
+    for place in rng.choice(30, 10, replace=False):
+        sims = dense[user_row.indices, place]
+        expected = (sims @ user_row.data + 0.2 * 3.5) / (sims.sum() + 0.2)
+        assert abs(scores[place] - expected) < 1e-12
+
+
+def test_places_without_training_ratings_use_content_only(ratings, model):
+    unrated_place = model.place_ids[-1]
+    train = ratings[ratings['Place_Id'] != unrated_place]
+    train_model = RatingModel.from_ratings(train, place_ids=model.place_ids)
+    factor_model = FactorModel.train(train_model, factors=4, iterations=3)
+    content = sparse.random(model.shape[1], model.shape[1], density=0.3, random_state=0, format='csr')
+    hybrid = HybridRecommender(factor_model, content)
+
+    np.testing.assert_array_equal(hybrid.cf_valid, np.diff(train_model.matrix.tocsc().indptr) > 0)
+    user_row = train_model.matrix[0]
+    pred = hybrid.scores(user_row, weight=0.3, user_idx=0)
+    content_pred = content_scores(hybrid.content_t, user_row, factor_model.global_mean)
+    assert pred[-1] == content_pred[-1]
+    cf_pred = np.clip(factor_model.predict(factor_model.user_factors[0]), 1, 5)
+    np.testing.assert_allclose(pred[:-1], 0.7 * cf_pred[:-1] + 0.3 * content_pred[:-1], rtol=1e-6)
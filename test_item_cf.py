@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from engine import normalize_rows
+from item_cf import ItemSimilarity
+
+
+def test_build_keeps_top_k_of_dense_similarity(model):
+    item_similarity = ItemSimilarity.build(model, k=8, block_size=16)
+    items = normalize_rows(model.matrix.T)
+    dense = (items @ items.T).toarray()
+    np.fill_diagonal(dense, -np.inf)
+    for place in range(model.shape[1]):
+        row = item_similarity.matrix[place]
+        expected = np.sort(dense[place][dense[place] > 0])[::-1][:8]
+        np.testing.assert_allclose(np.sort(row.data)[::-1], expected, rtol=1e-6)
+        np.testing.assert_allclose(row.data, dense[place, row.indices], rtol=1e-6)
+
+
+@pytest.mark.parametrize('threshold', [0.0, 0.2, 0.4])
+def test_recommend_matches_loop(model, threshold):
+    item_similarity = ItemSimilarity.build(model, k=15)
+    sims = item_similarity.matrix.toarray().astype(np.float64)
+    for user_idx in range(0, model.shape[0], 9):
+        user_row = model.matrix[user_idx]
+        ratings = user_row.toarray().ravel().astype(np.float64)
+        preds, supports = {}, {}
+        for place in range(model.shape[1]):
+            if ratings[place]:
+                continue
+            weighted = total = 0.0
+            support = 0
+            for rated in user_row.indices:
+                sim = sims[rated, place]
+                if sim > threshold:
+                    weighted += sim * ratings[rated]
+                    total += sim
+                    support += 1
+            if total > 0:
+                preds[place], supports[place] = weighted / total, support
+        result = item_similarity.recommend(user_row, threshold, 10)
+        if not preds:
+            assert result is None
+            continue
+        expected = sorted(preds, key=lambda place: (-round(preds[place], 6), place))[:10]
+        assert result[0].tolist() == expected
+        np.testing.assert_allclose(result[1], [preds[place] for place in expected])
+        assert result[2].tolist() == [supports[place] for place in expected]
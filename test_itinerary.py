@@ -0,0 +1,38 @@
+import itertools
+
+import numpy as np
+
+from geo import haversine_km
+from itinerary import route_cost, two_opt
+
+
+def distance_matrix(n, seed):
+    rng = np.random.default_rng(seed)
+    lat, lon = rng.uniform(-7.1, -6.9, n), rng.uniform(110.3, 110.5, n)
+    return haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+
+def test_two_opt_never_worse_and_keeps_stops():
+    for seed in range(20):
+        dist = distance_matrix(9, seed)
+        route = list(np.random.default_rng(seed).permutation(9))
+        improved = two_opt(route, dist)
+        assert sorted(improved) == sorted(route)
+        assert route_cost(improved, dist) <= route_cost(route, dist) + 1e-9
+
+
+def test_two_opt_fixed_start():
+    for seed in range(10):
+        dist = distance_matrix(8, seed)
+        route = list(np.random.default_rng(seed).permutation(8))
+        improved = two_opt(route, dist, fixed_start=True)
+        assert improved[0] == route[0]
+        assert sorted(improved) == sorted(route)
+
+
+def test_two_opt_near_optimal_on_small_routes():
+    # Rute kecil: bandingkan dengan semua permutasi (2-opt boleh sedikit di atas optimum)
+    for seed in range(5):
+        dist = distance_matrix(6, seed)
+        best = min(route_cost(list(p), dist) for p in itertools.permutations(range(6)))
+        assert route_cost(two_opt(range(6), dist), dist) <= best * 1.2
@@ -0,0 +1,41 @@
+import numpy as np
+
+from mf import FactorModel, solve_factors
+
+
+def test_solve_factors_matches_per_row_solve(model):
+    rng = np.random.default_rng(0)
+    ratings = model.matrix.astype(np.float64)
+    fixed = rng.normal(0, 0.5, (model.shape[1], 6))
+    # block_size kecil agar lewat beberapa blok paralel
+    solved = solve_factors(ratings, fixed, reg=0.1, n_threads=3, block_size=16)
+    for row in range(model.shape[0]):
+        cols = ratings.indices[ratings.indptr[row]:ratings.indptr[row + 1]]
+        values = ratings.data[ratings.indptr[row]:ratings.indptr[row + 1]]
+        gram = fixed[cols].T @ fixed[cols] + 0.1 * max(len(cols), 1) * np.eye(6)
+        np.testing.assert_allclose(solved[row], np.linalg.solve(gram, fixed[cols].T @ values), atol=1e-10)
+
+
+def test_solve_factors_empty_rows_are_zero(model):
+    ratings = model.matrix.astype(np.float64).tolil()
+    ratings[5] = 0
+    solved = solve_factors(ratings.tocsr(), np.ones((model.shape[1], 4)), reg=0.1)
+    np.testing.assert_array_equal(solved[5], 0)
+
+
+def test_fold_in_matches_user_update(model):
+    factor_model = FactorModel.train(model, factors=8, iterations=5)
+    ratings = model.matrix.astype(np.float64)
+    ratings.data -= factor_model.global_mean
+    expected = solve_factors(ratings, factor_model.item_factors.astype(np.float64), factor_model.reg)
+    for user_idx in range(0, model.shape[0], 13):
+        np.testing.assert_allclose(factor_model.fold_in(model.matrix[user_idx]), expected[user_idx], atol=1e-8)
+
+
+def test_recommend_skips_rated_places(model):
+    factor_model = FactorModel.train(model, factors=8, iterations=3)
+    user_row = model.matrix[2]
+    idx, pred, n_rated = factor_model.recommend(user_row, 10, user_idx=2)
+    assert not set(idx.tolist()) & set(user_row.indices.tolist())
+    assert n_rated == user_row.nnz
+    assert np.all(np.diff(pred) <= 1e-6) and np.all((pred >= 1) & (pred <= 5))
@@ -0,0 +1,59 @@
+import numpy as np
+
+from engine import RatingModel
+from neighbors import NeighborIndex
+from rating_store import LiveModel, RatingStore, merged_ratings
+from stats import PlaceStats
+
+
+def test_refresh_matches_rebuild(ratings, model, tmp_path):
+    store = RatingStore(str(tmp_path / 'ratings.db'))
+    live = LiveModel(model, NeighborIndex.build(model, k=30), store, 0)
+    new_user = store.allocate_user_id(int(model.user_ids.max()) + 1)
+    store.upsert_many([(model.user_ids[0], 1, 5), (model.user_ids[4], 7, 1), (new_user, 3, 4)])
+    assert live.refresh() == 3
+    store.upsert_many([(model.user_ids[0], 1, 2), (new_user, 9, 5)])  # Menimpa rating sebelumnya
+    assert live.refresh() == 2 and live.refresh() == 0
+
+    merged, last_seq = merged_ratings(ratings, store)
+    assert last_seq == store.last_seq
+    rebuilt = RatingModel.from_ratings(merged, place_ids=model.place_ids)
+    assert live.model.user_ids.tolist() == rebuilt.user_ids.tolist()
+    assert (live.model.matrix != rebuilt.matrix).nnz == 0
+
+    # update() tidak mengisi ulang slot tetangga yang terlempar (lihat docstring-nya), jadi
+    # hanya baris user yang berubah yang pasti sama dengan bangun ulang; baris lain cukup
+    # berisi kemiripan yang tepat, urut menurun
+    expected = NeighborIndex.build(rebuilt, k=30)
+    dense = (rebuilt.normalized @ rebuilt.normalized.T).toarray()
+    for user_idx in range(rebuilt.shape[0]):
+        idx, sims = live.neighbor_index.neighbors(user_idx, 0.05)
+        np.testing.assert_allclose(sims, dense[user_idx, idx], atol=1e-6)
+        assert np.all(np.diff(sims) <= 1e-6) and user_idx not in idx.tolist()
+    for user_id in (model.user_ids[0], model.user_ids[4], new_user):
+        user_idx = rebuilt.user_index[user_id]
+        np.testing.assert_allclose(
+            live.neighbor_index.neighbor_sims[user_idx], expected.neighbor_sims[user_idx], atol=1e-6
+        )
+
+    stats = PlaceStats.build(rebuilt)
+    np.testing.assert_array_equal(live.stats.counts, stats.counts)
+    np.testing.assert_allclose(live.stats.sums, stats.sums)
+    assert live.generation == 2
+
+
+def test_compact_keeps_latest_rating(ratings, tmp_path):
+    store = RatingStore(str(tmp_path / 'ratings.db'))
+    store.upsert_many([(1, 1, 1), (1, 1, 3), (2, 5, 4), (1, 1, 5)])
+    before = merged_ratings(ratings, store)[0].drop_duplicates(['User_Id', 'Place_Id'], keep='last')
+    assert store.compact() == 2
+    after = merged_ratings(ratings, store)[0].drop_duplicates(['User_Id', 'Place_Id'], keep='last')
+    assert before.reset_index(drop=True).equals(after.reset_index(drop=True))
+    assert store.compacted_seq == store.last_seq == 4
+
+
+def test_allocate_user_id_is_unique(tmp_path):
+    store = RatingStore(str(tmp_path / 'ratings.db'))
+    ids = [store.allocate_user_id(100) for _ in range(3)]
+    assert ids == [100, 101, 102]
+    assert RatingStore(str(tmp_path / 'ratings.db')).allocate_user_id(50) == 103
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import rec_store
+from engine import recommend_for_user
+from rec_store import RecommendationStore
+
+THRESHOLDS = [0.05, 0.1, 0.3, 0.5]
+
+
+def test_store_lookup_matches_recommend_for_user(model):
+    store = RecommendationStore.build(model, thresholds=THRESHOLDS, n=10, block_size=32)
+    for threshold in THRESHOLDS:
+        for user_idx in range(model.shape[0]):
+            expected = recommend_for_user(model, user_idx, threshold, 10)
+            stored = store.lookup(user_idx, threshold, 10)
+            if expected is None:
+                assert stored is None
+                continue
+            assert stored[0].tolist() == expected[0].tolist()
+            np.testing.assert_allclose(stored[1], expected[1], rtol=1e-6)
+            assert stored[2] == expected[2]
+
+
+def test_lookup_outside_grid_raises(model):
+    store = RecommendationStore.build(model, thresholds=THRESHOLDS, n=5)
+    with pytest.raises(KeyError):
+        store.lookup(0, 0.2, 5)
+    with pytest.raises(KeyError):
+        store.lookup(0, 0.1, 6)
+
+
+def test_load_or_build_rejects_stale_store(ratings, model, tmp_path):
+    path = str(tmp_path / 'rec_store.npz')
+    store = rec_store.load_or_build(model, path, thresholds=THRESHOLDS, n=5)
+    assert RecommendationStore.load(path, model).version == store.version
+    new_model, _ = model.with_ratings(ratings.head(3).assign(Place_Ratings=1))
+    assert RecommendationStore.load(path, new_model) is None
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import shared
+from item_cf import ItemSimilarity
+from neighbors import NeighborIndex
+
+
+def test_publish_open_arrays_round_trip(tmp_path):
+    arrays = {'a': np.arange(10, dtype=np.int32), 'b': np.linspace(0, 1, 6).reshape(2, 3)}
+    shared.publish('demo', 'k1', arrays, {'note': 'x'}, shared_dir=tmp_path)
+    opened, meta = shared.open_arrays('demo', 'k1', shared_dir=tmp_path)
+    assert meta == {'note': 'x'}
+    for name, array in arrays.items():
+        assert isinstance(opened[name], np.memmap)
+        np.testing.assert_array_equal(opened[name], array)
+    assert shared.open_arrays('demo', 'missing', shared_dir=tmp_path) is None
+
+
+def test_load_or_publish_builds_once(tmp_path):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'a': np.ones(3)}, {}
+
+    shared.load_or_publish('demo', 'k1', build, shared_dir=tmp_path)
+    shared.load_or_publish('demo', 'k1', build, shared_dir=tmp_path)
+    assert len(calls) == 1
+
+
+def test_prune_keeps_previous_version(tmp_path):
+    for i, key in enumerate(['k1', 'k2', 'k3']):
+        shared.load_or_publish('demo', key, lambda: ({'a': np.arange(3)}, {}), shared_dir=tmp_path)
+        os.utime(shared.artifact_dir('demo', key, tmp_path), (i, i))
+    shared.prune('demo', 'k3', shared_dir=tmp_path)
+    assert sorted(os.listdir(tmp_path / 'demo')) == ['k2', 'k3']
+
+
+def test_shared_model_matches_original(model, tmp_path):
+    shared_model = shared.model_from_arrays(*shared.load_or_publish(
+        'rating_model', 'k', lambda: shared.model_arrays(model), shared_dir=tmp_path
+    ))
+    assert shared_model.fingerprint() == model.fingerprint()
+    assert (shared_model.matrix != model.matrix).nnz == 0
+    np.testing.assert_allclose(shared_model.normalized.toarray(), model.normalized.toarray())
+    assert shared_model.user_index == model.user_index
+
+    # Model di atas memory-map read-only tetap bisa diperbarui (hasilnya salinan baru)
+    updated, _ = shared_model.with_ratings(pd.DataFrame(
+        {'User_Id': [model.user_ids[0]], 'Place_Id': [model.place_ids[0]], 'Place_Ratings': [5]}
+    ))
+    assert updated.matrix[0, 0] == 5
+
+
+def test_shared_neighbors_and_item_similarity_round_trip(model, tmp_path):
+    index = NeighborIndex.build(model, k=20)
+    restored = shared.neighbors_from_arrays(*shared.load_or_publish(
+        'user_neighbors', 'k', lambda: shared.neighbor_arrays(index), shared_dir=tmp_path
+    ))
+    np.testing.assert_array_equal(restored.neighbor_idx, index.neighbor_idx)
+    np.testing.assert_array_equal(restored.neighbor_sims, index.neighbor_sims)
+    assert restored.fingerprint == index.fingerprint
+
+    item_similarity = ItemSimilarity.build(model, k=10)
+    restored = shared.item_similarity_from_arrays(*shared.load_or_publish(
+        'item_similarity', 'k', lambda: shared.item_similarity_arrays(item_similarity), shared_dir=tmp_path
+    ))
+    assert (restored.matrix != item_similarity.matrix).nnz == 0
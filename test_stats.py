@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from stats import PlaceStats, Ranking
+
+
+def test_ranking_updated_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 6, 300).astype(np.float64)  # Banyak skor kembar
+    scores[rng.choice(300, 20, replace=False)] = -np.inf
+    ranking = Ranking(scores)
+    for _ in range(20):
+        idx = rng.choice(300, rng.integers(1, 15), replace=False)
+        new_scores = rng.integers(0, 6, len(idx)).astype(np.float64)
+        new_scores[rng.random(len(idx)) < 0.1] = -np.inf
+        ranking = ranking.updated(idx, new_scores)
+        expected = Ranking(ranking.scores)
+        assert ranking.order.tolist() == expected.order.tolist()
+        assert ranking.top(25).tolist() == expected.top(25).tolist()
+
+
+def test_ranking_top_skips_unranked():
+    ranking = Ranking([3.0, -np.inf, 5.0])
+    assert ranking.top(3).tolist() == [2, 0]
+
+
+def test_place_stats_updated_matches_build(ratings, model):
+    stats = PlaceStats.build(model)
+    delta = pd.concat([
+        ratings.sample(40, random_state=1).assign(Place_Ratings=5),
+        pd.DataFrame({'User_Id': [9001, 9001, 9002], 'Place_Id': [1, 2, 1], 'Place_Ratings': [4, 2, 5]}),
+    ])
+    new_model, changed = model.with_ratings(delta)
+    updated = stats.updated(model, new_model, changed)
+    rebuilt = PlaceStats.build(new_model)
+
+    np.testing.assert_array_equal(updated.counts, rebuilt.counts)
+    np.testing.assert_allclose(updated.sums, rebuilt.sums)
+    np.testing.assert_array_equal(updated.histogram, rebuilt.histogram)
+    assert updated.n_users == rebuilt.n_users
+    assert updated.version == rebuilt.version
+    assert updated.by_rating.order.tolist() == rebuilt.by_rating.order.tolist()
+    assert updated.by_users.order.tolist() == rebuilt.by_users.order.tolist()
+
+
+def test_place_stats_match_pandas(ratings, model):
+    stats = PlaceStats.build(model)
+    deduped = ratings.drop_duplicates(['User_Id', 'Place_Id'], keep='last')
+    grouped = deduped.groupby('Place_Id')['Place_Ratings'].agg(['count', 'sum']).reindex(model.place_ids, fill_value=0)
+    np.testing.assert_array_equal(stats.counts, grouped['count'].to_numpy())
+    np.testing.assert_allclose(stats.sums, grouped['sum'].to_numpy())
+    assert stats.n_ratings == len(deduped)